@@ -0,0 +1,218 @@
+"""Benchmarks of the reading, Sy calculation, filtering and fitting.
+
+Examples
+--------
+```shell
+# Run the benchmarks and save the results of the current commit in benchmarks/results/<commit>.json
+python -m benchmarks.run_benchmarks --save
+
+# Later, compare against them (the exit code is 1 if a benchmark is slower than the tolerance)
+python -m benchmarks.run_benchmarks --compare benchmarks/results/<commit>.json
+```
+
+The committed `benchmarks/results/baseline.json` is a reference run of the bundled and synthetic files.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas
+
+from peatland_time_series import calculate_sy, filter_sy, read_sy, read_time_series
+from peatland_time_series.fitting import fit_power_law
+
+from .synthetic import synthetic_time_series, write_time_series
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__), '..', 'tests', 'data')
+AHLENMOOR_DIRECTORY = os.path.join(DATA_DIRECTORY, 'time_series', 'time_series', 'ahlenmoor')
+RESULTS_DIRECTORY = os.path.join(os.path.dirname(__file__), 'results')
+
+# The hourly loggers of kmr_area_c and of all the ahlenmoor site (4 to 6 years each)
+BUNDLED_TIME_SERIES = {
+    'kmr_area_c': os.path.join(DATA_DIRECTORY, 'kmr_area_c.csv'),
+    **{
+        os.path.splitext(filename)[0]: os.path.join(AHLENMOOR_DIRECTORY, filename)
+        for filename in sorted(os.listdir(AHLENMOOR_DIRECTORY)) if filename.endswith('.csv')
+    },
+}
+BUNDLED_SY = os.path.join(DATA_DIRECTORY, 'sy.csv')
+SITE_YEARS = [1, 10, 100]
+
+# (gap, max_hour, resample) settings of calculate_sy
+SY_SETTINGS = [(5, 5, 'H'), (2, 10, 'H'), (5, 5, '3H')]
+FILTER_BOUNDS = dict(sy_min=0, sy_max=1, delta_h_min=.01, precipitation_sum_min=10, precipitation_sum_max=100)
+FIT_METHODS = ['least_squares', 'loglog']
+
+
+class Benchmark:
+    """A function to time, with its name (ex. "calculate_sy[kmr_area_c, gap=5, max_hour=5, resample=H]")."""
+
+    def __init__(self, name: str, function: Callable[[], object]):
+        self.name = name
+        self.function = function
+
+    def run(self, repeat: int) -> Dict[str, float]:
+        """Best time of `repeat` runs, and peak memory (traced in an additional run).
+
+        The peak memory is the one traced by `tracemalloc`, the allocations of Python and numpy
+        (so pandas), but not the ones of Arrow when `pyarrow` reads the files.
+        """
+        times = []
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            self.function()
+            times.append(time.perf_counter() - start)
+
+        gc.collect()
+        tracemalloc.start()
+        self.function()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {'seconds': min(times), 'peak_bytes': peak}
+
+
+def make_benchmarks(data_directory: str, site_years: List[float]) -> List[Benchmark]:
+    """Benchmarks of the bundled files and of synthetic time series of many site-years (written in `data_directory`)."""
+    time_series_files = dict(BUNDLED_TIME_SERIES)
+    for years in site_years:
+        filepath = os.path.join(data_directory, f'synthetic_{years}y.csv')
+        if not os.path.exists(filepath):
+            write_time_series(synthetic_time_series(years), filepath)
+        time_series_files[f'synthetic_{years}y'] = filepath
+
+    benchmarks = [Benchmark('read_sy[sy]', lambda: read_sy(BUNDLED_SY))]
+
+    for dataset, filepath in time_series_files.items():
+        time_series = read_time_series(filepath)
+        sy = calculate_sy(time_series)
+        filtered_sy = filter_sy(sy, **FILTER_BOUNDS)
+
+        benchmarks.append(Benchmark(f'read_time_series[{dataset}]', lambda filepath=filepath: read_time_series(filepath)))
+        for gap, max_hour, resample in SY_SETTINGS:
+            benchmarks.append(Benchmark(
+                f'calculate_sy[{dataset}, gap={gap}, max_hour={max_hour}, resample={resample}]',
+                lambda time_series=time_series, gap=gap, max_hour=max_hour, resample=resample: calculate_sy(
+                    time_series, gap=gap, max_hour=max_hour, resample=resample
+                )
+            ))
+        benchmarks.append(Benchmark(
+            f'filter_sy[{dataset}]',
+            lambda sy=sy: filter_sy(sy, **FILTER_BOUNDS)
+        ))
+        for method in FIT_METHODS:
+            benchmarks.append(Benchmark(
+                f'fit_power_law[{dataset}, method={method}]',
+                lambda sy=filtered_sy, method=method: fit_power_law(sy['sy'].values, sy['min_wtd'].values * 100, method=method)
+            ))
+
+    return benchmarks
+
+
+def run_benchmarks(benchmarks: List[Benchmark], repeat: int, pattern: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for benchmark in benchmarks:
+        if pattern is not None and pattern not in benchmark.name:
+            continue
+
+        results[benchmark.name] = benchmark.run(repeat)
+        print(_format_result(benchmark.name, results[benchmark.name]), flush=True)
+
+    return results
+
+
+def compare_results(
+        results: Dict[str, Dict[str, float]],
+        baseline: Dict[str, Dict[str, float]],
+        tolerance: float) -> Tuple[List[str], List[str]]:
+    """Lines of the comparison, and names of the benchmarks slower than the baseline by more than the tolerance."""
+    lines, regressions = [], []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        time_ratio = result['seconds'] / baseline[name]['seconds']
+        memory_ratio = result['peak_bytes'] / max(baseline[name]['peak_bytes'], 1)
+        is_regression = time_ratio > 1 + tolerance
+        if is_regression:
+            regressions.append(name)
+
+        lines.append(f'{name:<75} time x{time_ratio:5.2f}  memory x{memory_ratio:5.2f}{"  REGRESSION" if is_regression else ""}')
+
+    return lines, regressions
+
+
+def _format_result(name: str, result: Dict[str, float]) -> str:
+    return f'{name:<75} {result["seconds"] * 1000:10.2f} ms {result["peak_bytes"] / 2 ** 20:10.2f} MiB'
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks of peatland_time_series (time and peak memory).')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs of each benchmark, the best is kept.')
+    parser.add_argument('--site-years', type=float, nargs='*', default=SITE_YEARS, help='Sizes of the synthetic time series.')
+    parser.add_argument('--filter', dest='pattern', help='Only run the benchmarks whose name contains this text.')
+    parser.add_argument('--data-directory', help='Directory of the synthetic time series files (kept between runs).')
+    parser.add_argument('--save', nargs='?', const='', help='Save the results (default: benchmarks/results/<commit>.json).')
+    parser.add_argument('--compare', help='Results file to compare against.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Relative slowdown reported as a regression.')
+    arguments = parser.parse_args(arguments)
+
+    warnings.simplefilter('ignore', RuntimeWarning)  # The divisions by zero of the Sy calculation
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        data_directory = arguments.data_directory or temporary_directory
+        os.makedirs(data_directory, exist_ok=True)
+        site_years = [int(years) if float(years).is_integer() else years for years in arguments.site_years]
+
+        results = run_benchmarks(make_benchmarks(data_directory, site_years), arguments.repeat, arguments.pattern)
+
+    commit = _git_commit()
+    if arguments.save is not None:
+        filepath = arguments.save or os.path.join(RESULTS_DIRECTORY, f'{commit}.json')
+        os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+        with open(filepath, 'w') as file:
+            json.dump({
+                'commit': commit,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'pandas': pandas.__version__,
+                'results': results,
+            }, file, indent=2)
+        print(f'Results saved in "{filepath}"')
+
+    if arguments.compare is not None:
+        with open(arguments.compare) as file:
+            baseline = json.load(file)
+
+        print(f'\nCompared to {baseline["commit"]} ({arguments.compare}):')
+        lines, regressions = compare_results(results, baseline['results'], arguments.tolerance)
+        print('\n'.join(lines))
+
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) slower by more than {arguments.tolerance:.0%}.')
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+import numpy
+import pandas
+from scipy.signal import lfilter
+
+MEAN_WATER_TABLE_DEPTH = -0.3  # In m
+SPECIFIC_YIELD = 0.3
+STORMS_PER_YEAR = 60
+
+
+def synthetic_time_series(site_years: float, frequency: str = 'H', seed: int = 0) -> pandas.DataFrame:
+    """Generate a time series like the loggers ones (see `read_time_series`), of `site_years` years.
+
+    The precipitation are storms of random durations and intensities, the water table rises
+    with the precipitation (about `precipitation / SPECIFIC_YIELD`) and recedes toward its mean
+    depth, with a seasonal evapotranspiration and a measurement noise.
+
+    Parameters
+    ----------
+    site_years
+        Duration of the time series, in years.
+    frequency
+        Frequency of the measures (ex. 'H', '15min').
+    seed
+        Seed of the random values.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The time series, indexed by date with the 'data_wtd' and 'data_prec' columns.
+    """
+    random = numpy.random.default_rng(seed)
+    step = pandas.Timedelta(pandas.tseries.frequencies.to_offset(frequency))
+    dates = pandas.date_range('2000-01-01', periods=int(site_years * pandas.Timedelta('365D') / step), freq=step, name='date')
+    steps_per_day = pandas.Timedelta('1D') / step
+
+    # Storms: starts and durations (in steps) marked by a difference array
+    n_storms = random.poisson(STORMS_PER_YEAR * site_years)
+    starts = random.integers(0, len(dates), n_storms)
+    durations = random.geometric(1 / (6 / 24 * steps_per_day), n_storms)  # About 6 hours
+    is_raining = numpy.zeros(len(dates) + 1, dtype=int)
+    numpy.add.at(is_raining, starts, 1)
+    numpy.add.at(is_raining, numpy.minimum(starts + durations, len(dates)), -1)
+    is_raining = numpy.cumsum(is_raining[:-1]) > 0
+    precipitation = numpy.where(is_raining, random.exponential(24 / steps_per_day, len(dates)), 0).round(1)
+
+    # Water table: rises with the precipitation, evapotranspiration in summer, recession toward the mean depth
+    days = (dates - dates[0]) / pandas.Timedelta('1D')
+    evapotranspiration = 0.004 / steps_per_day * (1 + numpy.sin(2 * numpy.pi * (days - 100) / 365.25))  # In m per step
+    inflow = precipitation / 1000 / SPECIFIC_YIELD - evapotranspiration
+    recession = 1 - 0.02 / steps_per_day
+    water_table_depth = MEAN_WATER_TABLE_DEPTH + lfilter([1], [1, -recession], inflow)
+    water_table_depth = numpy.minimum(water_table_depth, 0) + random.normal(0, 0.001, len(dates))
+
+    return pandas.DataFrame({'data_wtd': water_table_depth.round(3), 'data_prec': precipitation}, index=dates)
+
+
+def write_time_series(time_series: pandas.DataFrame, filepath: str):
+    """Write the time series in the format of the loggers files."""
+    time_series.reset_index().to_csv(filepath, date_format='%Y-%m-%d %H:%M:%S')
@@ -1,12 +1,72 @@
-from . import visualization
-from .filter import filter_sy
-from .sy import calculate_sy, read_sy
-from .time_series import read_time_series
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+from .batch import calculate_sy_batch, read_time_series_batch
+from .downsampling import WaterLevelPyramid
+from .filter import SyFilter, evaluate_sy_filters, filter_sy
+from .intervals import SyIntervalIndex
+from .profiling import SyProfiler
+from .resampling import resample_arrays
+from .streaming import calculate_sy_stream
+from .sweep import calculate_sy_sweep
+from .sy import calculate_sy, calculate_sy_arrays, read_sy
+from .time_series import read_time_series, read_time_series_chunks
+
+if TYPE_CHECKING:
+    from . import fitting, visualization
+    from .rendering import render_water_levels
+    from .rolling import fit_depth_power_law_windows
+    from .selection import PointSelector
+
+# Modules (and their functions) depending on matplotlib or scipy, which are only imported on first access,
+# so that importing the package stays fast for the processes which only read and calculate the Sy
+_LAZY_ATTRIBUTES = {
+    'PointSelector': '.selection',
+    'fit_depth_power_law_windows': '.rolling',
+    'fitting': None,
+    'render_water_levels': '.rendering',
+    'visualization': None,
+}
 
 __all__ = [
+    'PointSelector',
+    'SyFilter',
+    'SyIntervalIndex',
+    'SyProfiler',
+    'WaterLevelPyramid',
     'calculate_sy',
+    'calculate_sy_arrays',
+    'calculate_sy_batch',
+    'calculate_sy_stream',
+    'calculate_sy_sweep',
+    'evaluate_sy_filters',
     'filter_sy',
+    'fit_depth_power_law_windows',
+    'fitting',
     'read_sy',
     'read_time_series',
+    'read_time_series_batch',
+    'read_time_series_chunks',
+    'render_water_levels',
+    'resample_arrays',
     'visualization',
 ]
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    module_name = _LAZY_ATTRIBUTES[name]
+    if module_name is None:  # A module
+        value = import_module(f'.{name}', __name__)
+    else:
+        value = getattr(import_module(module_name, __name__), name)
+
+    globals()[name] = value  # The next accesses do not go through __getattr__
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,238 @@
+import argparse
+import glob
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas
+
+from .sy import _empty_sy, calculate_sy
+from .time_series import COMPRESSIONS, TIME_SERIES_COLUMNS, read_time_series
+
+
+def calculate_sy_batch(
+        path: str,
+        gap: int = 5,
+        max_hour: int = 5,
+        threshold: float = 0.3,
+        resample: Union[pandas.DateOffset, pandas.Timedelta, str] = 'H',
+        accuracy_range: range = range(5, 15),
+        max_workers: Optional[int] = None) -> Tuple[pandas.DataFrame, Dict[str, Exception]]:
+    """Calculate the Specific Yield (Sy) of many sites in parallel.
+
+    Each time series file is a site, named after the file name (without extension), or
+    after its path when files of different directories have the same name.
+    The sites are distributed over a pool of processes. A site that fails (bad file,
+    calculation error) does not stop the others, its error is returned instead.
+
+    Examples
+    --------
+    ```python
+    sy, errors = calculate_sy_batch('./tests/data/time_series/time_series/ahlenmoor', max_workers=4)
+
+    sy.loc['ahlenmoor_af_seepegel']  # Sy of a single site
+    ```
+
+    Parameters
+    ----------
+    path
+        Directory of time series CSV files (compressed or not), or glob pattern of the files (ex. "./data/**/*.csv").
+    gap
+    max_hour
+    threshold
+    resample
+    accuracy_range
+        See the `calculate_sy` function.
+    max_workers
+        Number of processes, defaults to the number of CPUs. If 1, the sites are computed in the current process.
+
+    Returns
+    -------
+    Tuple[pandas.DataFrame, Dict[str, Exception]]
+        The Sy of all the sites, indexed by ('site', 'event'), and the errors by site.
+    """
+    filepaths, sites, errors = _find_site_files(path)
+    parameters = dict(gap=gap, max_hour=max_hour, threshold=threshold, resample=resample, accuracy_range=accuracy_range)
+
+    if max_workers == 1:
+        results = [_calculate_site_sy(filepath, parameters) for filepath in filepaths]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_calculate_site_sy, filepaths, [parameters] * len(filepaths)))
+
+    sy_by_site = {}
+    for site, (sy, error) in zip(sites, results):
+        if error is None:
+            sy_by_site[site] = sy
+        else:
+            errors[site] = error
+
+    if sy_by_site:
+        sy = pandas.concat(sy_by_site, names=['site', 'event'])
+    else:
+        sy = _empty_sy(pandas.MultiIndex.from_arrays([[], []], names=['site', 'event']))
+
+    return sy, errors
+
+
+def read_time_series_batch(
+        paths: Union[str, Iterable[str]],
+        date_format: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        concat: bool = False) -> Tuple[Union[Dict[str, pandas.DataFrame], pandas.DataFrame], Dict[str, Exception]]:
+    """Read many time series files concurrently.
+
+    The files are read by a pool of threads, so that the reading and decompression of
+    some files overlap with the parsing of the others (the parsers of pandas and Arrow
+    release the GIL). Each file is a site, named after the file name (without extensions),
+    or after its path when files of different directories have the same name. A file that
+    can't be read (missing time series columns, bad values) does not stop the others, its
+    error is returned instead.
+
+    Examples
+    --------
+    ```python
+    time_series, errors = read_time_series_batch('./data/**/*.csv.gz', max_workers=8)
+
+    time_series['ahlenmoor_af_seepegel']  # Time series of a single site
+    ```
+
+    Parameters
+    ----------
+    paths
+        Directory of time series CSV files (compressed or not), glob pattern of the files
+        (ex. "./data/**/*.csv.zst"), or list of files.
+    date_format
+        Optional, format of the dates of all the files (see the `read_time_series` function).
+        By default, the format is detected for each file.
+    max_workers
+        Number of threads (see `concurrent.futures.ThreadPoolExecutor`). If 1, the files are read one after the other.
+    concat
+        If True, the time series are concatenated in a single DataFrame indexed by ('site', 'date').
+
+    Returns
+    -------
+    Tuple[Union[Dict[str, pandas.DataFrame], pandas.DataFrame], Dict[str, Exception]]
+        The time series by site (or their concatenation), and the errors by site.
+    """
+    filepaths, sites, errors = _find_site_files(paths)
+
+    if max_workers == 1:
+        results = [_read_site_time_series(filepath, date_format) for filepath in filepaths]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_read_site_time_series, filepaths, [date_format] * len(filepaths)))
+
+    time_series_by_site = {}
+    for site, (time_series, error) in zip(sites, results):
+        if error is None:
+            time_series_by_site[site] = time_series
+        else:
+            errors[site] = error
+
+    if not concat:
+        return time_series_by_site, errors
+
+    if time_series_by_site:
+        return pandas.concat(time_series_by_site, names=['site', 'date']), errors
+
+    index = pandas.MultiIndex.from_arrays([[], pandas.DatetimeIndex([])], names=['site', 'date'])
+    return pandas.DataFrame(columns=TIME_SERIES_COLUMNS[1:], index=index, dtype=float), errors
+
+
+def _find_site_files(paths: Union[str, Iterable[str]]) -> Tuple[List[str], List[str], Dict[str, Exception]]:
+    """Time series files of a directory, a glob pattern or a list, their site names, and the errors by site.
+
+    The sites are named after their file name. When files of different directories have the same name,
+    their sites are named after their path from the directory where they differ (ex. "peatland_1/logger").
+    The files which still have the same site name (ex. "logger.csv" and "logger.csv.gz") are errors.
+    """
+    if isinstance(paths, str):
+        patterns = [os.path.join(paths, f'*.csv{extension}') for extension in ['', *COMPRESSIONS]] \
+            if os.path.isdir(paths) else [paths]
+        filepaths = sorted(filepath for pattern in patterns for filepath in glob.glob(pattern, recursive=True))
+    else:
+        filepaths = list(paths)
+
+    filepaths_by_name = defaultdict(list)
+    for filepath in filepaths:
+        filepaths_by_name[_site_name(filepath)].append(filepath)
+
+    filepaths_by_site = defaultdict(list)
+    for name, site_filepaths in filepaths_by_name.items():
+        if len(site_filepaths) == 1:
+            filepaths_by_site[name] = site_filepaths
+            continue
+
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(filepath)) for filepath in site_filepaths])
+        for filepath in site_filepaths:
+            site = os.path.relpath(os.path.join(os.path.dirname(os.path.abspath(filepath)), name), root)
+            filepaths_by_site[site.replace(os.sep, '/')].append(filepath)
+
+    sites, site_filepaths, errors = [], [], {}
+    for site, files in filepaths_by_site.items():
+        if len(files) > 1:
+            errors[site] = ValueError(f'Many files for the site "{site}": {", ".join(files)}.')
+        else:
+            sites.append(site)
+            site_filepaths.append(files[0])
+
+    return site_filepaths, sites, errors
+
+
+def _site_name(filepath: str) -> str:
+    name, extension = os.path.splitext(os.path.basename(filepath))
+    if extension.lower() in COMPRESSIONS:  # ex. "site.csv.gz"
+        name = os.path.splitext(name)[0]
+
+    return name
+
+
+def _read_site_time_series(
+        filepath: str,
+        date_format: Optional[str]) -> Tuple[Optional[pandas.DataFrame], Optional[Exception]]:
+    try:
+        return read_time_series(filepath, date_format=date_format), None
+    except Exception as error:
+        return None, error
+
+
+def _calculate_site_sy(filepath: str, parameters: Dict) -> Tuple[Optional[pandas.DataFrame], Optional[Exception]]:
+    try:
+        return calculate_sy(read_time_series(filepath), **parameters), None
+    except Exception as error:
+        return None, error
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """Entry point calculating the Sy of many sites and saving it in a CSV file."""
+    parser = argparse.ArgumentParser(description='Calculate the Specific Yield (Sy) of many time series files.')
+    parser.add_argument('path', help='Directory of time series CSV files, or glob pattern of the files.')
+    parser.add_argument('output', help='CSV file where the Sy of all the sites is saved.')
+    parser.add_argument('--gap', type=int, default=5)
+    parser.add_argument('--max-hour', type=int, default=5)
+    parser.add_argument('--threshold', type=float, default=0.3)
+    parser.add_argument('--resample', default='H')
+    parser.add_argument('--workers', type=int, default=None, help='Number of processes, defaults to the number of CPUs.')
+    arguments = parser.parse_args(arguments)
+
+    sy, errors = calculate_sy_batch(
+        arguments.path,
+        gap=arguments.gap,
+        max_hour=arguments.max_hour,
+        threshold=arguments.threshold,
+        resample=arguments.resample,
+        max_workers=arguments.workers
+    )
+    sy.to_csv(arguments.output)
+
+    for site, error in errors.items():
+        print(f'{site}: {error}', file=sys.stderr)
+
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from typing import Dict, Optional, Tuple
+
+import numpy
+import pandas
+
+# Version of the cache entries, to increment when their format or the cached results change
+CACHE_SCHEMA_VERSION = 2
+DEFAULT_MAX_CACHE_SIZE = 2 ** 30  # 1 GiB
+# The entries are named by the SHA-1 of their key, the other files and directories are not the cache's
+ENTRY_NAME = re.compile(r'[0-9a-f]{40}')
+
+TIME_SERIES_INDEX = 'date'
+TIME_SERIES_VALUES = ['data_wtd', 'data_prec']
+# The Sy is stored as a structured array, which keeps the order and the types (ex. datetime64) of its columns
+SY_ARRAY = 'sy'
+
+
+def load_time_series(
+        filepath: str,
+        cache_directory: str,
+        date_format: Optional[str] = None) -> Optional[pandas.DataFrame]:
+    """Load the cached time series of a file.
+
+    The columns are memory-mapped from the cache, they are not copied in memory
+    (the returned DataFrame is read-only).
+
+    Parameters
+    ----------
+    filepath
+        Time series file (see the `read_time_series` function).
+    cache_directory
+        Directory of the cache.
+    date_format
+        Date format given to `read_time_series` (a file read with another format is another entry).
+
+    Returns
+    -------
+    Optional[pandas.DataFrame]
+        The time series, None if the file is not in the cache (or if it changed since it was cached).
+    """
+    entry = _entry_path(filepath, cache_directory, date_format)
+    if not os.path.isdir(entry):
+        return None
+
+    try:
+        index = numpy.load(os.path.join(entry, f'{TIME_SERIES_INDEX}.npy'), mmap_mode='r')
+        values = {column: numpy.load(os.path.join(entry, f'{column}.npy'), mmap_mode='r') for column in TIME_SERIES_VALUES}
+    except OSError:  # The entry was evicted while reading it
+        return None
+
+    os.utime(entry)  # Marking the entry as recently used
+
+    return pandas.DataFrame(values, index=pandas.DatetimeIndex(index, name=TIME_SERIES_INDEX, copy=False), copy=False)
+
+
+def store_time_series(
+        filepath: str,
+        time_series: pandas.DataFrame,
+        cache_directory: str,
+        max_cache_size: int = DEFAULT_MAX_CACHE_SIZE,
+        date_format: Optional[str] = None):
+    """Store the time series of a file in the cache, then evict the least recently used entries.
+
+    Parameters
+    ----------
+    filepath
+        Time series file (see the `read_time_series` function).
+    time_series
+        The time series read from the file.
+    cache_directory
+        Directory of the cache.
+    max_cache_size
+        Maximum size of the cache directory, in bytes.
+    date_format
+        Date format given to `read_time_series`.
+    """
+    arrays = {TIME_SERIES_INDEX: time_series.index.values.astype('datetime64[ns]')}
+    for column in TIME_SERIES_VALUES:
+        arrays[column] = time_series[column].values.astype(float)
+
+    os.makedirs(cache_directory, exist_ok=True)
+    _store_entry(_entry_path(filepath, cache_directory, date_format), arrays, cache_directory, max_cache_size)
+
+
+def load_sy(key: str, cache_directory: str) -> Optional[pandas.DataFrame]:
+    """Load a cached Sy (see the `calculate_sy` function).
+
+    Parameters
+    ----------
+    key
+        Key of the Sy, from the `sy_key` function.
+    cache_directory
+        Directory of the cache.
+
+    Returns
+    -------
+    Optional[pandas.DataFrame]
+        The Sy, None if it is not in the cache.
+    """
+    entry = os.path.join(cache_directory, key)
+    try:
+        values = numpy.load(os.path.join(entry, f'{SY_ARRAY}.npy'))
+        os.utime(entry)  # Marking the entry as recently used
+    except OSError:  # Not in the cache, or evicted while reading it
+        return None
+
+    return pandas.DataFrame({column: values[column] for column in values.dtype.names})
+
+
+def store_sy(key: str, sy: pandas.DataFrame, cache_directory: str, max_cache_size: int = DEFAULT_MAX_CACHE_SIZE):
+    """Store a Sy in the cache (if it is not already), then evict the least recently used entries."""
+    entry = os.path.join(cache_directory, key)
+    if os.path.isdir(entry):
+        return
+
+    os.makedirs(cache_directory, exist_ok=True)
+    _store_entry(entry, {SY_ARRAY: sy.to_records(index=False)}, cache_directory, max_cache_size)
+
+
+def sy_key(arrays: Tuple[numpy.ndarray, ...], parameters: Tuple, algorithm_version: int) -> str:
+    """Key of the Sy of the time series arrays calculated with the parameters, by this version of the Sy calculation."""
+    key = f'{_fingerprint(*arrays)}|{parameters!r}|{algorithm_version}|{CACHE_SCHEMA_VERSION}'
+
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def evict_cache(cache_directory: str, max_cache_size: int):
+    """Remove the least recently used entries until the cache entries are smaller than `max_cache_size` bytes.
+
+    Only the entries written by the cache are considered (and removed): the directories named by a
+    SHA-1 digest and holding only numpy files. The other content of the directory is left as is.
+    """
+    entries = []
+    for name in os.listdir(cache_directory):
+        entry = os.path.join(cache_directory, name)
+        if not ENTRY_NAME.fullmatch(name) or not os.path.isdir(entry):
+            continue
+
+        filenames = os.listdir(entry)
+        if not all(filename.endswith('.npy') for filename in filenames):
+            continue
+
+        size = sum(os.path.getsize(os.path.join(entry, filename)) for filename in filenames)
+        entries.append((os.path.getmtime(entry), size, entry))
+
+    cache_size = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries):
+        if cache_size <= max_cache_size:
+            break
+
+        shutil.rmtree(entry, ignore_errors=True)
+        cache_size -= size
+
+
+def _store_entry(entry: str, arrays: Dict[str, numpy.ndarray], cache_directory: str, max_cache_size: int):
+    # Writing in a temporary directory which is then renamed, so that readers never see a partial entry
+    temporary_entry = tempfile.mkdtemp(dir=cache_directory, prefix='.tmp-')
+    for name, values in arrays.items():
+        numpy.save(os.path.join(temporary_entry, f'{name}.npy'), values)
+
+    try:
+        os.replace(temporary_entry, entry)
+    except OSError:  # Already stored by another process
+        shutil.rmtree(temporary_entry, ignore_errors=True)
+
+    evict_cache(cache_directory, max_cache_size)
+
+
+def _entry_path(filepath: str, cache_directory: str, date_format: Optional[str]) -> str:
+    stat = os.stat(filepath)
+    key = f'{os.path.abspath(filepath)}|{stat.st_mtime_ns}|{stat.st_size}|{date_format}|{CACHE_SCHEMA_VERSION}'
+
+    return os.path.join(cache_directory, hashlib.sha1(key.encode()).hexdigest())
+
+
+def _fingerprint(*arrays: numpy.ndarray) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = numpy.ascontiguousarray(array)
+        digest.update(str((array.dtype, array.shape)).encode())
+        digest.update(array.data)
+
+    return digest.hexdigest()
+
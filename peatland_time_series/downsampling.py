@@ -0,0 +1,280 @@
+from typing import NamedTuple, Tuple
+
+import numpy
+import pandas
+
+DOWNSAMPLING_METHODS = ['minmax', 'lttb']
+
+# Number of samples (or blocks of samples) per bucket below which the samples are not decimated
+MIN_SAMPLES_PER_BUCKET = 2
+# Blocks of a pyramid level per bucket (the finest level having at least this number is used)
+MIN_BLOCKS_PER_BUCKET = 4
+
+
+class _Level(NamedTuple):
+    """Blocks of consecutive samples: position of their first sample, of their min, max and first NaN values.
+
+    The positions of the min and max of blocks without value, and of the first NaN of blocks without NaN, are -1.
+    """
+    starts: numpy.ndarray
+    min_positions: numpy.ndarray
+    max_positions: numpy.ndarray
+    nan_positions: numpy.ndarray
+
+
+class WaterLevelPyramid:
+    """Multi-resolution summaries of a time series, to plot many windows of it (ex. zooms) with few points.
+
+    The level k summarizes the blocks of `factor ** k` consecutive samples by the positions of
+    their minimum and maximum water table depth (and of their first NaN). Plotting a window
+    then reads the level whose blocks are just smaller than the pixels, so that the work
+    depends on the width of the figure rather than on the number of samples in the window.
+
+    Examples
+    --------
+    ```python
+    pyramid = WaterLevelPyramid(time_series)
+
+    # The windows of all the events are plotted from the same pyramid
+    for event_index in sy.index:
+        show_water_level(time_series, sy, event_index, time_before, time_after, pyramid=pyramid, show_plot=False)
+
+    # Or directly
+    dates, water_table_depth = pyramid.water_table_depth(beginning, ending, n_buckets=1000)
+    edges, precipitation = pyramid.precipitation(beginning, ending, n_buckets=1000)
+    ```
+
+    Parameters
+    ----------
+    time_series
+        Time series as a DataFrame (from `read_time_series`), sorted by date.
+    factor
+        Number of blocks of a level summarized by each block of the next level.
+    min_blocks
+        The levels are added until they have less than this number of blocks.
+    """
+
+    def __init__(self, time_series: pandas.DataFrame, factor: int = 4, min_blocks: int = 1000):
+        if factor < 2:
+            raise ValueError('The "factor" parameter must be at least 2.')
+
+        self._timestamps = time_series.index.values.astype('datetime64[ns]', copy=False).view('i8')
+        self._water_table_depth = time_series['data_wtd'].values.astype(float, copy=False)
+        self.factor = factor
+        self._precipitation_sums = _cumulative_sums(time_series['data_prec'].values)
+
+        self.levels = [_samples_level(self._water_table_depth)]
+        while len(self.levels[-1].starts) >= max(min_blocks, 2) * factor:
+            self.levels.append(_coarsen(self.levels[-1], self._water_table_depth, factor))
+
+    def water_table_depth(
+            self,
+            beginning: pandas.Timestamp,
+            ending: pandas.Timestamp,
+            n_buckets: int,
+            method: str = 'minmax') -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Decimated water table depth between two dates (included), to plot in `n_buckets` pixels.
+
+        Parameters
+        ----------
+        beginning
+            Beginning of the window.
+        ending
+            Ending of the window (included).
+        n_buckets
+            Number of buckets, usually the width of the plot in pixels.
+        method
+            "minmax" to keep the first and last samples, the minimum and maximum of every bucket
+            and the first NaN of the buckets having some (so that the gaps of the line are kept),
+            or "lttb" to select `n_buckets` points of these with the Largest-Triangle-Three-Buckets
+            algorithm (smoother, but the NaN are dropped).
+
+        Returns
+        -------
+        Tuple[numpy.ndarray, numpy.ndarray]
+            The dates (datetime64) and water table depth of the selected samples.
+        """
+        if method not in DOWNSAMPLING_METHODS:
+            raise ValueError(f'Unknown downsampling method "{method}", expected one of {DOWNSAMPLING_METHODS}.')
+
+        start, stop = self._window_positions(beginning, ending)
+        positions = self._min_max_positions(start, stop, n_buckets)
+        dates, water_table_depth = self._timestamps[positions], self._water_table_depth[positions]
+
+        if method == 'lttb':
+            is_valid = ~numpy.isnan(water_table_depth)
+            dates, water_table_depth = dates[is_valid], water_table_depth[is_valid]
+            selected = largest_triangle_three_buckets(dates.astype(float), water_table_depth, n_buckets)
+            dates, water_table_depth = dates[selected], water_table_depth[selected]
+
+        return dates.view('datetime64[ns]'), water_table_depth
+
+    def precipitation(
+            self,
+            beginning: pandas.Timestamp,
+            ending: pandas.Timestamp,
+            n_buckets: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Sums of the precipitation in `n_buckets` buckets of equal durations between two dates (included).
+
+        Returns
+        -------
+        Tuple[numpy.ndarray, numpy.ndarray]
+            The edges of the buckets (datetime64, `n_buckets + 1` dates) and the sums of precipitation.
+        """
+        beginning, ending = pandas.Timestamp(beginning).value, pandas.Timestamp(ending).value
+        edges = beginning + (numpy.arange(n_buckets + 1) * ((ending - beginning) / n_buckets)).astype('i8')
+        edges[-1] = ending
+
+        positions = numpy.searchsorted(self._timestamps, edges, side='left')
+        positions[-1] = numpy.searchsorted(self._timestamps, ending, side='right')  # The ending is included
+        sums = numpy.maximum(numpy.diff(self._precipitation_sums[positions]), 0)  # Without the rounding errors
+
+        return edges.view('datetime64[ns]'), sums
+
+    def _window_positions(self, beginning: pandas.Timestamp, ending: pandas.Timestamp) -> Tuple[int, int]:
+        start = numpy.searchsorted(self._timestamps, pandas.Timestamp(beginning).value, side='left')
+        stop = numpy.searchsorted(self._timestamps, pandas.Timestamp(ending).value, side='right')
+
+        return int(start), int(stop)
+
+    def _min_max_positions(self, start: int, stop: int, n_buckets: int) -> numpy.ndarray:
+        """Sorted positions of the first, last, min, max and first NaN samples of the buckets of the window."""
+        n_samples = stop - start
+        if n_samples <= MIN_SAMPLES_PER_BUCKET * n_buckets:
+            return numpy.arange(start, stop)
+
+        # The coarsest level having enough blocks per bucket
+        level_index = 0
+        while (level_index + 1 < len(self.levels)
+               and n_samples // self.factor ** (level_index + 1) >= MIN_BLOCKS_PER_BUCKET * n_buckets):
+            level_index += 1
+        level = self.levels[level_index]
+
+        first_block, last_block = numpy.searchsorted(level.starts, [start, stop], side='left')
+        starts = level.starts[first_block:last_block]
+        beginning, ending = self._timestamps[start], self._timestamps[stop - 1]
+        buckets = ((self._timestamps[starts] - beginning) * (n_buckets / max(ending - beginning, 1))).astype(int)
+        buckets = numpy.minimum(buckets, n_buckets - 1)
+
+        block_slice = slice(first_block, last_block)
+        positions = [
+            [start, stop - 1],
+            _bucket_first(*_sort_by_value(buckets, level.min_positions[block_slice], self._water_table_depth)),
+            _bucket_first(*_sort_by_value(buckets, level.max_positions[block_slice], self._water_table_depth, -1)),
+            _bucket_first(buckets, level.nan_positions[block_slice]),
+        ]
+        positions = numpy.unique(numpy.concatenate(positions))
+
+        # The blocks of a coarse level may overflow the window
+        return positions[(positions >= start) & (positions < stop)]
+
+
+def largest_triangle_three_buckets(x: numpy.ndarray, y: numpy.ndarray, n_out: int) -> numpy.ndarray:
+    """Select `n_out` points of a line with the Largest-Triangle-Three-Buckets algorithm (Steinarsson, 2013).
+
+    The first and last points are kept, and the other points are split into `n_out - 2`
+    buckets. In each bucket, the point forming the largest triangle with the point selected
+    in the previous bucket and the mean of the next bucket is selected.
+
+    Parameters
+    ----------
+    x
+        Sorted x values of the points.
+    y
+        y values of the points (without NaN).
+    n_out
+        Number of points to select.
+
+    Returns
+    -------
+    numpy.ndarray
+        The sorted positions of the selected points.
+    """
+    if n_out < 3:
+        raise ValueError('The "n_out" parameter must be at least 3.')
+
+    n = len(x)
+    if n_out >= n:
+        return numpy.arange(n)
+
+    boundaries = (numpy.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(int) + 1
+    boundaries[-1] = n - 1
+    # Mean of each bucket, the last point being the "bucket" following the last one
+    counts = numpy.diff(boundaries)
+    mean_x = numpy.append(numpy.add.reduceat(x[1:n - 1], boundaries[:-1] - 1) / counts, x[-1])
+    mean_y = numpy.append(numpy.add.reduceat(y[1:n - 1], boundaries[:-1] - 1) / counts, y[-1])
+
+    selected = numpy.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = boundaries[bucket], boundaries[bucket + 1]
+        areas = numpy.abs(
+            (x[previous] - mean_x[bucket + 1]) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (mean_y[bucket + 1] - y[previous])
+        )
+        previous = start + int(numpy.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def _cumulative_sums(values: numpy.ndarray) -> numpy.ndarray:
+    """Sums of the `i` first values (NaN counted as 0), for `i` from 0 to `len(values)`."""
+    return numpy.concatenate(([0.], numpy.cumsum(numpy.nan_to_num(values.astype(float, copy=False)))))
+
+
+def _samples_level(values: numpy.ndarray) -> _Level:
+    positions = numpy.arange(len(values))
+    is_nan = numpy.isnan(values)
+    valid_positions = numpy.where(is_nan, -1, positions)
+
+    return _Level(positions, valid_positions, valid_positions, numpy.where(is_nan, positions, -1))
+
+
+def _coarsen(level: _Level, values: numpy.ndarray, factor: int) -> _Level:
+    """The level of the blocks of `factor` consecutive blocks of `level`."""
+    n_blocks = -(-len(level.starts) // factor)
+    padding = n_blocks * factor - len(level.starts)
+
+    def grouped(positions: numpy.ndarray) -> numpy.ndarray:
+        return numpy.pad(positions, (0, padding), constant_values=-1).reshape(n_blocks, factor)
+
+    rows = numpy.arange(n_blocks)
+    min_positions, max_positions = grouped(level.min_positions), grouped(level.max_positions)
+    min_values = numpy.where(min_positions >= 0, values[min_positions], numpy.inf)
+    max_values = numpy.where(max_positions >= 0, values[max_positions], -numpy.inf)
+
+    nan_positions = grouped(level.nan_positions)
+    first_nan = numpy.where(nan_positions >= 0, nan_positions, numpy.iinfo(nan_positions.dtype).max).min(axis=1)
+
+    return _Level(
+        level.starts[::factor],
+        min_positions[rows, min_values.argmin(axis=1)],
+        max_positions[rows, max_values.argmax(axis=1)],
+        numpy.where(first_nan < numpy.iinfo(nan_positions.dtype).max, first_nan, -1),
+    )
+
+
+def _sort_by_value(
+        buckets: numpy.ndarray,
+        positions: numpy.ndarray,
+        values: numpy.ndarray,
+        sign: int = 1) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """The buckets and positions sorted by bucket, then by value (times the sign), the invalid positions last.
+
+    The first valid position of each bucket is the one of its min (or its max with a sign of -1).
+    """
+    order = numpy.lexsort((numpy.where(positions >= 0, sign * values[positions], numpy.nan), buckets))
+
+    return buckets[order], positions[order]
+
+
+def _bucket_first(buckets: numpy.ndarray, positions: numpy.ndarray) -> numpy.ndarray:
+    """First valid (not -1) position of each bucket."""
+    is_valid = positions >= 0
+    buckets, positions = buckets[is_valid], positions[is_valid]
+    is_first = numpy.concatenate(([True], buckets[1:] != buckets[:-1])) if len(buckets) else numpy.zeros(0, dtype=bool)
+
+    return positions[is_first]
+
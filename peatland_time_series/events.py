@@ -0,0 +1,176 @@
+from typing import Tuple
+
+import numpy
+
+# numpy sums 8 elements or more with a pairwise algorithm, while `bincount` sums sequentially.
+# Segments at least this long are summed individually to keep the results bit-identical to `numpy.sum`.
+PAIRWISE_SUM_MIN_LENGTH = 8
+
+
+def find_events(precipitation: numpy.ndarray, threshold: float, gap: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Find the precipitation events of a (resampled) precipitation series.
+
+    The positions where the precipitation is above the threshold are segmented
+    into events: a new event begins when two consecutive positions are at least
+    `gap` steps apart. The segment following the last gap is never closed, so
+    it is not counted as an event.
+
+    Parameters
+    ----------
+    precipitation
+        Array of the resampled precipitation.
+    threshold
+        Precipitation threshold.
+    gap
+        Number of steps which makes it possible to isolate rainy events.
+
+    Returns
+    -------
+    Tuple[numpy.ndarray, numpy.ndarray]
+        The positions where the precipitation is above the threshold and the boundaries of the events.
+        The event `j` is made of the positions `positions[boundaries[j]:boundaries[j + 1]]`.
+    """
+    positions = numpy.flatnonzero(precipitation > threshold)
+    gaps = numpy.flatnonzero(numpy.diff(positions) >= gap)
+    boundaries = numpy.concatenate(([0], gaps + 1))
+
+    return positions, boundaries
+
+
+def segment_sum(values: numpy.ndarray, boundaries: numpy.ndarray) -> numpy.ndarray:
+    """Sum the consecutive segments `values[boundaries[j]:boundaries[j + 1]]` in one batch.
+
+    Parameters
+    ----------
+    values
+        Array of values to sum.
+    boundaries
+        Increasing array of segment boundaries (see `find_events`).
+
+    Returns
+    -------
+    numpy.ndarray
+        The sum of each segment, identical to calling `numpy.sum` on each of them.
+    """
+    starts, stops = boundaries[:-1], boundaries[1:]
+    lengths = stops - starts
+
+    # Labelling each value with the id of its segment
+    labels = numpy.repeat(numpy.arange(len(lengths)), lengths)
+    # Without segment, bincount returns integers
+    sums = numpy.bincount(labels, weights=values[:len(labels)], minlength=len(lengths)).astype(float, copy=False)
+
+    for j in numpy.flatnonzero(lengths >= PAIRWISE_SUM_MIN_LENGTH):
+        sums[j] = values[starts[j]:stops[j]].sum()
+
+    return sums
+
+
+def window_extrema(
+        values: numpy.ndarray,
+        starts: numpy.ndarray,
+        stops: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Compute the extrema of the (possibly overlapping) windows `values[starts[i]:stops[i]]` in one batch.
+
+    Parameters
+    ----------
+    values
+        Array of values.
+    starts
+        Start (inclusive) of each window.
+    stops
+        Stop (exclusive) of each window, must be greater than the start.
+
+    Returns
+    -------
+    Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]
+        The maximum and the minimum of each window (NaN if the window contains a NaN, like `numpy.max`),
+        and the positions in `values` of the first maximum and the first minimum ignoring the NaNs
+        (like `pandas.Series.idxmax`), -1 if the window only contains NaNs.
+    """
+    if len(starts) == 0:
+        return numpy.zeros(0), numpy.zeros(0), numpy.zeros(0, dtype=int), numpy.zeros(0, dtype=int)
+
+    lengths = stops - starts
+    if (lengths < 1).any():
+        raise ValueError('Windows must contain at least one value.')
+
+    # Gathering the windows one after the other, so that overlapping windows become consecutive segments
+    offsets = numpy.cumsum(lengths) - lengths
+    indices = numpy.arange(lengths.sum()) + numpy.repeat(starts - offsets, lengths)
+    window_values = values[indices]
+
+    maxima = numpy.maximum.reduceat(window_values, offsets)
+    minima = numpy.minimum.reduceat(window_values, offsets)
+
+    argmax = _first_position_of(numpy.fmax.reduceat(window_values, offsets), window_values, indices, offsets, lengths)
+    argmin = _first_position_of(numpy.fmin.reduceat(window_values, offsets), window_values, indices, offsets, lengths)
+
+    return maxima, minima, argmax, argmin
+
+
+def _first_position_of(
+        targets: numpy.ndarray,
+        window_values: numpy.ndarray,
+        indices: numpy.ndarray,
+        offsets: numpy.ndarray,
+        lengths: numpy.ndarray) -> numpy.ndarray:
+    is_target = window_values == numpy.repeat(targets, lengths)
+    candidates = numpy.where(is_target, numpy.arange(len(window_values)), len(window_values))
+    first = numpy.minimum.reduceat(candidates, offsets)
+
+    found = first < len(window_values)
+    positions = numpy.full(len(targets), -1)
+    positions[found] = indices[first[found]]
+
+    return positions
+
+
+def extended_window_maxima(
+        values: numpy.ndarray,
+        starts: numpy.ndarray,
+        ends: numpy.ndarray,
+        extensions: range) -> numpy.ndarray:
+    """Compute the maxima of the windows `values[starts[i]:ends[i] + extension]` for every extension.
+
+    The maxima of the first extension are computed in batch, then each window is
+    extended one step at a time, updating its running maximum, so that the cost of
+    a wider sweep is one vector operation per additional step.
+
+    Parameters
+    ----------
+    values
+        Array of values.
+    starts
+        Start (inclusive) of each window.
+    ends
+        Reference end of each window, the window stops (exclusive) at `ends + extension`.
+    extensions
+        Increasing range of extensions.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape `(len(extensions), len(starts))` of the maxima (NaN if the window contains a NaN, like `numpy.max`).
+    """
+    if extensions.step < 1:
+        raise ValueError('The extensions must be an increasing range.')
+
+    maxima = numpy.empty((len(extensions), len(starts)))
+    if len(extensions) == 0:
+        return maxima
+
+    first_maxima, _, _, _ = window_extrema(values, starts, numpy.minimum(ends + extensions[0], len(values)))
+    maxima[0] = first_maxima
+
+    for i in range(1, len(extensions)):
+        running_maxima = maxima[i - 1].copy()
+
+        for offset in range(extensions[i - 1], extensions[i]):
+            positions = ends + offset
+            inside = positions < len(values)
+            running_maxima[inside] = numpy.maximum(running_maxima[inside], values[positions[inside]])
+
+        maxima[i] = running_maxima
+
+    return maxima
@@ -1,5 +1,6 @@
-from typing import Optional
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple, Union
 
+import numpy
 import pandas
 
 
@@ -60,8 +61,7 @@ def filter_sy(
     pandas.DataFrame
         The Filtered Specific Yield (Sy).
     """
-    return _filter_sy(
-        sy,
+    return SyFilter(
         sy_min=sy_min,
         sy_max=sy_max,
         precipitation_sum_min=precipitation_sum_min,
@@ -78,18 +78,207 @@ def filter_sy(
         intensities_max=intensities_max,
         durations_min=durations_min,
         durations_max=durations_max
-    )
+    ).apply(sy)
+
+
+class SyFilter:
+    """Filter of the Specific Yield (Sy), reusable on many Sy DataFrames.
+
+    The bounds are parsed once, then all of them are combined in a single
+    boolean mask, so that the Sy DataFrame is indexed only once.
+    The bounds are inclusive, and a bound of `None` is ignored.
+
+    Examples
+    --------
+    ```python
+    sy_filter = SyFilter(sy_min=0, delta_h_min=.01, precipitation_sum_min=10, precipitation_sum_max=100)
+
+    filtered_sy1 = sy_filter.apply(sy1)
+    filtered_sy2 = sy_filter.apply(sy2)
+    ```
+
+    Parameters
+    ----------
+    See the `filter_sy` function.
+    """
+
+    def __init__(
+            self,
+            sy_min: Optional[float] = None,
+            sy_max: Optional[float] = None,
+            precipitation_sum_min: Optional[float] = None,
+            precipitation_sum_max: Optional[float] = None,
+            depth_min: Optional[float] = None,
+            depth_max: Optional[float] = None,
+            delta_h_min: Optional[float] = None,
+            delta_h_max: Optional[float] = None,
+            date_beginning_min: Optional[pandas.Timestamp] = None,
+            date_beginning_max: Optional[pandas.Timestamp] = None,
+            date_ending_min: Optional[pandas.Timestamp] = None,
+            date_ending_max: Optional[pandas.Timestamp] = None,
+            intensities_min: Optional[float] = None,
+            intensities_max: Optional[float] = None,
+            durations_min: Optional[float] = None,
+            durations_max: Optional[float] = None):
+        bounds = dict(
+            sy_min=sy_min,
+            sy_max=sy_max,
+            precipitation_sum_min=precipitation_sum_min,
+            precipitation_sum_max=precipitation_sum_max,
+            depth_min=depth_min,
+            depth_max=depth_max,
+            delta_h_min=delta_h_min,
+            delta_h_max=delta_h_max,
+            date_beginning_min=date_beginning_min,
+            date_beginning_max=date_beginning_max,
+            date_ending_min=date_ending_min,
+            date_ending_max=date_ending_max,
+            intensities_min=intensities_min,
+            intensities_max=intensities_max,
+            durations_min=durations_min,
+            durations_max=durations_max
+        )
+
+        # List of (column, min_or_max, value)
+        self.criteria: List[Tuple[str, str, Any]] = []
+        for key, value in bounds.items():
+            if value is not None:
+                column, min_or_max = key.rsplit('_', 1)  # Only split on the last occurence
+                self.criteria.append((column, min_or_max, value))
+
+    def mask(self, sy: pandas.DataFrame) -> numpy.ndarray:
+        """Boolean mask of the Sy rows within all the bounds."""
+        mask = numpy.ones(len(sy), dtype=bool)
+        within_bound = numpy.empty(len(sy), dtype=bool)
+
+        for column, min_or_max, value in self.criteria:
+            values = sy[column].values
+            if numpy.issubdtype(values.dtype, numpy.datetime64):
+                value = pandas.Timestamp(value).to_datetime64()
+
+            if min_or_max == 'min':
+                numpy.greater_equal(values, value, out=within_bound)
+            else:
+                numpy.less_equal(values, value, out=within_bound)
+
+            mask &= within_bound
+
+        return mask
+
+    def apply(self, sy: pandas.DataFrame) -> pandas.DataFrame:
+        """Filter the Sy DataFrame.
+
+        Parameters
+        ----------
+        sy
+            The specific yield dataframe, which has the format
+            outputed by the calculated_sy function.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The Filtered Specific Yield (Sy).
+        """
+        if not self.criteria:
+            return sy
+
+        return sy[self.mask(sy)]
 
 
-def _filter_sy(sy: pandas.DataFrame, **kwargs) -> pandas.DataFrame:
-    for key, value in kwargs.items():
-        if value:
-            key, min_or_max = key.rsplit('_', 1)  # Only split on the last occurence
+def evaluate_sy_filters(
+        sy: pandas.DataFrame,
+        sy_filters: Union[Dict[Hashable, SyFilter], List[SyFilter]],
+        columns: Iterable[str] = ('sy', 'depth')) -> Tuple[pandas.DataFrame, pandas.DataFrame]:
+    """Evaluate many Sy filters (presets) at once on the same Sy DataFrame.
+
+    The bounds of all the filters are stacked in arrays and compared to the Sy
+    columns by broadcasting, so each column is scanned once for all the filters.
+
+    Examples
+    --------
+    ```python
+    presets = {
+        'strict': SyFilter(sy_min=0, delta_h_min=.01, precipitation_sum_min=10, precipitation_sum_max=100),
+        'loose': SyFilter(sy_min=0, precipitation_sum_min=2),
+    }
+    membership, summary = evaluate_sy_filters(sy, presets)
+
+    sy.loc[membership.loc['strict']]  # Same as presets['strict'].apply(sy)
+    summary['count']
+    ```
+
+    Parameters
+    ----------
+    sy
+        The specific yield dataframe, which has the format
+        outputed by the calculated_sy function.
+    sy_filters
+        The filters, by name (or as a list, named by their position).
+    columns
+        The Sy columns summarized for each filter.
+
+    Returns
+    -------
+    Tuple[pandas.DataFrame, pandas.DataFrame]
+        The boolean membership matrix (one row per filter, one column per Sy event)
+        and the summary of each filter: the number of events kept ('count'), and the
+        mean, standard deviation, minimum and maximum of the summarized columns
+        (ex. 'sy_mean', ignoring the NaN and infinite values).
+    """
+    if not isinstance(sy_filters, dict):
+        sy_filters = dict(enumerate(sy_filters))
+
+    membership = numpy.ones((len(sy_filters), len(sy)), dtype=bool)
+
+    criteria_columns = {column for sy_filter in sy_filters.values() for column, _, _ in sy_filter.criteria}
+    for column in criteria_columns:
+        values = sy[column].values
+        is_datetime = numpy.issubdtype(values.dtype, numpy.datetime64)
+
+        for min_or_max in ('min', 'max'):
+            # Bound of each filter, `has_bound` is False for the filters without this bound
+            has_bound = numpy.zeros(len(sy_filters), dtype=bool)
+            # Float bounds, so a fractional bound on an integer column is not truncated
+            bounds = numpy.zeros(len(sy_filters), dtype=values.dtype if is_datetime else float)
+            for i, sy_filter in enumerate(sy_filters.values()):
+                for criterion_column, criterion_min_or_max, value in sy_filter.criteria:
+                    if criterion_column == column and criterion_min_or_max == min_or_max:
+                        has_bound[i] = True
+                        bounds[i] = pandas.Timestamp(value).to_datetime64() if is_datetime else value
+
+            if not has_bound.any():
+                continue
 
             if min_or_max == 'min':
-                sy = sy[sy[key] >= value]
+                within_bound = values[numpy.newaxis, :] >= bounds[has_bound, numpy.newaxis]
+            else:
+                within_bound = values[numpy.newaxis, :] <= bounds[has_bound, numpy.newaxis]
+
+            membership[has_bound] &= within_bound
+
+    # Statistics of each filter as matrix products of the membership matrix and the (finite) values
+    weights = membership.astype(float)
+    summary = {'count': membership.sum(axis=1)}
+
+    with numpy.errstate(invalid='ignore', divide='ignore'):  # Filters keeping no value have NaN statistics
+        for column in columns:
+            values = sy[column].values.astype(float)
+            is_finite = numpy.isfinite(values)
+            # Centering the values on their global mean to reduce the cancellation in the variance
+            center = values[is_finite].mean() if is_finite.any() else 0
+            centered_values = numpy.where(is_finite, values - center, 0)
+
+            count = weights @ is_finite
+            mean = (weights @ centered_values) / count
+            variance = ((weights @ centered_values ** 2) - count * mean ** 2) / (count - 1)
+
+            summary[f'{column}_mean'] = mean + center
+            summary[f'{column}_std'] = numpy.sqrt(numpy.maximum(variance, 0))
+            summary[f'{column}_min'] = numpy.where(membership & is_finite, values, numpy.inf).min(axis=1, initial=numpy.inf)
+            summary[f'{column}_max'] = numpy.where(membership & is_finite, values, -numpy.inf).max(axis=1, initial=-numpy.inf)
+            summary[f'{column}_min'][count == 0] = numpy.nan
+            summary[f'{column}_max'][count == 0] = numpy.nan
 
-            elif min_or_max == 'max':
-                sy = sy[sy[key] <= value]
+    names = pandas.Index(list(sy_filters), name='filter')
 
-    return sy
+    return pandas.DataFrame(membership, index=names, columns=sy.index), pandas.DataFrame(summary, index=names)
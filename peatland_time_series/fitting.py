@@ -0,0 +1,436 @@
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+from warnings import warn
+
+import numpy
+import pandas
+from scipy.optimize import curve_fit, least_squares
+
+from .cache import _fingerprint
+from .util import power_law
+
+FIT_CACHE_SIZE = 128
+BOOTSTRAP_BLOCK_ELEMENTS = 2 ** 22  # Maximum size of the resampled arrays of a block of replicates
+LEAST_SQUARES_MAX_ITERATIONS = 100
+LEAST_SQUARES_TOLERANCE = 1e-10  # Relative decrease of the cost of a replicate which stops its iterations
+
+# Fits of the depth in function of Sy, by (fingerprint of the data, depth column, method, loss)
+_depth_fits: 'OrderedDict[Tuple[str, str, str, str], PowerLawFit]' = OrderedDict()
+
+
+FIT_METHODS = ['least_squares', 'loglog', 'curve_fit']
+
+
+class PowerLawFit(NamedTuple):
+    """Result of the fit of `y = a * x^b` (see `util.power_law`)."""
+    a: float
+    b: float
+    covariance: numpy.ndarray
+    method: str = 'curve_fit'
+    converged: bool = True
+    n_evaluations: int = 0
+    residual_standard_deviation: float = numpy.nan
+
+    @property
+    def standard_deviation_a(self) -> float:
+        return float(numpy.sqrt(self.covariance[0, 0]))
+
+    @property
+    def standard_deviation_b(self) -> float:
+        return float(numpy.sqrt(self.covariance[1, 1]))
+
+    def __call__(self, x: numpy.ndarray) -> numpy.ndarray:
+        return power_law(x, self.a, self.b)
+
+
+def fit_power_law(x: numpy.ndarray, y: numpy.ndarray, method: str = 'least_squares', loss: str = 'linear') -> PowerLawFit:
+    """Fit `y = a * x^b` (see `util.power_law`).
+
+    Methods
+    -------
+    'least_squares'
+        Non-linear least squares on `y`, starting from the 'loglog' solution
+        and using the analytic Jacobian of `a * x^b`.
+    'loglog'
+        Closed form linear least squares of `log|y| = log|a| + b * log(x)`. It needs
+        positive x values and y values of the same sign, the other points are ignored.
+    'curve_fit'
+        `scipy.optimize.curve_fit` without initial guess (the former behaviour).
+
+    Parameters
+    ----------
+    x
+        Array of the x values.
+    y
+        Array of the y values.
+    method
+        Fitting method, one of 'least_squares' (default), 'loglog' or 'curve_fit'.
+    loss
+        Loss of the 'least_squares' method, 'linear' (default) or a robust loss
+        less sensitive to outliers: 'soft_l1', 'huber', 'cauchy' or 'arctan'
+        (see `scipy.optimize.least_squares`).
+
+    Returns
+    -------
+    PowerLawFit
+        The parameters a and b, their covariance and the fit diagnostics.
+    """
+    x, y = numpy.asarray(x, dtype=float), numpy.asarray(y, dtype=float)
+
+    if method == 'least_squares':
+        return _fit_least_squares(x, y, loss)
+    if method == 'loglog':
+        return _fit_loglog(x, y)
+    if method == 'curve_fit':
+        parameters, covariance, information, _, status = curve_fit(f=power_law, xdata=x, ydata=y, full_output=True)
+        return PowerLawFit(
+            a=parameters[0],
+            b=parameters[1],
+            covariance=covariance,
+            method=method,
+            converged=status in (1, 2, 3, 4),
+            n_evaluations=information['nfev'],
+            residual_standard_deviation=_residual_standard_deviation(information['fvec'])
+        )
+
+    raise ValueError(f'Unknown fitting method "{method}", expected one of: {", ".join(FIT_METHODS)}.')
+
+
+def _fit_loglog(x: numpy.ndarray, y: numpy.ndarray) -> PowerLawFit:
+    sign = 1.0 if numpy.sum(y > 0) >= numpy.sum(y < 0) else -1.0
+    is_valid = (x > 0) & (sign * y > 0)
+    if is_valid.sum() < 2:
+        raise ValueError('The "loglog" method needs at least 2 points with a positive x and a y of the same sign.')
+
+    log_x, log_y = numpy.log(x[is_valid]), numpy.log(sign * y[is_valid])
+
+    # Linear least squares of log_y = log_a + b * log_x
+    design = numpy.column_stack((numpy.ones_like(log_x), log_x))
+    (log_a, b), _, _, _ = numpy.linalg.lstsq(design, log_y, rcond=None)
+    residuals = log_y - design @ (log_a, b)
+    log_covariance = numpy.linalg.pinv(design.T @ design) * _residual_variance(residuals, n_parameters=2)
+
+    # Covariance of (a, b) from the covariance of (log|a|, b), since d(a)/d(log|a|) = a
+    a = sign * numpy.exp(log_a)
+    jacobian = numpy.array([a, 1.0])
+
+    return PowerLawFit(
+        a=a,
+        b=b,
+        covariance=numpy.outer(jacobian, jacobian) * log_covariance,
+        method='loglog',
+        residual_standard_deviation=_residual_standard_deviation(y - power_law(x, a, b))
+    )
+
+
+def _fit_least_squares(x: numpy.ndarray, y: numpy.ndarray, loss: str) -> PowerLawFit:
+    try:
+        initial_fit = _fit_loglog(x, y)
+        initial_parameters = (initial_fit.a, initial_fit.b)
+    except ValueError:
+        initial_parameters = (1.0, 1.0)  # Like curve_fit
+
+    def residuals(parameters):
+        a, b = parameters
+        return power_law(x, a, b) - y
+
+    def jacobian(parameters):
+        a, b = parameters
+        x_power_b = numpy.power(x, b)
+        return numpy.column_stack((x_power_b, a * x_power_b * numpy.log(x)))
+
+    result = least_squares(residuals, initial_parameters, jac=jacobian, loss=loss, method='lm' if loss == 'linear' else 'trf')
+
+    # Covariance like curve_fit, scaled by the variance of the residuals
+    _, singular_values, vt = numpy.linalg.svd(result.jac, full_matrices=False)
+    threshold = numpy.finfo(float).eps * max(result.jac.shape) * singular_values[0]
+    singular_values = singular_values[singular_values > threshold]
+    vt = vt[:len(singular_values)]
+    covariance = (vt.T / singular_values ** 2) @ vt * _residual_variance(result.fun, n_parameters=2)
+
+    return PowerLawFit(
+        a=result.x[0],
+        b=result.x[1],
+        covariance=covariance,
+        method='least_squares',
+        converged=result.status > 0,
+        n_evaluations=result.nfev,
+        residual_standard_deviation=_residual_standard_deviation(result.fun)
+    )
+
+
+def _residual_variance(residuals: numpy.ndarray, n_parameters: int) -> float:
+    if len(residuals) <= n_parameters:
+        return numpy.inf
+
+    return float(numpy.sum(residuals ** 2) / (len(residuals) - n_parameters))
+
+
+def _residual_standard_deviation(residuals: numpy.ndarray) -> float:
+    return float(numpy.sqrt(numpy.mean(residuals ** 2)))
+
+
+class PowerLawBands(NamedTuple):
+    """Bootstrap bands of the fit of `y = a * x^b`, evaluated at the `x` values."""
+    x: numpy.ndarray
+    fit: numpy.ndarray
+    confidence_lower: numpy.ndarray
+    confidence_upper: numpy.ndarray
+    prediction_lower: numpy.ndarray
+    prediction_upper: numpy.ndarray
+    a: numpy.ndarray
+    b: numpy.ndarray
+
+
+def bootstrap_power_law(
+        x: numpy.ndarray,
+        y: numpy.ndarray,
+        x_values: Optional[numpy.ndarray] = None,
+        n_replicates: int = 1000,
+        confidence: float = 0.95,
+        seed: Optional[int] = None,
+        method: str = 'least_squares') -> PowerLawBands:
+    """Bootstrap confidence and prediction bands of the fit of `y = a * x^b`.
+
+    The data points are resampled with replacement `n_replicates` times, and all the
+    replicates are fitted at once with the same model as `fit_power_law`. The confidence
+    band is the spread of the fitted curves, the prediction band also adds the residuals
+    of new observations.
+
+    Examples
+    --------
+    ```python
+    bands = bootstrap_power_law(sy['sy'].values, sy['min_wtd'].values * 100, n_replicates=10_000)
+    plt.fill_between(bands.x, bands.confidence_lower, bands.confidence_upper, alpha=.3)
+    ```
+
+    Methods
+    -------
+    'least_squares'
+        Non-linear least squares on `y` (the curve of `fit_power_law` and `show_depth`).
+        The replicates are refitted together by Levenberg-Marquardt iterations starting
+        from the fit of all the points, and the residuals of the predictions are added to y.
+    'loglog'
+        Closed form log-log least squares, the residuals are added in log scale. The points
+        without a positive x and a y of the same sign as most of the y values are ignored
+        (with a warning).
+
+    Parameters
+    ----------
+    x
+        Array of the x values.
+    y
+        Array of the y values.
+    x_values
+        Optional, x values where the bands are evaluated.
+        By default, 100 values from the minimum to the maximum positive x.
+    n_replicates
+        Number of bootstrap replicates.
+    confidence
+        Confidence level of the bands, ex. 0.95 for the 2.5 and 97.5 percentiles.
+    seed
+        Optional, seed of the random resampling.
+    method
+        Fitting method, 'least_squares' (default) or 'loglog'.
+
+    Returns
+    -------
+    PowerLawBands
+        The bands evaluated at the x values, with the a and b parameters of each replicate.
+    """
+    x, y = numpy.asarray(x, dtype=float), numpy.asarray(y, dtype=float)
+    if method == 'least_squares':
+        fit = _fit_least_squares(x, y, loss='linear')
+        # The curves and the residuals are in the scale of y
+        transform = inverse_transform = numpy.asarray
+        fit_replicates = _fit_power_laws_least_squares
+        initial_parameters = (fit.a, fit.b)
+    elif method == 'loglog':
+        fit = _fit_loglog(x, y)
+        sign = numpy.sign(fit.a)
+        is_valid = (x > 0) & (sign * y > 0)
+        if not is_valid.all():
+            warn(f'{numpy.sum(~is_valid)} points without a positive x and a y of the same sign as most y values '
+                 f'are ignored by the "loglog" bootstrap.')
+        x, y = x[is_valid], y[is_valid]
+        # The curves and the residuals are in log scale
+        transform, inverse_transform = (lambda values: numpy.log(sign * values)), (lambda values: sign * numpy.exp(values))
+        fit_replicates = _fit_power_laws_loglog
+        initial_parameters = None
+    else:
+        raise ValueError(f'Unknown bootstrap method "{method}", expected one of: least_squares, loglog.')
+
+    residuals = transform(y) - transform(fit(x))
+
+    if x_values is None:
+        log_x = numpy.log(x[x > 0])
+        x_values = numpy.exp(numpy.linspace(log_x.min(), log_x.max(), 100))
+    x_values = numpy.asarray(x_values, dtype=float)
+
+    random = numpy.random.default_rng(seed)
+    a, b = numpy.empty(n_replicates), numpy.empty(n_replicates)
+
+    # Replicates fitted by blocks, to bound the size of the resampled index matrices
+    block_size = max(1, BOOTSTRAP_BLOCK_ELEMENTS // len(x))
+    for start in range(0, n_replicates, block_size):
+        stop = min(start + block_size, n_replicates)
+        indexes = random.integers(0, len(x), size=(stop - start, len(x)))
+        a[start:stop], b[start:stop] = fit_replicates(x[indexes], y[indexes], initial_parameters)
+
+    # Curves of the replicates (replicate x value), and new observations around them
+    with numpy.errstate(invalid='ignore'):  # Replicates which could not be fitted are NaN
+        curves = transform(power_law(x_values, a[:, None], b[:, None]))
+    predictions = curves + residuals[random.integers(0, len(residuals), size=curves.shape)]
+
+    percentiles = 50 * (1 - confidence), 50 * (1 + confidence)
+    confidence_band = inverse_transform(numpy.nanpercentile(curves, percentiles, axis=0))
+    prediction_band = inverse_transform(numpy.nanpercentile(predictions, percentiles, axis=0))
+
+    return PowerLawBands(
+        x=x_values,
+        fit=fit(x_values),
+        confidence_lower=confidence_band.min(axis=0),
+        confidence_upper=confidence_band.max(axis=0),
+        prediction_lower=prediction_band.min(axis=0),
+        prediction_upper=prediction_band.max(axis=0),
+        a=a,
+        b=b
+    )
+
+
+def _fit_power_laws_loglog(x: numpy.ndarray, y: numpy.ndarray, _) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Log-log fits of each row, the y values of all the rows have the same sign."""
+    sign = numpy.sign(y[0, 0])
+    log_a, b = _fit_lines(numpy.log(x), numpy.log(sign * y))
+
+    return sign * numpy.exp(log_a), b
+
+
+def _fit_lines(x: numpy.ndarray, y: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Least squares lines `y = intercept + slope * x` of each row, NaN if a row has a single x value."""
+    x_mean, y_mean = x.mean(axis=1), y.mean(axis=1)
+    x_centered = x - x_mean[:, None]
+    x_variance = numpy.einsum('ij,ij->i', x_centered, x_centered)
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        slope = numpy.einsum('ij,ij->i', x_centered, y) / x_variance
+    slope[x_variance == 0] = numpy.nan
+
+    return y_mean - slope * x_mean, slope
+
+
+def _fit_power_laws_least_squares(
+        x: numpy.ndarray,
+        y: numpy.ndarray,
+        initial_parameters: Tuple[float, float]) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Least squares fits of each row by Levenberg-Marquardt, NaN if a row has a single x value."""
+    n_rows = len(x)
+    a, b = numpy.full(n_rows, initial_parameters[0]), numpy.full(n_rows, initial_parameters[1])
+    log_x = numpy.log(x)
+    damping = numpy.full(n_rows, 1e-3)
+
+    def costs(rows, a, b):
+        return numpy.sum((a[:, None] * numpy.power(x[rows], b[:, None]) - y[rows]) ** 2, axis=1)
+
+    # Rows still iterating
+    rows = numpy.flatnonzero(x.min(axis=1) < x.max(axis=1))
+    cost = numpy.full(n_rows, numpy.nan)
+    cost[rows] = costs(rows, a[rows], b[rows])
+
+    with numpy.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        for _ in range(LEAST_SQUARES_MAX_ITERATIONS):
+            if len(rows) == 0:
+                break
+
+            # Normal equations of the Jacobian (columns x^b and a * x^b * log(x)), with the Marquardt damping
+            x_power_b = numpy.power(x[rows], b[rows, None])
+            residuals = a[rows, None] * x_power_b - y[rows]
+            jacobian_b = a[rows, None] * x_power_b * log_x[rows]
+            jtj_aa = numpy.einsum('ij,ij->i', x_power_b, x_power_b)
+            jtj_ab = numpy.einsum('ij,ij->i', x_power_b, jacobian_b)
+            jtj_bb = numpy.einsum('ij,ij->i', jacobian_b, jacobian_b)
+            gradient_a = numpy.einsum('ij,ij->i', x_power_b, residuals)
+            gradient_b = numpy.einsum('ij,ij->i', jacobian_b, residuals)
+
+            damped_aa, damped_bb = jtj_aa * (1 + damping[rows]), jtj_bb * (1 + damping[rows])
+            determinant = damped_aa * damped_bb - jtj_ab ** 2
+            step_a = (jtj_ab * gradient_b - damped_bb * gradient_a) / determinant
+            step_b = (jtj_ab * gradient_a - damped_aa * gradient_b) / determinant
+
+            new_a, new_b = a[rows] + step_a, b[rows] + step_b
+            new_cost = costs(rows, new_a, new_b)
+            is_better = new_cost <= cost[rows]  # False for NaN
+
+            a[rows] = numpy.where(is_better, new_a, a[rows])
+            b[rows] = numpy.where(is_better, new_b, b[rows])
+            has_converged = is_better & (cost[rows] - new_cost <= LEAST_SQUARES_TOLERANCE * cost[rows])
+            cost[rows] = numpy.where(is_better, new_cost, cost[rows])
+            damping[rows] = numpy.where(is_better, damping[rows] / 10, damping[rows] * 10)
+
+            rows = rows[~has_converged & (damping[rows] < 1e10)]
+
+    a[numpy.isnan(cost)], b[numpy.isnan(cost)] = numpy.nan, numpy.nan
+
+    return a, b
+
+
+def bootstrap_depth_power_law(sy: pandas.DataFrame, depth_column: str = 'min_wtd', **kwargs) -> PowerLawBands:
+    """Bootstrap bands of the depth (in cm) in function of Sy, `Depth = a * Sy^b`.
+
+    Parameters
+    ----------
+    sy
+        DataFrame of Sy, obtained by the `calculate_sy` function.
+    depth_column
+        Column of the depth values (in m), ex. 'min_wtd' or 'depth'.
+    kwargs
+        See the `bootstrap_power_law` function.
+
+    Returns
+    -------
+    PowerLawBands
+        The bands of the depth (in cm).
+    """
+    return bootstrap_power_law(sy['sy'].values, sy[depth_column].values * 100, **kwargs)
+
+
+def fit_depth_power_law(
+        sy: pandas.DataFrame,
+        depth_column: str = 'min_wtd',
+        method: str = 'least_squares',
+        loss: str = 'linear') -> PowerLawFit:
+    """Fit the depth (in cm) in function of Sy, `Depth = a * Sy^b`.
+
+    The fits are cached by the content of the 'sy' and depth columns, so fitting
+    the same data again (ex. when plotting it again) returns the previous fit.
+
+    Parameters
+    ----------
+    sy
+        DataFrame of Sy, obtained by the `calculate_sy` function.
+    depth_column
+        Column of the depth values (in m), ex. 'min_wtd' or 'depth'.
+    method
+    loss
+        See the `fit_power_law` function.
+
+    Returns
+    -------
+    PowerLawFit
+        The parameters a (in cm) and b, and their covariance.
+    """
+    sy_values = sy['sy'].values
+    depth_values = sy[depth_column].values
+
+    key = (_fingerprint(sy_values, depth_values), depth_column, method, loss)
+    if key in _depth_fits:
+        _depth_fits.move_to_end(key)
+        return _depth_fits[key]
+
+    fit = fit_power_law(sy_values, depth_values * 100, method=method, loss=loss)  # To have the values in cm rather than m
+
+    _depth_fits[key] = fit
+    if len(_depth_fits) > FIT_CACHE_SIZE:
+        _depth_fits.popitem(last=False)
+
+    return fit
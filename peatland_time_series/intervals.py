@@ -0,0 +1,134 @@
+from typing import Union
+
+import numpy
+import pandas
+
+EVENT_DATE_COLUMNS = ['date_beginning', 'date_ending', 'idx_min', 'idx_max']
+
+
+class SyIntervalIndex:
+    """Index of the time intervals of the Sy events, for fast event and time lookups.
+
+    The interval of an event goes from the earliest to the latest of its
+    'date_beginning', 'date_ending', 'idx_min' and 'idx_max' dates. The intervals
+    are sorted by beginning, with the running maximum of their endings, so that
+    the queries are binary searches rather than scans of the Sy DataFrame.
+
+    Examples
+    --------
+    ```python
+    sy = calculate_sy(time_series)
+    intervals = SyIntervalIndex(sy)
+
+    positions = intervals.overlapping(pandas.Timestamp('2011-08-01'), pandas.Timestamp('2011-08-15'))
+    sy.iloc[positions]
+
+    position = intervals.nearest(pandas.Timestamp('2011-08-03 12:00'))
+    intervals.time_series_slice(time_series, position, time_before=pandas.Timedelta(hours=10))
+    ```
+
+    Parameters
+    ----------
+    sy
+        The Sy DataFrame (same format as the `calculate_sy` output).
+    """
+
+    def __init__(self, sy: pandas.DataFrame):
+        dates = sy[EVENT_DATE_COLUMNS]
+        beginnings = dates.min(axis=1).values.astype('datetime64[ns]').view('i8')
+        endings = dates.max(axis=1).values.astype('datetime64[ns]').view('i8')
+
+        self.order = numpy.argsort(beginnings, kind='stable')  # Positions in the Sy DataFrame of the sorted intervals
+        self.beginnings = beginnings[self.order]
+        self.endings = endings[self.order]
+        self.beginning_dates = sy['date_beginning'].values.astype('datetime64[ns]')
+        self.ending_dates = sy['date_ending'].values.astype('datetime64[ns]')
+
+        # Latest ending (and its sorted position) of the intervals beginning before each interval
+        self.latest_endings = numpy.maximum.accumulate(self.endings)
+        self.latest_ending_positions = _running_argmax(self.endings)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def overlapping(self, start: pandas.Timestamp, end: pandas.Timestamp) -> numpy.ndarray:
+        """Positions (in the Sy DataFrame) of the events overlapping the [start, end] period."""
+        start, end = _to_nanoseconds(start), _to_nanoseconds(end)
+
+        # Only the intervals beginning before the end of the period, and after the first one which could reach its start
+        stop = numpy.searchsorted(self.beginnings, end, side='right')
+        first = numpy.searchsorted(self.latest_endings[:stop], start, side='left')
+
+        candidates = numpy.arange(first, stop)
+        candidates = candidates[self.endings[candidates] >= start]
+
+        return numpy.sort(self.order[candidates])
+
+    def containing(self, timestamp: pandas.Timestamp) -> numpy.ndarray:
+        """Positions (in the Sy DataFrame) of the events whose interval contains the timestamp."""
+        return self.overlapping(timestamp, timestamp)
+
+    def nearest(self, timestamp: pandas.Timestamp) -> int:
+        """Position (in the Sy DataFrame) of the event whose interval is the nearest to the timestamp."""
+        if len(self) == 0:
+            raise ValueError('There is no event in the index.')
+
+        timestamp = _to_nanoseconds(timestamp)
+        next_position = numpy.searchsorted(self.beginnings, timestamp, side='right')
+
+        # Candidates: the interval ending the latest among those beginning before, and the next one
+        candidates = {}
+        if next_position > 0:
+            previous = self.latest_ending_positions[next_position - 1]
+            candidates[previous] = max(timestamp - self.endings[previous], 0)
+        if next_position < len(self):
+            candidates[next_position] = self.beginnings[next_position] - timestamp
+
+        nearest = min(candidates, key=candidates.get)
+
+        return int(self.order[nearest])
+
+    def time_series_slice(
+            self,
+            time_series: pandas.DataFrame,
+            position: int,
+            time_before: pandas.Timedelta = pandas.Timedelta(0),
+            time_after: pandas.Timedelta = pandas.Timedelta(0)) -> pandas.DataFrame:
+        """Rows of the time series from the beginning (minus `time_before`) to the ending (plus `time_after`) of an event.
+
+        The time series must be sorted by date, the rows are found by binary search.
+
+        Parameters
+        ----------
+        time_series
+            Time series as a DataFrame (from `read_time_series`).
+        position
+            Position of the event in the Sy DataFrame.
+        time_before
+            pandas.Timedelta before the beginning of the event.
+        time_after
+            pandas.Timedelta after the ending of the event.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The (positional) slice of the time series.
+        """
+        beginning = self.beginning_dates[position] - time_before.to_timedelta64()
+        ending = self.ending_dates[position] + time_after.to_timedelta64()
+        start = time_series.index.searchsorted(beginning, side='left')
+        stop = time_series.index.searchsorted(ending, side='right')
+
+        return time_series.iloc[start:stop]
+
+
+def _to_nanoseconds(timestamp: Union[pandas.Timestamp, numpy.datetime64, str]) -> int:
+    return pandas.Timestamp(timestamp).value
+
+
+def _running_argmax(values: numpy.ndarray) -> numpy.ndarray:
+    """Position of the (first) maximum of each prefix of the values."""
+    is_new_maximum = numpy.ones(len(values), dtype=bool)
+    is_new_maximum[1:] = values[1:] > numpy.maximum.accumulate(values)[:-1]
+
+    return numpy.maximum.accumulate(numpy.where(is_new_maximum, numpy.arange(len(values)), 0))
@@ -0,0 +1,132 @@
+import logging
+import time
+import tracemalloc
+from contextvars import ContextVar
+from typing import Callable, List, NamedTuple, Optional
+
+import pandas
+
+logger = logging.getLogger(__name__)
+
+# Profiler recording the stages of the current context, None when the profiling is disabled
+_active_profiler: 'ContextVar[Optional[SyProfiler]]' = ContextVar('active_profiler', default=None)
+
+
+class StageRecord(NamedTuple):
+    """Measures of a stage of the Sy calculation."""
+    run: int
+    stage: str
+    seconds: float
+    allocated_bytes: Optional[int]
+    peak_bytes: Optional[int]
+    n_rows: Optional[int]
+    n_events: Optional[int]
+
+
+class SyProfiler:
+    """Record the wall time, memory allocations and sizes of the stages of `calculate_sy`.
+
+    The stages are DEFINE_DATA, RESAMPLE, FIND_EVENTS, ISOLATION, MIN_MAX, ACCURACY,
+    SY_CALCULATION and SUMMARY. Every call of `calculate_sy` or `calculate_sy_sweep`
+    (only with `max_workers=1`, the workers are not profiled), and every chunk of
+    `calculate_sy_stream`, inside the context is a new run. Outside of a profiler context,
+    the stages are not measured.
+
+    Examples
+    --------
+    ```python
+    with SyProfiler(trace_memory=True) as profiler:
+        sy = calculate_sy(time_series)
+
+    profiler.report()  # One row per stage
+    profiler.report().groupby('stage')['seconds'].sum()
+
+    # Or sent to the monitoring as they are recorded
+    with SyProfiler(callback=lambda record: monitoring.send(record._asdict())):
+        sy = calculate_sy(time_series)
+    ```
+
+    Parameters
+    ----------
+    trace_memory
+        If True, the allocations are traced (with `tracemalloc`, which slows down the calculation).
+    callback
+        Optional, function called with each `StageRecord` as soon as it is recorded.
+        The records are also logged (DEBUG level) by the "peatland_time_series.profiling" logger.
+    """
+
+    def __init__(self, trace_memory: bool = False, callback: Optional[Callable[[StageRecord], None]] = None):
+        self.trace_memory = trace_memory
+        self.callback = callback
+        self.records: List[StageRecord] = []
+        self._run = -1
+        self._start_time = 0.0
+        self._start_memory = 0
+        self._token = None
+        self._started_tracing = False
+
+    def __enter__(self) -> 'SyProfiler':
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+        self._token = _active_profiler.set(self)
+        self._restart_measures()
+
+        return self
+
+    def __exit__(self, *exception):
+        _active_profiler.reset(self._token)
+
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def report(self) -> pandas.DataFrame:
+        """The records, one row per stage of each run."""
+        report = pandas.DataFrame(self.records, columns=StageRecord._fields)
+
+        return report.astype({column: 'Int64' for column in ['allocated_bytes', 'peak_bytes', 'n_rows', 'n_events']})
+
+    def _start_run(self):
+        self._run += 1
+        self._restart_measures()
+
+    def _record(self, stage: str, n_rows: Optional[int], n_events: Optional[int]):
+        seconds = time.perf_counter() - self._start_time
+        allocated_bytes = peak_bytes = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            allocated_bytes = current - self._start_memory
+            if hasattr(tracemalloc, 'reset_peak'):  # Python >= 3.9, otherwise the peak is not per stage
+                peak_bytes = peak - self._start_memory
+
+        record = StageRecord(self._run, stage, seconds, allocated_bytes, peak_bytes, n_rows, n_events)
+        self.records.append(record)
+        logger.debug('%s', record)
+        if self.callback is not None:
+            self.callback(record)
+
+        self._restart_measures()
+
+    def _restart_measures(self):
+        if self.trace_memory and tracemalloc.is_tracing():
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            self._start_memory = tracemalloc.get_traced_memory()[0]
+
+        self._start_time = time.perf_counter()
+
+
+def start():
+    """Start a new run of the active profiler (if any)."""
+    profiler = _active_profiler.get()
+    if profiler is not None:
+        profiler._start_run()
+
+
+def record(stage: str, n_rows: Optional[int] = None, n_events: Optional[int] = None):
+    """Record the stage which ends, measured since the previous stage, in the active profiler (if any)."""
+    profiler = _active_profiler.get()
+    if profiler is not None:
+        profiler._record(stage, n_rows, n_events)
@@ -0,0 +1,268 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import matplotlib.dates as mdates
+import numpy
+import pandas
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+
+from .util import TWIN_COLOR
+
+EVENTS_PER_TASK = 100
+PRECIPITATION_BAR_WIDTH = 0.02  # In days, as in `visualization.show_water_level`
+AXIS_MARGIN = 0.05
+PNG_COMPRESS_LEVEL = 1  # Fast zlib compression, the default one (6) is a large part of the rendering time
+
+# Data shared by the events rendered in a worker process, and the renderer reused for them
+_water_level_data = None
+_renderer = None
+
+
+class RenderSummary(NamedTuple):
+    """Files written by `render_water_levels`, with the rendering throughput."""
+    paths: List[str]
+    n_events: int
+    seconds: float
+
+    @property
+    def events_per_second(self) -> float:
+        return self.n_events / self.seconds if self.seconds > 0 else numpy.inf
+
+
+def render_water_levels(
+        time_series: pandas.DataFrame,
+        sy: pandas.DataFrame,
+        directory: str,
+        time_before: pandas.Timedelta = pandas.Timedelta(hours=10),
+        time_after: pandas.Timedelta = pandas.Timedelta(hours=20),
+        event_indexes: Optional[Iterable] = None,
+        file_format: str = 'png',
+        events_per_file: Optional[int] = None,
+        fig_size: Tuple[int, int] = (10, 6),
+        date_format: str = '%H',
+        xlabel_rotation: int = 0,
+        dpi: int = 100,
+        max_workers: Optional[int] = 1) -> RenderSummary:
+    """Save the water level in function of the time of many events (see `visualization.show_water_level`).
+
+    The figures are rendered headless (Agg), and each process draws a single figure whose
+    artists are updated for every event rather than recreated. The events are distributed
+    over a pool of processes.
+
+    Examples
+    --------
+    ```python
+    time_series = read_time_series('./tests/data/kmr_area_c.csv')
+    sy = calculate_sy(time_series)
+
+    # One PNG file per event
+    summary = render_water_levels(time_series, sy, './water_levels', max_workers=4)
+    print(f'{summary.events_per_second:.0f} events/s')
+
+    # Multi-page PDF files of 500 events
+    render_water_levels(time_series, sy, './water_levels', file_format='pdf', events_per_file=500)
+    ```
+
+    Parameters
+    ----------
+    time_series
+        Time series as a DataFrame (from `read_time_series`), sorted by date.
+    sy
+        Sy as a DataFrame (from `calculate_sy`).
+    directory
+        Directory of the written files (created if needed). The files of single events are named
+        "event_<index>.<file_format>", the multi-page PDF files "water_levels_<number>.pdf".
+    time_before
+        pandas.Timedelta before the events.
+    time_after
+        pandas.Timedelta after the events.
+    event_indexes
+        Optional, indexes of the events in Sy, by default all the events.
+    file_format
+        Format of the files, ex. 'png', 'svg' or 'pdf'.
+    events_per_file
+        Optional, number of pages of the multi-page PDF files (`file_format` must be 'pdf').
+        By default, each event is written in its own file.
+    fig_size
+        (width, height) of the figure, in inches.
+    date_format
+        Date format of the x axis (see https://strftime.org/).
+    xlabel_rotation
+        Rotation of the x axis labels.
+    dpi
+        Resolution of the raster files, in dots per inch.
+    max_workers
+        Number of processes, 1 (default) to render in the current process, None for the number of CPUs.
+
+    Returns
+    -------
+    RenderSummary
+        The written file paths, the number of rendered events and the duration.
+    """
+    if events_per_file is not None and file_format != 'pdf':
+        raise ValueError('Only the "pdf" file format supports many events per file.')
+
+    start_time = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+
+    sy = sy if event_indexes is None else sy.loc[list(event_indexes)]
+    sy = sy[sy['date_beginning'].notna() & sy['date_ending'].notna()]
+
+    # Positional slices of the time series of all the events at once
+    dates = time_series.index
+    starts = dates.searchsorted((sy['date_beginning'] - time_before).values, side='left')
+    stops = dates.searchsorted((sy['date_ending'] + time_after).values, side='right')
+
+    water_level_data = (
+        mdates.date2num(dates.values),
+        time_series['data_wtd'].values,
+        time_series['data_prec'].values,
+    )
+    events = list(zip(
+        sy.index,
+        starts,
+        stops,
+        mdates.date2num(sy['idx_max'].values),
+        sy['max_wtd'].values,
+        mdates.date2num(sy['idx_min'].values),
+        sy['min_wtd'].values,
+    ))
+    figure_options = dict(fig_size=fig_size, date_format=date_format, xlabel_rotation=xlabel_rotation, dpi=dpi)
+
+    if events_per_file is None:
+        tasks = [
+            (events[first:first + EVENTS_PER_TASK], directory, file_format, None, figure_options)
+            for first in range(0, len(events), EVENTS_PER_TASK)
+        ]
+    else:
+        tasks = [
+            (events[first:first + events_per_file], directory, file_format, f'water_levels_{number:04d}.pdf', figure_options)
+            for number, first in enumerate(range(0, len(events), events_per_file))
+        ]
+
+    if max_workers == 1:
+        _initialize_worker(water_level_data)
+        results = [_render_worker_events(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers, initializer=_initialize_worker, initargs=(water_level_data,)) as executor:
+            futures = [executor.submit(_render_worker_events, *task) for task in tasks]
+            results = [future.result() for future in futures]
+
+    paths = [path for result in results for path in result]
+
+    return RenderSummary(paths=paths, n_events=len(events), seconds=time.perf_counter() - start_time)
+
+
+def _initialize_worker(water_level_data: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]):
+    global _water_level_data, _renderer
+    _water_level_data = water_level_data
+    _renderer = None
+
+
+def _render_worker_events(
+        events: List[tuple],
+        directory: str,
+        file_format: str,
+        filename: Optional[str],
+        figure_options: dict) -> List[str]:
+    global _renderer
+    if _renderer is None or _renderer.options != figure_options:
+        _renderer = _WaterLevelRenderer(**figure_options)
+
+    if filename is not None:  # Multi-page PDF
+        path = os.path.join(directory, filename)
+        with PdfPages(path) as pdf:
+            for event in events:
+                _renderer.update(_water_level_data, *event)
+                pdf.savefig(_renderer.figure)
+
+        return [path]
+
+    paths = []
+    for event in events:
+        _renderer.update(_water_level_data, *event)
+        paths.append(os.path.join(directory, f'event_{event[0]}.{file_format}'))
+        save_options = {'pil_kwargs': {'compress_level': PNG_COMPRESS_LEVEL}} if file_format == 'png' else {}
+        _renderer.figure.savefig(paths[-1], format=file_format, dpi=_renderer.options['dpi'], **save_options)
+
+    return paths
+
+
+class _WaterLevelRenderer:
+    """Figure of the water level of an event, whose artists are updated for each event."""
+
+    def __init__(self, fig_size: Tuple[int, int], date_format: str, xlabel_rotation: int, dpi: int):
+        self.options = dict(fig_size=fig_size, date_format=date_format, xlabel_rotation=xlabel_rotation, dpi=dpi)
+        self.figure = Figure(figsize=fig_size, dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        self.is_laid_out = False
+
+        self.ax = self.figure.add_subplot()
+        self.ax_precipitation = self.ax.twinx()
+        self.ax.set_zorder(self.ax_precipitation.get_zorder() + 1)  # Water level in front of the bars
+        self.ax.patch.set_visible(False)
+
+        self.water_level_line, = self.ax.plot([], [], color='black')
+        self.max_marker = self.ax.scatter([], [], s=100)
+        self.min_marker = self.ax.scatter([], [], s=100)
+        self.precipitation_bars = PolyCollection([], color=TWIN_COLOR, alpha=0.5)
+        self.ax_precipitation.add_collection(self.precipitation_bars)
+
+        self.ax.set_xlabel('Time [h]')
+        self.ax.set_ylabel('Water level [m]')
+        self.ax_precipitation.set_ylabel('Prec. [mm]', color=TWIN_COLOR)
+        self.ax_precipitation.spines['right'].set_color(TWIN_COLOR)
+        self.ax_precipitation.tick_params(axis='y', colors=TWIN_COLOR)
+        self.ax.xaxis.set_major_formatter(mdates.DateFormatter(date_format))
+        self.ax.tick_params(axis='x', labelrotation=xlabel_rotation)
+
+    def update(
+            self,
+            water_level_data: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray],
+            event_index,
+            start: int,
+            stop: int,
+            date_max: float,
+            max_wtd: float,
+            date_min: float,
+            min_wtd: float):
+        dates, water_table_depth, precipitation = (values[start:stop] for values in water_level_data)
+
+        self.water_level_line.set_data(dates, water_table_depth)
+        self.max_marker.set_offsets([[date_max, max_wtd]])
+        self.min_marker.set_offsets([[date_min, min_wtd]])
+
+        # Bars of the precipitation, centered on their dates
+        left, right = dates - PRECIPITATION_BAR_WIDTH / 2, dates + PRECIPITATION_BAR_WIDTH / 2
+        zeros = numpy.zeros_like(dates)
+        self.precipitation_bars.set_verts(numpy.stack((
+            numpy.column_stack((left, zeros)),
+            numpy.column_stack((left, precipitation)),
+            numpy.column_stack((right, precipitation)),
+            numpy.column_stack((right, zeros)),
+        ), axis=1))
+
+        if len(dates) > 0:
+            self.ax.set_xlim(_with_margins(dates[0] - PRECIPITATION_BAR_WIDTH / 2, dates[-1] + PRECIPITATION_BAR_WIDTH / 2))
+        levels = numpy.concatenate((water_table_depth, [max_wtd, min_wtd]))
+        if numpy.isfinite(levels).any():
+            self.ax.set_ylim(_with_margins(numpy.nanmin(levels), numpy.nanmax(levels)))
+        maximum_precipitation = numpy.nanmax(precipitation) if numpy.isfinite(precipitation).any() else 0
+        self.ax_precipitation.set_ylim(0, maximum_precipitation * (1 + AXIS_MARGIN) if maximum_precipitation > 0 else 1)
+
+        self.ax.set_title(f'Event {event_index}')
+
+        if not self.is_laid_out:  # The layout is computed once, the labels of all the events have about the same size
+            # Figure.tight_layout is applied once, unlike a layout set on the figure which would run at every save
+            self.figure.tight_layout()
+            self.is_laid_out = True
+
+
+def _with_margins(minimum: float, maximum: float) -> Tuple[float, float]:
+    margin = (maximum - minimum) * AXIS_MARGIN or 0.5 * AXIS_MARGIN
+    return minimum - margin, maximum + margin
@@ -0,0 +1,199 @@
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+import numpy
+import pandas
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+
+NAT = numpy.iinfo('i8').min
+ORIGINS = ['start_day', 'start', 'epoch']
+
+
+class ResampledArrays(NamedTuple):
+    """Resampled time series: the bins with their mean water table depth, sum of precipitation and coverage."""
+    timestamps: numpy.ndarray
+    water_table_depth: numpy.ndarray
+    precipitation: numpy.ndarray
+    water_table_depth_count: Optional[numpy.ndarray]
+    precipitation_count: Optional[numpy.ndarray]
+
+
+def resample_arrays(
+        timestamps: numpy.ndarray,
+        water_table_depth: numpy.ndarray,
+        precipitation: numpy.ndarray,
+        rule: Union[pandas.DateOffset, pandas.Timedelta, str] = 'H',
+        origin: Union[pandas.Timestamp, str] = 'start_day',
+        exact: bool = False) -> ResampledArrays:
+    """Resample the water table depth (mean) and the precipitation (sum) of a time series.
+
+    The results are those of `DataFrame.resample(rule, origin=origin)` followed by `.mean()`
+    and `.sum()`. For fixed-width rules (ex. 'H', '30min', '3H') with the 'start_day', 'start'
+    or 'epoch' (or Timestamp) origins, the bins are computed from the int64 timestamps, and the
+    coverage counts, sums and means are aggregated in the bins with `bincount`, without grouping.
+    Pandas sums the values of a bin with a compensated (Kahan) summation, so the means and sums of
+    the bins of many measures may differ from it in the last digits: with `exact=True`, they are
+    computed by pandas instead (when every bin holds at most one measure, they are identical anyway).
+    The other rules are always resampled by pandas.
+
+    The coverage counts are the numbers of (not NaN) measures in each bin, so that sparse bins
+    (ex. the hours of a 15 minutes logger with a single measure) can be masked:
+
+    ```python
+    resampled = resample_arrays(timestamps, water_table_depth, precipitation, 'H')
+    water_table_depth = numpy.where(resampled.water_table_depth_count >= 3, resampled.water_table_depth, numpy.nan)
+    ```
+
+    Parameters
+    ----------
+    timestamps
+        Timestamps of the measures, datetime64 or int64 nanoseconds.
+    water_table_depth
+        Water table depth of the measures.
+    precipitation
+        Precipitation of the measures.
+    rule
+        Resampling rule (ex. 'H').
+    origin
+        Origin of the bins (see `DataFrame.resample`).
+    exact
+        If True, the means and sums of the bins of many measures are computed by pandas,
+        to be bit-identical to `DataFrame.resample`.
+
+    Returns
+    -------
+    ResampledArrays
+        The timestamps (int64 nanoseconds, beginning of the bins), mean water table depth,
+        sum of precipitation and their coverage counts, with the empty bins included
+        (NaN water table depth, zero precipitation).
+    """
+    return _resample(timestamps, water_table_depth, precipitation, rule, origin, coverage=True, exact=exact)
+
+
+def _resample(
+        timestamps: numpy.ndarray,
+        water_table_depth: numpy.ndarray,
+        precipitation: numpy.ndarray,
+        rule: Union[pandas.DateOffset, pandas.Timedelta, str],
+        origin: Union[pandas.Timestamp, str],
+        coverage: bool,
+        exact: bool = False) -> ResampledArrays:
+    """`resample_arrays`, where the coverage counts are only computed if `coverage` (otherwise, they may be None)."""
+    timestamps = numpy.asarray(timestamps)
+    if numpy.issubdtype(timestamps.dtype, numpy.datetime64):
+        timestamps = timestamps.astype('datetime64[ns]', copy=False).view('i8')
+    timestamps = timestamps.astype('i8', copy=False)
+    columns = [numpy.asarray(water_table_depth, dtype=float), numpy.asarray(precipitation, dtype=float)]
+
+    # Without the coverage counts, the exact aggregation only needs the bins when they can all hold a single measure
+    bins = _fixed_bins(timestamps, rule, origin, only_sparse=exact and not coverage)
+    if bins is None:
+        return _resample_with_pandas(timestamps, columns, rule, origin, coverage)
+
+    labels, bin_timestamps = bins
+    n_bins = len(bin_timestamps)
+    measure_count = numpy.bincount(labels, minlength=n_bins)
+    is_missing = [numpy.isnan(column) for column in columns]
+    # Numbers of measures of each bin, without the NaN
+    water_table_depth_count, precipitation_count = [
+        measure_count - numpy.bincount(labels[column_is_missing], minlength=n_bins) for column_is_missing in is_missing
+    ]
+
+    has_many_measures = measure_count.max(initial=0) > 1
+    if has_many_measures and exact:
+        resampled = _resample_with_pandas(timestamps, columns, rule, origin, coverage=False)
+        return resampled._replace(water_table_depth_count=water_table_depth_count, precipitation_count=precipitation_count)
+
+    water_table_depth_sum, precipitation_sum = [
+        _bin_sums(labels, column, column_is_missing, n_bins, has_many_measures)
+        for column, column_is_missing in zip(columns, is_missing)
+    ]
+    with numpy.errstate(invalid='ignore', divide='ignore'):  # The bins without measure are NaN
+        water_table_depth_mean = water_table_depth_sum / water_table_depth_count
+
+    return ResampledArrays(
+        bin_timestamps, water_table_depth_mean, precipitation_sum, water_table_depth_count, precipitation_count
+    )
+
+
+def _bin_sums(
+        labels: numpy.ndarray,
+        values: numpy.ndarray,
+        is_missing: numpy.ndarray,
+        n_bins: int,
+        has_many_measures: bool) -> numpy.ndarray:
+    """Sums of the values of each bin, skipping the NaN."""
+    if has_many_measures:
+        if is_missing.any():
+            values = numpy.where(is_missing, 0.0, values)
+        return numpy.bincount(labels, weights=values, minlength=n_bins)
+
+    # A single measure per bin, scattered in the bins: its sum is `0.0 + value` (+0.0 for -0.0, like pandas)
+    sums = numpy.zeros(n_bins)
+    sums[labels] = numpy.where(is_missing, 0.0, 0.0 + values)
+
+    return sums
+
+
+def _fixed_bins(
+        timestamps: numpy.ndarray,
+        rule: Union[pandas.DateOffset, pandas.Timedelta, str],
+        origin: Union[pandas.Timestamp, str],
+        only_sparse: bool = False) -> Optional[Tuple[numpy.ndarray, numpy.ndarray]]:
+    """Bin of each timestamp (since the first bin) and timestamps (int64 nanoseconds) of the bins.
+
+    None when the bins cannot be computed from the timestamps (calendar rule, unsupported origin,
+    unsorted or missing timestamps), or if `only_sparse` when there are more measures than bins.
+    """
+    offset = to_offset(rule)
+    if not isinstance(offset, Tick) or len(timestamps) == 0:
+        return None
+
+    if isinstance(origin, str) and origin not in ORIGINS:
+        return None
+    if not isinstance(origin, str) and pandas.Timestamp(origin).tz is not None:
+        return None
+
+    width = offset.nanos
+    if only_sparse and len(timestamps) > (timestamps[-1] - timestamps[0]) // width + 1:
+        return None
+
+    if timestamps[0] == NAT or numpy.any(timestamps[1:] < timestamps[:-1]):
+        return None
+
+    origin = _origin_nanoseconds(timestamps, origin)
+    first_bin, last_bin = (int(timestamps[0]) - origin) // width, (int(timestamps[-1]) - origin) // width
+    # The timestamps are sorted, so they are all after the beginning of the first bin
+    labels = (timestamps - (origin + first_bin * width)) // width
+
+    return labels, origin + numpy.arange(first_bin, last_bin + 1) * width
+
+
+def _origin_nanoseconds(timestamps: numpy.ndarray, origin: Union[pandas.Timestamp, str]) -> int:
+    if not isinstance(origin, str):
+        return int(pandas.Timestamp(origin).value)
+    if origin == 'start_day':
+        return int(pandas.Timestamp(timestamps[0]).normalize().value)
+    if origin == 'start':
+        return int(timestamps[0])
+
+    return 0  # 'epoch'
+
+
+def _resample_with_pandas(
+        timestamps: numpy.ndarray,
+        columns: List[numpy.ndarray],
+        rule: Union[pandas.DateOffset, pandas.Timedelta, str],
+        origin: Union[pandas.Timestamp, str],
+        coverage: bool) -> ResampledArrays:
+    # One Series per column, a DataFrame would consolidate (copy) the columns in a single block
+    index = pandas.DatetimeIndex(timestamps.view('datetime64[ns]'), copy=False)
+    aggregated, counts = [], []
+    for column, aggregation in zip(columns, ['mean', 'sum']):
+        resampler = pandas.Series(column, index=index, copy=False).resample(rule, origin=origin)
+        aggregated.append(getattr(resampler, aggregation)())
+        counts.append(resampler.count().values.astype('i8') if coverage else None)
+
+    water_table_depth, precipitation = aggregated
+
+    return ResampledArrays(precipitation.index.values.view('i8'), water_table_depth.values, precipitation.values, *counts)
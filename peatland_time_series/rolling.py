@@ -0,0 +1,159 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy
+import pandas
+
+from .fitting import fit_power_law
+
+WINDOW_COLUMNS = [
+    'window_end', 'n_events', 'a', 'b', 'standard_deviation_a', 'standard_deviation_b', 'converged'
+]
+
+WINDOWS_PER_TASK = 64
+
+# Sorted (date, Sy, depth) arrays of the sites, shared by the windows fitted in a worker process
+_site_arrays = None
+
+
+def fit_depth_power_law_windows(
+        sy: pandas.DataFrame,
+        window: Union[pandas.DateOffset, pandas.Timedelta, str] = 'QS-DEC',
+        step: Optional[Union[pandas.Timedelta, str]] = None,
+        depth_column: str = 'min_wtd',
+        method: str = 'least_squares',
+        min_events: int = 3,
+        max_workers: Optional[int] = 1) -> pandas.DataFrame:
+    """Fit the depth (in cm) in function of Sy, `Depth = a * Sy^b`, over time windows of 'date_beginning'.
+
+    The windows are either calendar periods (ex. 'QS-DEC' for the seasons, 'AS' for the
+    years) or sliding windows of a fixed duration moved by `step`. The events are sorted
+    once by 'date_beginning', and the events of a window are found by binary search.
+
+    Examples
+    --------
+    ```python
+    sy = filter_sy(calculate_sy(time_series), sy_min=0, sy_max=1, delta_h_min=.01)
+
+    seasons = fit_depth_power_law_windows(sy, window='QS-DEC')
+    rolling = fit_depth_power_law_windows(sy, window='90D', step='30D', max_workers=4)
+
+    # Many sites, from calculate_sy_batch
+    sy, errors = calculate_sy_batch('./data/**/*.csv')
+    years = fit_depth_power_law_windows(sy, window='AS')
+    years.loc['ahlenmoor_af_seepegel', 'b']
+    ```
+
+    Parameters
+    ----------
+    sy
+        DataFrame of Sy, obtained by the `calculate_sy` function (or by `calculate_sy_batch`,
+        then the sites, first level of the index, are fitted separately).
+    window
+        Calendar frequency of the windows (ex. 'MS', 'QS-DEC', 'AS'), or duration of the sliding windows
+        (ex. '90D') if `step` is given.
+    step
+        Optional, duration between the beginnings of the sliding windows.
+    depth_column
+        Column of the depth values (in m), ex. 'min_wtd' or 'depth'.
+    method
+        Fitting method (see the `fitting.fit_power_law` function).
+    min_events
+        Minimal number of events of a window to fit it, the parameters of the other windows are NaN.
+    max_workers
+        Number of processes fitting the windows, 1 (default) to fit them in the current process,
+        None for the number of CPUs.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per window, indexed by 'window_start' (or ('site', 'window_start') for many sites),
+        with the 'window_end' (excluded), the number of events and the fitted parameters.
+    """
+    if min_events < 2:
+        raise ValueError('At least 2 events are needed to fit the 2 parameters of the power law.')
+
+    has_sites = isinstance(sy.index, pandas.MultiIndex)
+    site_frames = dict(iter(sy.groupby(level=0, sort=False))) if has_sites else {None: sy}
+
+    site_arrays, tasks = {}, []
+    for site, site_sy in site_frames.items():
+        dates = site_sy['date_beginning'].values.astype('datetime64[ns]')
+        order = numpy.argsort(dates, kind='stable')
+        site_arrays[site] = (dates[order], site_sy['sy'].values[order], site_sy[depth_column].values[order] * 100)
+
+        # The windows of a site are split in many tasks, to balance them between the workers
+        starts, ends = _window_bounds(dates[order], window, step)
+        for first in range(0, max(len(starts), 1), WINDOWS_PER_TASK):
+            window_slice = slice(first, first + WINDOWS_PER_TASK)
+            tasks.append((site, starts[window_slice], ends[window_slice], method, min_events))
+
+    if max_workers == 1:
+        results = [_fit_windows(site_arrays, *task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers, initializer=_initialize_worker, initargs=(site_arrays,)) as executor:
+            futures = [executor.submit(_fit_worker_windows, *task) for task in tasks]
+            results = [future.result() for future in futures]
+
+    sites = [site for site, *_ in tasks]
+    windows = pandas.concat(results, keys=sites, names=['site', 'window_start'])
+
+    return windows if has_sites else windows.droplevel('site')
+
+
+def _window_bounds(
+        dates: numpy.ndarray,
+        window: Union[pandas.DateOffset, pandas.Timedelta, str],
+        step: Optional[Union[pandas.Timedelta, str]]) -> Tuple[pandas.DatetimeIndex, pandas.DatetimeIndex]:
+    """Beginnings and (excluded) endings of the windows covering the sorted dates."""
+    dates = dates[~numpy.isnat(dates)]
+    if len(dates) == 0:
+        return pandas.DatetimeIndex([]), pandas.DatetimeIndex([])
+
+    first, last = pandas.Timestamp(dates[0]), pandas.Timestamp(dates[-1])
+
+    if step is not None:
+        window, step = pandas.Timedelta(window), pandas.Timedelta(step)
+        starts = pandas.date_range(first.normalize(), last, freq=step)
+
+        return starts, starts + window
+
+    offset = pandas.tseries.frequencies.to_offset(window)
+    starts = pandas.date_range(offset.rollback(first.normalize()), last, freq=offset)
+
+    return starts, starts + offset
+
+
+def _initialize_worker(site_arrays: Dict[Optional[str], Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]]):
+    global _site_arrays
+    _site_arrays = site_arrays
+
+
+def _fit_worker_windows(*task) -> pandas.DataFrame:
+    return _fit_windows(_site_arrays, *task)
+
+
+def _fit_windows(
+        site_arrays: Dict[Optional[str], Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]],
+        site: Optional[str],
+        starts: pandas.DatetimeIndex,
+        ends: pandas.DatetimeIndex,
+        method: str,
+        min_events: int) -> pandas.DataFrame:
+    dates, sy_values, depth_values = site_arrays[site]
+    first_positions = numpy.searchsorted(dates, starts.values, side='left')
+    stop_positions = numpy.searchsorted(dates, ends.values, side='left')
+
+    rows: List[tuple] = []
+    for end, first, stop in zip(ends, first_positions, stop_positions):
+        parameters = (numpy.nan, numpy.nan, numpy.nan, numpy.nan, False)
+        if stop - first >= min_events:
+            try:
+                fit = fit_power_law(sy_values[first:stop], depth_values[first:stop], method=method)
+                parameters = (fit.a, fit.b, fit.standard_deviation_a, fit.standard_deviation_b, fit.converged)
+            except (RuntimeError, ValueError, numpy.linalg.LinAlgError):  # Not enough distinct points to fit
+                pass
+
+        rows.append((end, stop - first) + parameters)
+
+    return pandas.DataFrame(rows, columns=WINDOW_COLUMNS, index=pandas.DatetimeIndex(starts, name='window_start'))
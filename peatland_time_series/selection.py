@@ -0,0 +1,207 @@
+from typing import Iterable, Optional, Set
+
+import matplotlib.pyplot as plt
+import numpy
+from matplotlib.collections import PathCollection
+from matplotlib.path import Path
+from matplotlib.widgets import LassoSelector, RectangleSelector
+from scipy.spatial import cKDTree
+
+SELECTION_MODES = ['click', 'lasso', 'box']
+SELECTION_STYLES = ['hide', 'highlight']
+HIGHLIGHT_COLOR = (1., 0., 0., 1.)  # Red
+
+# Maximal move (in pixels) of the mouse between its press and release for a click
+CLICK_TOLERANCE = 3
+
+
+class PointSelector:
+    """Interactive selection of the points of a scatter plot, by click, lasso or box.
+
+    The points are picked in a KD-tree of their positions on the screen (built again after
+    the zooms and resizes), and the selected points are redrawn over a cached background
+    of the axes (blitting), once per click, lasso or box, whatever the number of points.
+    A click selects the points under the mouse, like the "pick_event" of matplotlib, in
+    all the modes.
+
+    Examples
+    --------
+    ```python
+    fig, ax = plt.subplots()
+    scatter_plot = ax.scatter(sy['sy'], sy['depth'])
+
+    selector = PointSelector(ax, scatter_plot, mode='lasso')
+    plt.show()
+
+    selector.selected_indexes  # Positions of the selected points in the scatter plot
+    ```
+
+    Parameters
+    ----------
+    ax
+        Axes of the scatter plot.
+    collection
+        The scatter plot (from `ax.scatter`).
+    mode
+        "click" to select the points one click at a time, "lasso" to select the points
+        inside a free-form path, or "box" to select the points inside a rectangle.
+    style
+        "hide" to hide the selected points, or "highlight" to color them in red.
+    """
+
+    def __init__(self, ax: plt.Axes, collection: PathCollection, mode: str = 'click', style: str = 'hide'):
+        if mode not in SELECTION_MODES:
+            raise ValueError(f'Unknown selection mode "{mode}", expected one of {SELECTION_MODES}.')
+        if style not in SELECTION_STYLES:
+            raise ValueError(f'Unknown selection style "{style}", expected one of {SELECTION_STYLES}.')
+
+        self.ax = ax
+        self.collection = collection
+        self.style = style
+        self.selected_indexes: Set[int] = set()
+
+        self._offsets = numpy.asarray(collection.get_offsets(), dtype=float)
+        self._is_finite = numpy.isfinite(self._offsets).all(axis=1)
+        self._tree: Optional[cKDTree] = None
+        self._background = None
+        self._press_position = None
+
+        # The selected points are drawn over the background, the collection is not part of it
+        collection.set_animated(True)
+        canvas = ax.figure.canvas
+        self._connections = [
+            canvas.mpl_connect('draw_event', self._on_draw),
+            canvas.mpl_connect('button_press_event', self._on_press),
+            canvas.mpl_connect('button_release_event', self._on_release),
+        ]
+
+        self._widget = None
+        if mode == 'lasso':
+            self._widget = LassoSelector(ax, self._on_lasso, useblit=True)
+        elif mode == 'box':
+            self._widget = RectangleSelector(
+                ax, self._on_box, useblit=True, spancoords='pixels', minspanx=CLICK_TOLERANCE, minspany=CLICK_TOLERANCE
+            )
+
+    def disconnect(self):
+        """Stop the selection (the selected points stay as they are)."""
+        for connection in self._connections:
+            self.ax.figure.canvas.mpl_disconnect(connection)
+        if self._widget is not None:
+            self._widget.set_active(False)
+
+        self.collection.set_animated(False)
+
+    def select_indexes(self, indexes: Iterable[int]):
+        """Add points to the selection, and redraw them."""
+        new_indexes = set(int(index) for index in indexes) - self.selected_indexes
+        if not new_indexes:
+            return
+
+        self.selected_indexes |= new_indexes
+        self._apply_style(numpy.fromiter(new_indexes, dtype=int, count=len(new_indexes)))
+        self._redraw()
+
+    def points_at(self, x: float, y: float) -> numpy.ndarray:
+        """Positions of the points under a position on the screen (in pixels), like `collection.contains`."""
+        tree, positions = self._display_tree()
+        if len(positions) == 0:
+            return positions
+
+        pick_radius = self.collection.get_pickradius()
+        radii = self._marker_radii()
+        candidates = positions[tree.query_ball_point([x, y], r=radii.max() + pick_radius)]
+
+        distances = numpy.hypot(*(self._display_offsets()[candidates] - [x, y]).T)
+        return numpy.sort(candidates[distances <= radii[candidates] + pick_radius])
+
+    def _on_draw(self, event):
+        # After a zoom or a resize, the points moved on the screen
+        self._tree = None
+        self._background = self.ax.figure.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.collection)
+
+    def _on_press(self, event):
+        if self._ignore(event):
+            return
+
+        self._press_position = (event.x, event.y)
+
+    def _on_release(self, event):
+        if self._ignore(event) or self._press_position is None:
+            return
+
+        press_x, press_y = self._press_position
+        self._press_position = None
+        if max(abs(event.x - press_x), abs(event.y - press_y)) <= CLICK_TOLERANCE:
+            self.select_indexes(self.points_at(event.x, event.y))
+
+    def _on_lasso(self, vertices):
+        path = Path(self.ax.transData.transform(vertices))
+        extent = path.get_extents()
+        if max(extent.width, extent.height) <= CLICK_TOLERANCE:  # A click
+            return
+
+        is_inside = path.contains_points(self._display_offsets()) & self._is_finite
+        self.select_indexes(numpy.flatnonzero(is_inside))
+
+    def _on_box(self, press_event, release_event):
+        x_min, x_max = sorted([press_event.x, release_event.x])
+        y_min, y_max = sorted([press_event.y, release_event.y])
+        if max(x_max - x_min, y_max - y_min) <= CLICK_TOLERANCE:  # A click
+            return
+
+        x, y = self._display_offsets().T
+        is_inside = (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max) & self._is_finite
+        self.select_indexes(numpy.flatnonzero(is_inside))
+
+    def _ignore(self, event) -> bool:
+        # Not in the axes, not the left button, or used by the zoom or pan of the toolbar
+        return event.inaxes is not self.ax or event.button != 1 or self.ax.get_navigate_mode() is not None
+
+    def _display_offsets(self) -> numpy.ndarray:
+        return self.collection.get_offset_transform().transform(self._offsets)
+
+    def _display_tree(self):
+        """KD-tree of the (finite) points on the screen, and their positions in the collection."""
+        positions = numpy.flatnonzero(self._is_finite)
+        if self._tree is None and len(positions) > 0:
+            self._tree = cKDTree(self._display_offsets()[positions])
+
+        return self._tree, positions
+
+    def _marker_radii(self) -> numpy.ndarray:
+        """Radius (in pixels) of the marker of each point, with sizes in points ** 2."""
+        sizes = numpy.broadcast_to(self.collection.get_sizes(), (len(self._offsets),))
+
+        return numpy.sqrt(sizes) / 2 * self.ax.figure.dpi / 72
+
+    def _apply_style(self, indexes: numpy.ndarray):
+        n_points = len(self._offsets)
+        if self.style == 'hide':
+            sizes = numpy.array(numpy.broadcast_to(self.collection.get_sizes(), (n_points,)), dtype=float)
+            sizes[indexes] = 0
+            self.collection.set_sizes(sizes)
+        else:
+            for get_colors, set_colors in [(self.collection.get_facecolors, self.collection.set_facecolors),
+                                           (self.collection.get_edgecolors, self.collection.set_edgecolors)]:
+                colors = get_colors()
+                if len(colors) == 0:  # No edges, for example
+                    continue
+                colors = numpy.array(numpy.broadcast_to(colors, (n_points, 4)))
+                colors[indexes] = HIGHLIGHT_COLOR
+                set_colors(colors)
+
+    def _redraw(self):
+        canvas = self.ax.figure.canvas
+        if self._background is None or not getattr(canvas, 'supports_blit', False):
+            canvas.draw_idle()
+            return
+
+        canvas.restore_region(self._background)
+        self.ax.draw_artist(self.collection)
+        canvas.blit(self.ax.bbox)
+
+        # The selectors of matplotlib < 3.7 restore their own background, without the animated artists
+        if self._widget is not None and not hasattr(self._widget, '_get_animated_artists'):
+            self._widget.background = canvas.copy_from_bbox(self.ax.bbox)
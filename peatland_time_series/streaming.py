@@ -0,0 +1,147 @@
+from typing import Iterable, Iterator, Union
+
+import numpy
+import pandas
+
+from . import profiling
+from .events import find_events
+from .sy import _check_parameters, _resample_time_series, _summarize_events
+
+
+def calculate_sy_stream(
+        chunks: Iterable[pandas.DataFrame],
+        gap: int = 5,
+        max_hour: int = 5,
+        threshold: float = 0.3,
+        resample: Union[pandas.Timedelta, str] = 'H',
+        accuracy_range: range = range(5, 15)) -> Iterator[pandas.DataFrame]:
+    """Calculate the Specific Yield (Sy) from successive chunks of a time series.
+
+    Each chunk is resampled as it arrives and the Sy of the precipitation events are
+    yielded as soon as the events are closed (by a gap in the precipitation) and the
+    water level is known far enough after them. Only the rows of the resampled step
+    overlapping two chunks and the resampled data since the beginning of the oldest
+    unfinished event are kept in memory, so the memory is bounded by the chunk size
+    rather than by the length of the time series.
+
+    The concatenation of the yielded DataFrames is equal to the `calculate_sy` output
+    of the whole time series.
+
+    Examples
+    --------
+    ```python
+    chunks = read_time_series_chunks('./tests/data/kmr_area_c.csv', chunksize=10_000)
+
+    for sy in calculate_sy_stream(chunks):
+        sy.to_csv('sy.csv', mode='a', header=(sy.index[0] == 0))
+    ```
+
+    Parameters
+    ----------
+    chunks
+        Successive chunks of a time series sorted by date (see the `read_time_series_chunks` function).
+    gap
+    max_hour
+    threshold
+    accuracy_range
+        See the `calculate_sy` function.
+    resample
+        Resample rule for the aggregation step, must be of fixed duration (ex. 'H', '30min').
+
+    Returns
+    -------
+    Iterator[pandas.DataFrame]
+        The Sy of the events, in the `calculate_sy` format, indexed by the event number.
+    """
+    _check_parameters(max_hour, accuracy_range)
+    if not isinstance(pandas.tseries.frequencies.to_offset(resample), pandas.tseries.offsets.Tick):
+        raise ValueError(f'The resample rule must be of fixed duration to calculate the Sy by chunks, got "{resample}".')
+
+    stream = _SyStream(gap, max_hour, threshold, resample, accuracy_range)
+
+    for chunk in chunks:
+        if not chunk.empty:
+            yield from stream.push(chunk)
+
+    yield from stream.close()
+
+
+class _SyStream:
+    """State of the Sy calculation between two chunks."""
+
+    def __init__(self, gap: int, max_hour: int, threshold: float, resample: Union[pandas.Timedelta, str], accuracy_range: range):
+        self.gap = gap
+        self.max_hour = max_hour
+        self.threshold = threshold
+        self.resample = resample
+        self.accuracy_range = accuracy_range
+        # Number of resampled steps needed after the end of an event to calculate its Sy
+        self.look_ahead = max(max_hour, accuracy_range[-1])
+
+        self.origin = None  # Origin of the resampled steps, like the 'start_day' origin of the whole time series
+        self.pending_rows = None  # Rows of the last resampled step, which may continue in the next chunk
+        self.time = numpy.empty(0, dtype='datetime64[ns]')
+        self.water_table_depth = numpy.empty(0)
+        self.precipitation = numpy.empty(0)
+        self.n_events = 0
+
+    def push(self, chunk: pandas.DataFrame) -> Iterator[pandas.DataFrame]:
+        profiling.start()
+        if self.pending_rows is not None:
+            chunk = pandas.concat([self.pending_rows, chunk])
+
+        if self.origin is None:
+            self.origin = chunk.index[0].normalize()
+
+        df_water_table_depth, df_precipitation = _resample_time_series(chunk, self.resample, origin=self.origin)
+
+        # The last resampled step is only complete once the next chunk is read
+        self.pending_rows = chunk[chunk.index >= df_precipitation.index[-1]]
+        self._append(df_water_table_depth.iloc[:-1], df_precipitation.iloc[:-1])
+
+        yield from self._summarize(is_closed=False)
+
+    def close(self) -> Iterator[pandas.DataFrame]:
+        profiling.start()
+        if self.pending_rows is not None:
+            self._append(*_resample_time_series(self.pending_rows, self.resample, origin=self.origin))
+            self.pending_rows = None
+
+        yield from self._summarize(is_closed=True)
+
+    def _append(self, df_water_table_depth: pandas.DataFrame, df_precipitation: pandas.DataFrame):
+        self.time = numpy.concatenate((self.time, df_precipitation.index.values))
+        self.water_table_depth = numpy.concatenate((self.water_table_depth, df_water_table_depth['data_wtd'].values))
+        self.precipitation = numpy.concatenate((self.precipitation, df_precipitation['data_prec'].values))
+
+    def _summarize(self, is_closed: bool) -> Iterator[pandas.DataFrame]:
+        positions, boundaries = find_events(self.precipitation, self.threshold, self.gap)
+        profiling.record('FIND_EVENTS', n_rows=len(self.precipitation), n_events=len(boundaries) - 1)
+
+        # Events are ready when the water level is known up to their look-ahead (or at the end of the time series)
+        n_ready = len(boundaries) - 1
+        if not is_closed:
+            ends = positions[boundaries[1:] - 1]
+            n_ready = numpy.searchsorted(ends, len(self.precipitation) - self.look_ahead, side='right')
+
+        if n_ready > 0:
+            summary_table = _summarize_events(
+                pandas.DatetimeIndex(self.time),
+                self.water_table_depth,
+                self.precipitation,
+                positions,
+                boundaries[:n_ready + 1],
+                max_hour=self.max_hour,
+                accuracy_range=self.accuracy_range
+            )
+            summary_table.index += self.n_events
+            self.n_events += n_ready
+
+            yield summary_table
+
+        # Keeping the data from the beginning of the first event not yet summarized,
+        # so that the events are found again identically with the next chunk
+        keep_from = positions[boundaries[n_ready]] if len(positions) > 0 else len(self.precipitation)
+        self.time = self.time[keep_from:]
+        self.water_table_depth = self.water_table_depth[keep_from:]
+        self.precipitation = self.precipitation[keep_from:]
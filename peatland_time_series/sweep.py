@@ -0,0 +1,129 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy
+import pandas
+
+from . import profiling
+from .events import find_events
+from .sy import _check_parameters, _empty_sy, _resample_time_series, _summarize_events_by_max_hour
+
+# Resampled data shared by the combinations evaluated in a worker process
+_resampled_data = None
+
+
+def calculate_sy_sweep(
+        time_series: pandas.DataFrame,
+        gaps: Iterable[int] = (5,),
+        max_hours: Iterable[int] = (5,),
+        thresholds: Iterable[float] = (0.3,),
+        resample: Union[pandas.DateOffset, pandas.Timedelta, str] = 'H',
+        accuracy_range: range = range(5, 15),
+        max_workers: Optional[int] = 1) -> pandas.DataFrame:
+    """Calculate the Specific Yield (Sy) for every combination of a grid of parameters.
+
+    The time series is resampled only once, then each combination is evaluated against
+    the resampled data. The precipitation events, with their precipitation sums, durations
+    and accuracy, are computed once per (gap, threshold) and shared by all the `max_hours`.
+    The throughput of the sweep, in combinations per second, is reported in the
+    `attrs['combinations_per_second']` of the result.
+
+    Examples
+    --------
+    ```python
+    time_series = read_time_series('./tests/data/kmr_area_c.csv')
+    sy = calculate_sy_sweep(time_series, gaps=range(2, 10), max_hours=range(2, 10), thresholds=[0.1, 0.3, 0.5])
+
+    sy.loc[(5, 5, 0.3)]  # Sy of the gap=5, max_hour=5, threshold=0.3 combination
+    sy.groupby(['gap', 'max_hour', 'threshold'])['sy'].median()
+    sy.attrs['combinations_per_second']
+    ```
+
+    Parameters
+    ----------
+    time_series
+        Time series as a DataFrame (from `read_time_series`).
+    gaps
+        Values of the `gap` parameter (see `calculate_sy`).
+    max_hours
+        Values of the `max_hour` parameter (see `calculate_sy`).
+    thresholds
+        Values of the `threshold` parameter (see `calculate_sy`).
+    resample
+    accuracy_range
+        See the `calculate_sy` function.
+    max_workers
+        Number of processes evaluating the combinations, 1 (default) to evaluate them in the current process,
+        None for the number of CPUs.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The Sy of all the combinations, indexed by ('gap', 'max_hour', 'threshold', 'event')
+        (without row if the grid is empty).
+    """
+    start_time = perf_counter()
+    gaps, max_hours, thresholds = list(gaps), list(max_hours), list(thresholds)
+    for max_hour in max_hours:
+        _check_parameters(max_hour, accuracy_range)
+
+    profiling.start()
+    df_water_table_depth, df_precipitation = _resample_time_series(time_series, resample)
+    resampled_data = (
+        df_precipitation.index,
+        df_water_table_depth['data_wtd'].values,
+        df_precipitation['data_prec'].values,
+    )
+    tasks = [(gap, threshold, max_hours, accuracy_range) for gap, threshold in itertools.product(gaps, thresholds)]
+
+    if max_workers == 1:
+        results = [_evaluate_combinations(resampled_data, *task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers, initializer=_initialize_worker, initargs=(resampled_data,)) as executor:
+            futures = [executor.submit(_evaluate_worker_combinations, *task) for task in tasks]
+            results = [future.result() for future in futures]
+
+    sy_by_combination = {}
+    for result in results:
+        sy_by_combination.update(result)
+
+    combinations = list(itertools.product(gaps, max_hours, thresholds))
+    names = ['gap', 'max_hour', 'threshold', 'event']
+    if combinations:
+        sy = pandas.concat({combination: sy_by_combination[combination] for combination in combinations}, names=names)
+    else:
+        sy = _empty_sy(pandas.MultiIndex.from_arrays([[], [], [], []], names=names))
+
+    sy.attrs['combinations_per_second'] = len(combinations) / (perf_counter() - start_time)
+
+    return sy
+
+
+def _initialize_worker(resampled_data: Tuple[pandas.DatetimeIndex, numpy.ndarray, numpy.ndarray]):
+    global _resampled_data
+    _resampled_data = resampled_data
+
+
+def _evaluate_worker_combinations(*task) -> Dict[Tuple[int, int, float], pandas.DataFrame]:
+    return _evaluate_combinations(_resampled_data, *task)
+
+
+def _evaluate_combinations(
+        resampled_data: Tuple[pandas.DatetimeIndex, numpy.ndarray, numpy.ndarray],
+        gap: int,
+        threshold: float,
+        max_hours: Iterable[int],
+        accuracy_range: range) -> Dict[Tuple[int, int, float], pandas.DataFrame]:
+    time, water_table_depth, precipitation = resampled_data
+    positions, boundaries = find_events(precipitation, threshold, gap)
+    profiling.record('FIND_EVENTS', n_rows=len(precipitation), n_events=len(boundaries) - 1)
+
+    # The parts of the summary which don't depend on max_hour are computed once
+    max_hours = list(max_hours)
+    summary_tables = _summarize_events_by_max_hour(
+        time, water_table_depth, precipitation, positions, boundaries, max_hours, accuracy_range
+    )
+
+    return {(gap, max_hour, threshold): summary_table for max_hour, summary_table in zip(max_hours, summary_tables)}
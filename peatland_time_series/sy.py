@@ -1,22 +1,59 @@
-from typing import Union
+import warnings
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas
 import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+from . import profiling, resampling
+from .cache import DEFAULT_MAX_CACHE_SIZE, load_sy, store_sy, sy_key
+from .events import extended_window_maxima, find_events, segment_sum, window_extrema
+from .time_series import _time_series_arrays, detect_date_format
+
+if TYPE_CHECKING:
+    import pyarrow
 
 SY_DATAFRAME_COLUMNS = ['date_beginning', 'date_ending', 'precipitation_sum', 'max_wtd', 'min_wtd',
                         'durations', 'intensities', 'delta_h', 'depth', 'sy', 'idx_max', 'idx_min',
                         'accuracy_mean', 'accuracy_std']
+SY_DATE_COLUMNS = ['date_beginning', 'date_ending', 'idx_max', 'idx_min']
+SY_FLOAT_COLUMNS = [column for column in SY_DATAFRAME_COLUMNS if column not in SY_DATE_COLUMNS]
+
+NANOSECONDS_PER_SECOND = 10 ** 9
+SECONDS_PER_DAY = 24 * 60 * 60
+
+SY_CACHE_SIZE = 128  # Number of Sy kept in memory
+# Version of the Sy calculation, to increment when its results change (the cached Sy of the other versions are not used)
+SY_ALGORITHM_VERSION = 3
+
+# Sy of the last calls of calculate_sy (with a cache), by key (see `cache.sy_key`)
+_sy_results: 'OrderedDict[str, pd.DataFrame]' = OrderedDict()
 
 
 def calculate_sy(
-        time_series: pd.DataFrame,
+        time_series: Union[pd.DataFrame, 'pyarrow.Table'],
         gap: int = 5,
         max_hour: int = 5,
         threshold: float = 0.3,
-        resample: Union[pandas.DateOffset, pandas.Timedelta, str] = 'H') -> pd.DataFrame:
+        resample: Union[pandas.DateOffset, pandas.Timedelta, str] = 'H',
+        accuracy_range: range = range(5, 15),
+        cache: bool = False,
+        cache_directory: Optional[str] = None,
+        max_cache_size: int = DEFAULT_MAX_CACHE_SIZE) -> pd.DataFrame:
     """Calculate the Specific Yield (Sy) from given time series.
 
+    Examples
+    --------
+    ```python
+    # The next calls with the same time series and parameters return the Sy of the first one
+    sy = calculate_sy(time_series, gap=5, max_hour=5, cache=True)
+
+    # Also between processes and sessions
+    sy = calculate_sy(time_series, gap=5, max_hour=5, cache_directory='./.cache')
+    ```
+
     Parameters
     ----------
     time_series : pandas.Dataframe
@@ -25,6 +62,9 @@ def calculate_sy(
         'date' refers to the date of the data acquisition ("YYYY-MM-DD hh:mm:ss", ex. "2011-06-15 15:00:00").
         'data_wtd' refers to the water table depth to the surface.
         'data_prec' refers to the precipitation measure.
+        It can also be an Arrow table (or record batch) with these 3 columns.
+        The columns are not copied when they already have the right types
+        (datetime64[ns] dates and float64 values), ex. when they are memory-mapped.
     gap : int
         Time which makes it possible to isolate rainy events.
         For example, if it does not rain for 6 hours and the gap parameter is equal to 5,
@@ -35,115 +75,360 @@ def calculate_sy(
         Precipitation threshold.
     resample : str
         Resample rule for the aggregation step. See pandas.DataFrame.resample doc for more details.
+    accuracy_range : range
+        Range of the search limits (in resampled steps after the end of the precipitation) used for the accuracy.
+        The accuracy is the mean and the standard deviation of the variation of the maximum
+        water level when the search limit is extended by one step of the range.
+    cache : bool
+        If True, the Sy is cached in memory (for the `SY_CACHE_SIZE` least recently used results),
+        by the content of the time series, the parameters and the version of the calculation (`SY_ALGORITHM_VERSION`).
+    cache_directory : str
+        Optional, directory where the Sy is also cached, in a binary format (see `read_time_series`).
+        Implies `cache`.
+    max_cache_size : int
+        Maximum size of the cache directory in bytes, the least recently used results are evicted first.
 
     Returns
     -------
     pandas.DataFrame
         Profile of effectives porosity.
+
+    See Also
+    --------
+    SyProfiler : to measure the stages of the calculation.
     """
-    ####### DEFINE_DATA ########
-    time = time_series.index.astype('datetime64[ns]')  # the index is the 'date' column
-    water_table_depth = time_series['data_wtd']
-    precipitation = time_series['data_prec']
+    timestamps, water_table_depth, precipitation = _time_series_arrays(time_series)
+
+    key = None
+    if cache or cache_directory is not None:
+        timestamps = _to_nanoseconds(timestamps)  # The same key for the same dates, whatever their type
+        water_table_depth = np.asarray(water_table_depth, dtype=float)
+        precipitation = np.asarray(precipitation, dtype=float)
+        parameters = (gap, max_hour, float(threshold), to_offset(resample).freqstr,
+                      (accuracy_range.start, accuracy_range.stop, accuracy_range.step))
+        key = sy_key((timestamps, water_table_depth, precipitation), parameters, SY_ALGORITHM_VERSION)
+
+        sy = _load_cached_sy(key, cache_directory, max_cache_size)
+        if sy is not None:
+            return sy
+
+    sy = calculate_sy_arrays(
+        timestamps,
+        water_table_depth,
+        precipitation,
+        gap=gap,
+        max_hour=max_hour,
+        threshold=threshold,
+        resample=resample,
+        accuracy_range=accuracy_range
+    )
+    sy = pd.DataFrame(sy, copy=False)
+
+    if key is not None:
+        _remember_sy(key, sy)
+        if cache_directory is not None:
+            store_sy(key, sy, cache_directory, max_cache_size)
+
+    return sy
 
-    ####### TRANSFORM_IN_PANDAS_DATAFRAME #######
-    df_water_table_depth = pd.DataFrame(water_table_depth)
-    df_water_table_depth.index = time
 
-    df_precipitation = pd.DataFrame(precipitation)
-    df_precipitation.index = time
+def calculate_sy_arrays(
+        timestamps: np.ndarray,
+        water_table_depth: np.ndarray,
+        precipitation: np.ndarray,
+        gap: int = 5,
+        max_hour: int = 5,
+        threshold: float = 0.3,
+        resample: Union[pandas.DateOffset, pandas.Timedelta, str] = 'H',
+        accuracy_range: range = range(5, 15)) -> Dict[str, np.ndarray]:
+    """Calculate the Specific Yield (Sy) from arrays, without DataFrames (see `calculate_sy`).
+
+    Examples
+    --------
+    ```python
+    sy = calculate_sy_arrays(timestamps, water_table_depth, precipitation, gap=5, max_hour=5)
+    sy['sy']  # Array of the Sy of the events
+    ```
+
+    Parameters
+    ----------
+    timestamps
+        Sorted array of the dates of the data acquisition, as int64 nanoseconds since the
+        epoch (like `pandas.Timestamp.value`) or as datetime64 values.
+    water_table_depth
+        Array of the water table depth to the surface.
+    precipitation
+        Array of the precipitation measures.
+    gap
+    max_hour
+    threshold
+    resample
+    accuracy_range
+        See the `calculate_sy` function.
+
+    Returns
+    -------
+    Dict[str, numpy.ndarray]
+        The arrays of the `SY_DATAFRAME_COLUMNS` fields (the dates are datetime64[ns]), one value per event.
+    """
+    _check_parameters(max_hour, accuracy_range)
+    profiling.start()
+
+    ####### DEFINE_DATA ########
+    timestamps = _to_nanoseconds(timestamps)
+    water_table_depth = np.asarray(water_table_depth, dtype=float)
+    precipitation = np.asarray(precipitation, dtype=float)
+    profiling.record('DEFINE_DATA', n_rows=len(timestamps))
 
     ####### RESAMPLE DATA #########
-    df_water_table_depth = df_water_table_depth.resample(resample).mean()
-    df_precipitation = df_precipitation.resample(resample).sum()
+    time, water_table_depth, precipitation = _resample_arrays(timestamps, water_table_depth, precipitation, resample)
+    profiling.record('RESAMPLE', n_rows=len(time))
 
     ####### FIND PRECIPITATION EVENTS #########
-    position60 = np.array(np.where(df_precipitation.data_prec.values > threshold)).squeeze()
-    diff60 = np.diff(position60)
-    gap60 = np.array(np.where(diff60 >= gap)).squeeze()
-    gap61 = np.insert(gap60, 0, -1)
-    gap61 = gap61[:-1]
+    positions, boundaries = find_events(precipitation, threshold, gap)
+    profiling.record('FIND_EVENTS', n_rows=len(precipitation), n_events=len(boundaries) - 1)
 
-    ####### ISOLATION_PRECIPITATION_EVENT ######
-    list_event = list()
-    precipitation_sum = np.zeros(len(gap61))
-    for j in range(0, len(gap61)):
-        precipitation_event = position60[gap61[j] + 1:gap60[j] + 1]
-        list_event.append(precipitation_event)
+    return _summarize_event_arrays(
+        time,
+        water_table_depth,
+        precipitation,
+        positions,
+        boundaries,
+        max_hour=max_hour,
+        accuracy_range=accuracy_range
+    )
+
+
+def _load_cached_sy(key: str, cache_directory: Optional[str], max_cache_size: int) -> Optional[pd.DataFrame]:
+    """Copy of the cached Sy (from memory, or else from the cache directory), None if it is not cached."""
+    if key in _sy_results:
+        _sy_results.move_to_end(key)
+        sy = _sy_results[key].copy()
+        if cache_directory is not None:  # Cached in memory by a call without this directory, or evicted from it
+            store_sy(key, sy, cache_directory, max_cache_size)
+
+        return sy
+
+    if cache_directory is None:
+        return None
+
+    sy = load_sy(key, cache_directory)
+    if sy is not None:
+        _remember_sy(key, sy)
+
+    return sy
+
+
+def _remember_sy(key: str, sy: pd.DataFrame):
+    _sy_results[key] = sy.copy()  # The returned Sy may be modified
+    if len(_sy_results) > SY_CACHE_SIZE:
+        _sy_results.popitem(last=False)
+
+
+def _to_nanoseconds(timestamps: np.ndarray) -> np.ndarray:
+    """Int64 nanoseconds since the epoch of int64 or datetime64 timestamps."""
+    timestamps = np.asarray(timestamps)
+    if np.issubdtype(timestamps.dtype, np.datetime64):
+        timestamps = timestamps.astype('datetime64[ns]', copy=False).view('i8')
+
+    return timestamps.astype('i8', copy=False)
 
-        precipitation_sum[j] = df_precipitation.iloc[precipitation_event].sum().values
+
+def _resample_arrays(
+        timestamps: np.ndarray,
+        water_table_depth: np.ndarray,
+        precipitation: np.ndarray,
+        resample: Union[pandas.DateOffset, pandas.Timedelta, str],
+        origin: Union[pandas.Timestamp, str] = 'start_day') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Resampled timestamps (int64 nanoseconds), water table depth (mean) and precipitation (sum).
+
+    The means and sums are bit-identical to `DataFrame.resample`, so the Sy does not depend on the resampling path.
+    """
+    resampled = resampling._resample(
+        timestamps, water_table_depth, precipitation, resample, origin, coverage=False, exact=True
+    )
+
+    return resampled.timestamps, resampled.water_table_depth, resampled.precipitation
+
+
+def _resample_time_series(
+        time_series: pd.DataFrame,
+        resample: Union[pandas.DateOffset, pandas.Timedelta, str],
+        origin: Union[pandas.Timestamp, str] = 'start_day') -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Resampled water table depth (mean) and precipitation (sum) DataFrames."""
+    ####### DEFINE_DATA ########
+    timestamps = _to_nanoseconds(time_series.index.values)  # the index is the 'date' column
+    profiling.record('DEFINE_DATA', n_rows=len(timestamps))
+
+    ####### RESAMPLE DATA #########
+    time, water_table_depth, precipitation = _resample_arrays(
+        timestamps,
+        time_series['data_wtd'].values.astype(float, copy=False),
+        time_series['data_prec'].values.astype(float, copy=False),
+        resample,
+        origin
+    )
+    index = pandas.DatetimeIndex(time.view('datetime64[ns]'))
+    profiling.record('RESAMPLE', n_rows=len(time))
+
+    return pd.DataFrame({'data_wtd': water_table_depth}, index=index), pd.DataFrame({'data_prec': precipitation}, index=index)
+
+
+def _check_parameters(max_hour: int, accuracy_range: range):
+    if max_hour < 1:
+        raise ValueError('The "max_hour" parameter must be at least 1.')
+
+    if len(accuracy_range) < 2:
+        raise ValueError('The "accuracy_range" parameter must contain at least 2 search limits.')
+
+
+def _summarize_events(
+        time: pandas.DatetimeIndex,
+        water_table_depth: np.ndarray,
+        precipitation: np.ndarray,
+        positions: np.ndarray,
+        boundaries: np.ndarray,
+        max_hour: int,
+        accuracy_range: range) -> pd.DataFrame:
+    """Summary table of the events found in the resampled data (see `events.find_events`)."""
+    return _summarize_events_by_max_hour(
+        time, water_table_depth, precipitation, positions, boundaries, [max_hour], accuracy_range
+    )[0]
+
+
+def _summarize_events_by_max_hour(
+        time: pandas.DatetimeIndex,
+        water_table_depth: np.ndarray,
+        precipitation: np.ndarray,
+        positions: np.ndarray,
+        boundaries: np.ndarray,
+        max_hours: Iterable[int],
+        accuracy_range: range) -> List[pd.DataFrame]:
+    """Summary tables of the same events for each `max_hour` (see `_summarize_events`)."""
+    return [
+        pd.DataFrame(sy, copy=False) for sy in _summarize_event_arrays_by_max_hour(
+            _to_nanoseconds(time.values), water_table_depth, precipitation, positions, boundaries, max_hours, accuracy_range
+        )
+    ]
+
+
+def _summarize_event_arrays(
+        time: np.ndarray,
+        water_table_depth: np.ndarray,
+        precipitation: np.ndarray,
+        positions: np.ndarray,
+        boundaries: np.ndarray,
+        max_hour: int,
+        accuracy_range: range) -> Dict[str, np.ndarray]:
+    """Arrays of the `SY_DATAFRAME_COLUMNS` of the events found in the resampled data (`time` in int64 nanoseconds)."""
+    return _summarize_event_arrays_by_max_hour(
+        time, water_table_depth, precipitation, positions, boundaries, [max_hour], accuracy_range
+    )[0]
+
+
+def _summarize_event_arrays_by_max_hour(
+        time: np.ndarray,
+        water_table_depth: np.ndarray,
+        precipitation: np.ndarray,
+        positions: np.ndarray,
+        boundaries: np.ndarray,
+        max_hours: Iterable[int],
+        accuracy_range: range) -> List[Dict[str, np.ndarray]]:
+    """`_summarize_event_arrays` for each `max_hour`.
+
+    Only the extrema of the water table depth (and what derives from them) depend on `max_hour`,
+    the precipitation, durations and accuracy of the events are computed once for all of them
+    (the summaries share these arrays).
+    """
+    ####### ISOLATION_PRECIPITATION_EVENT ######
+    precipitation_sum = segment_sum(precipitation[positions], boundaries)
 
     ####### BEGIN_END_NB_EVENTS #######
-    beginning = position60[gap61 + 1]
-    end = position60[gap60]
-    dates_beginning = df_precipitation.iloc[position60[gap61 + 1]].index
-    dates_ending = df_precipitation.iloc[position60[gap60]].index
-
-    ######## CREATE_MATRIX_FOR_MIN_MAX_IDENTIFICATION ########
-    water_table_depths = list()
-    idx_max = list()
-    idx_min = list()
-
-    for i in range(0, len(beginning)):
-        water_table_depths.append(df_water_table_depth.iloc[beginning[i]:end[i] + max_hour].values.squeeze())
-        idx_max.append(df_water_table_depth.iloc[beginning[i]:end[i] + max_hour].idxmax().tolist()[0])
-        idx_min.append(df_water_table_depth.iloc[beginning[i]:end[i] + max_hour].idxmin().tolist()[0])
-
-    ######## CALCULATE MIN_MAX_WTD ########
-    max_wtd = np.array([i.max() for i in water_table_depths])
-    min_wtd = np.array([i.min() for i in water_table_depths])
-
-    ######## ACCURACY CALCULATION ########
-    wtd_list_it_all = []
-    for j in range(5, 15):
-        wtd_list_it = list()
-
-        for i in range(0, len(beginning)):
-            wtd_list_it.append(df_water_table_depth.iloc[beginning[i]:end[i] + j].values.squeeze())
-
-        max_wtd_it = [i.max() for i in wtd_list_it]
-        wtd_list_it_all.append(max_wtd_it)
-
-    accuracy_means = pd.DataFrame(wtd_list_it_all).diff(axis=0).mean(axis=0).values
-    accuracy_stds = pd.DataFrame(wtd_list_it_all).diff(axis=0).std(axis=0).values
-
-    ######## SY_CALCULATION_AND_PREC_INTENSITY ########
-    # Added to account for rapid precipitation
-    durations = []
-    for date_beginning, date_ending in zip(dates_beginning, dates_ending):
-        if (date_ending - date_beginning).seconds == 0:
-            durations.append(0.5)
-        else:
-            durations.append((date_ending - date_beginning).seconds // 3600)
-
-    durations_array = np.array(durations)
-    intensities = precipitation_sum / durations_array
-    delta_h = max_wtd - min_wtd
-    sy = (precipitation_sum / delta_h) / 1000
-    depth = (max_wtd + min_wtd) / 2
-
-    ######## CREATE SUMMARY TABLE ########
-    summary_table = pd.DataFrame({
-        'date_beginning': dates_beginning,
-        'date_ending': dates_ending,
-        'precipitation_sum': precipitation_sum,
-        'max_wtd': max_wtd,
-        'min_wtd': min_wtd,
-        'durations': durations,
-        'intensities': intensities,
-        'delta_h': delta_h,
-        'depth': depth,
-        'sy': sy,
-        'idx_max': idx_max,
-        'idx_min': idx_min,
-        'accuracy_mean': accuracy_means,
-        'accuracy_std': accuracy_stds
-    })
-
-    return summary_table
-
-
-def read_sy(filepath: str) -> pandas.DataFrame:
+    beginning = positions[boundaries[:-1]]
+    end = positions[boundaries[1:] - 1]
+    dates_beginning = time[beginning]
+    dates_ending = time[end]
+    profiling.record('ISOLATION', n_rows=len(positions), n_events=len(beginning))
+
+    accuracy_means = accuracy_stds = durations = intensities = None
+    summary_tables = []
+    for max_hour in max_hours:
+        ######## CALCULATE MIN_MAX_WTD ########
+        max_wtd, min_wtd, position_max, position_min = window_extrema(
+            water_table_depth,
+            starts=beginning,
+            stops=np.minimum(end + max_hour, len(water_table_depth))
+        )
+        idx_max = _dates_at(time, position_max)
+        idx_min = _dates_at(time, position_min)
+        profiling.record('MIN_MAX', n_events=len(beginning))
+
+        if accuracy_means is None:
+            ######## ACCURACY CALCULATION ########
+            accuracy_maxima = extended_window_maxima(water_table_depth, beginning, end, accuracy_range)
+            # One row per event, starting with a NaN like `pandas.DataFrame.diff`, so that the
+            # reductions sum the same contiguous values as pandas does (identical rounding)
+            accuracy_differences = np.full((len(beginning), len(accuracy_range)), np.nan)
+            accuracy_differences[:, 1:] = np.diff(accuracy_maxima, axis=0).T
+
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', category=RuntimeWarning)  # Events without valid differences are NaN
+                accuracy_means = np.nanmean(accuracy_differences, axis=1)
+                accuracy_stds = np.nanstd(accuracy_differences, axis=1, ddof=1)
+            profiling.record('ACCURACY', n_events=len(beginning))
+
+        ######## SY_CALCULATION_AND_PREC_INTENSITY ########
+        if durations is None:
+            # Only the seconds component of the event length is used, like `datetime.timedelta.seconds`
+            seconds = (dates_ending - dates_beginning) // NANOSECONDS_PER_SECOND % SECONDS_PER_DAY
+            # Added to account for rapid precipitation. Always floats (like `SY_FLOAT_COLUMNS`), whether the events
+            # have 0.5 durations or not, so that the Sy of the chunks of a stream have the same types
+            durations = np.where(seconds == 0, 0.5, seconds // 3600)
+            intensities = precipitation_sum / durations
+
+        delta_h = max_wtd - min_wtd
+        sy = (precipitation_sum / delta_h) / 1000
+        depth = (max_wtd + min_wtd) / 2
+        profiling.record('SY_CALCULATION', n_events=len(beginning))
+
+        ######## CREATE SUMMARY TABLE ########
+        summary_tables.append({
+            'date_beginning': dates_beginning.view('datetime64[ns]'),
+            'date_ending': dates_ending.view('datetime64[ns]'),
+            'precipitation_sum': precipitation_sum,
+            'max_wtd': max_wtd,
+            'min_wtd': min_wtd,
+            'durations': durations,
+            'intensities': intensities,
+            'delta_h': delta_h,
+            'depth': depth,
+            'sy': sy,
+            'idx_max': idx_max,
+            'idx_min': idx_min,
+            'accuracy_mean': accuracy_means,
+            'accuracy_std': accuracy_stds
+        })
+        profiling.record('SUMMARY', n_events=len(beginning))
+
+    return summary_tables
+
+
+def _empty_sy(index: pandas.Index) -> pd.DataFrame:
+    """Sy without event, with the columns and types of the `calculate_sy` output."""
+    types = {**{column: 'datetime64[ns]' for column in SY_DATE_COLUMNS}, **{column: float for column in SY_FLOAT_COLUMNS}}
+
+    return pd.DataFrame(index=index, columns=SY_DATAFRAME_COLUMNS).astype(types)
+
+
+def _dates_at(time: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """Dates (datetime64[ns]) of the int64 nanoseconds at the given positions, NaT where the position is -1."""
+    dates = time[positions].view('datetime64[ns]')
+    dates[positions == -1] = np.datetime64('NaT')
+
+    return dates
+
+
+def read_sy(filepath: str, date_format: Optional[str] = None) -> pandas.DataFrame:
     """Read the Sy file as a DataFrame.
 
     Read the Sy csv file which was precedently calculated with
@@ -154,23 +439,26 @@ def read_sy(filepath: str) -> pandas.DataFrame:
     filepath
         CSV like file of Sy (see the `calculate_sy` for more information
         on the format).
+    date_format
+        Optional, format of the dates (see https://strftime.org/).
+        By default, the format is detected from the first date.
 
     Returns
     -------
     pandas.DataFrame
         DataFrame of the Sy with related infromation.
     """
-    sy = pandas.read_csv(filepath)
+    sy = pandas.read_csv(filepath, dtype={column: float for column in SY_FLOAT_COLUMNS})
 
     for column in SY_DATAFRAME_COLUMNS:
         if column not in sy.columns:
             raise ValueError(f"Columns \"{', '.join(SY_DATAFRAME_COLUMNS)}\" must be in the Sy file: \"{filepath}\"")
 
     # Dates are of string type, they have to be converted to datetime to be usable.
-    sy['date_beginning'] = pandas.to_datetime(sy['date_beginning'])
-    sy['date_ending'] = pandas.to_datetime(sy['date_ending'])
+    if date_format is None and len(sy) > 0:
+        date_format = detect_date_format(sy['date_beginning'].iloc[0])
 
-    sy['idx_min'] = pandas.to_datetime(sy['idx_min'])
-    sy['idx_max'] = pandas.to_datetime(sy['idx_max'])
+    for column in SY_DATE_COLUMNS:
+        sy[column] = pandas.to_datetime(sy[column], format=date_format)
 
     return sy
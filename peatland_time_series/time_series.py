@@ -1,33 +1,291 @@
+import csv
+import gzip
+import io
+import os
+from datetime import datetime
+from typing import IO, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy
 import pandas
 
+try:
+    import pyarrow
+    import pyarrow.csv
+    import pyarrow.ipc
+except ImportError:  # Optional dependency, the pandas parser is used instead
+    pyarrow = None
+
+from .cache import DEFAULT_MAX_CACHE_SIZE, load_time_series, store_time_series
+
 TIME_SERIES_COLUMNS = ['date', 'data_wtd', 'data_prec']
+ISO_DATE_FORMATS = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d']
+DATE_FORMATS = ISO_DATE_FORMATS + ['%Y/%m/%d %H:%M:%S', '%Y/%m/%d %H:%M']
+# Compression of the time series files, by extension
+COMPRESSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+# Binary time series files, memory-mapped rather than parsed
+ARROW_EXTENSIONS = ['.arrow', '.feather']
+NUMPY_EXTENSION = '.npy'
 
-def read_time_series(filepath: str) -> pandas.DataFrame:
+def read_time_series(
+        filepath: str,
+        date_format: Optional[str] = None,
+        cache_directory: Optional[str] = None,
+        max_cache_size: int = DEFAULT_MAX_CACHE_SIZE) -> pandas.DataFrame:
     """Read the time series file as a DataFrame.
 
+    Examples
+    --------
+    ```python
+    # The first call parses the CSV file, the next ones memory-map the cached columns
+    time_series = read_time_series('./tests/data/kmr_area_c.csv', cache_directory='./.cache')
+
+    # Memory-mapped, without parsing nor copy
+    time_series = read_time_series('./data/time-series.arrow')
+    ```
+
     Parameters
     ----------
     filepath
        CSV like file of time series with at least the 3 following columns: 'date', 'data_wtd' and 'data_prec'.
         'date' refers to the date of the data acquisition ("YYYY-MM-DD hh:mm:ss", ex. "2011-06-15 15:00:00").
         'data_wtd' refers to the water table depth to the surface.
-        'data_prec' refers to the precipitation measure. 
+        'data_prec' refers to the precipitation measure.
+        The file can be compressed with gzip (".gz" extension) or zstd (".zst" extension, pyarrow is then required).
+        It can also be a binary file, which is memory-mapped (the time series is then read-only):
+        an Arrow IPC file (".arrow" or ".feather" extension, pyarrow is then required) with these columns,
+        or a numpy file (".npy" extension) of a structured array with these fields.
+        The columns are not copied when they have the right types (datetime64[ns] dates and float64 values),
+        and for Arrow, when the file is not compressed and has a single record batch without nulls.
+    date_format
+        Optional, format of the dates (see https://strftime.org/).
+        By default, the format is detected from the first date (see `detect_date_format`).
+    cache_directory
+        Optional, directory where the parsed time series are cached in a binary format.
+        The cache is invalidated when the file is modified. The binary files are not cached.
+        The time series loaded from the cache are read-only.
+    max_cache_size
+        Maximum size of the cache directory in bytes, the least recently used time series are evicted first.
 
     Returns
     -------
     pandas.DataFrame
         The time series as a DataFrame.
     """
-    time_series = pandas.read_csv(filepath)
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension in ARROW_EXTENSIONS:
+        return _read_arrow_ipc(filepath)
+    if extension == NUMPY_EXTENSION:
+        return _read_npy(filepath)
+
+    if cache_directory is not None:
+        time_series = load_time_series(filepath, cache_directory, date_format)
+        if time_series is not None:
+            return time_series
+
+    requested_date_format = date_format
+    first_row = _read_first_row(filepath)
+    if date_format is None and first_row is not None:
+        date_format = detect_date_format(first_row['date'])
+
+    time_series = None
+    if pyarrow is not None:
+        try:
+            time_series = _read_csv_with_arrow(filepath, date_format)
+        except pyarrow.ArrowInvalid:  # Values that Arrow can't parse, let pandas parse them (or raise a clear error)
+            pass
+
+    if time_series is None:
+        with _open(filepath) as file:
+            time_series = _to_time_series(_read_csv(file), date_format)
+
+    if cache_directory is not None:
+        store_time_series(filepath, time_series, cache_directory, max_cache_size, requested_date_format)
+
+    return time_series
+
+
+def read_time_series_chunks(
+        filepath: str,
+        chunksize: int = 100_000,
+        date_format: Optional[str] = None) -> Iterator[pandas.DataFrame]:
+    """Read the time series file as successive DataFrames of at most `chunksize` rows.
+
+    This allows to process files which do not fit in memory,
+    see the `calculate_sy_stream` function.
+
+    Examples
+    --------
+    ```python
+    chunks = read_time_series_chunks('./tests/data/kmr_area_c.csv', chunksize=10_000)
+    sy = pandas.concat(calculate_sy_stream(chunks))
+    ```
+
+    Parameters
+    ----------
+    filepath
+        CSV like file of time series (see the `read_time_series` function).
+    chunksize
+        Number of rows per chunk.
+    date_format
+        Optional, format of the dates (see the `read_time_series` function).
+
+    Returns
+    -------
+    Iterator[pandas.DataFrame]
+        The time series chunks, in the same format as the `read_time_series` output.
+    """
+    first_row = _read_first_row(filepath)
+    if date_format is None and first_row is not None:
+        date_format = detect_date_format(first_row['date'])
+
+    with _open(filepath) as file, _read_csv(file, chunksize=chunksize) as reader:
+        for time_series in reader:
+            yield _to_time_series(time_series, date_format)
+
+
+def _open(filepath: str) -> IO[bytes]:
+    """Open the file in binary mode, decompressing it if it is compressed (see `COMPRESSIONS`)."""
+    compression = COMPRESSIONS.get(os.path.splitext(filepath)[1].lower())
+    if compression == 'gzip':
+        return gzip.open(filepath)
+    if compression == 'zstd':
+        if pyarrow is None:
+            raise ImportError(f'pyarrow is required to read the zstd-compressed file "{filepath}" '
+                              '(pip install peatland-time-series[arrow]).')
+        return pyarrow.input_stream(filepath, compression='zstd')
 
+    return open(filepath, 'rb')
+
+
+def _read_first_row(filepath: str) -> Optional[Dict[str, str]]:
+    """Read the first row of the file, checking that the header has the time series columns."""
+    with io.TextIOWrapper(_open(filepath), newline='') as file:
+        reader = csv.DictReader(file)
+        first_row = next(reader, None)
+        _check_columns(reader.fieldnames or [], filepath)
+
+    return first_row
+
+
+def _check_columns(columns: List[str], filepath: str):
     for column in TIME_SERIES_COLUMNS:
-        if column not in time_series.columns:
+        if column not in columns:
             raise ValueError(f"Columns \"{', '.join(TIME_SERIES_COLUMNS)}\" must be in the time series file: \"{filepath}\"")
 
 
-    time_series = time_series[TIME_SERIES_COLUMNS]  # Keeping only these columns
-    time_series['date'] = pandas.to_datetime(time_series['date'])  # Getting dates
+def _read_csv(file: IO[bytes], **kwargs) -> Union[pandas.DataFrame, pandas.io.parsers.TextFileReader]:
+    """Read only the time series columns of the (decompressed) file, with their known types."""
+    return pandas.read_csv(
+        file,
+        usecols=TIME_SERIES_COLUMNS,
+        dtype={'date': str, 'data_wtd': float, 'data_prec': float},
+        **kwargs
+    )
+
+
+def _read_csv_with_arrow(filepath: str, date_format: Optional[str]) -> pandas.DataFrame:
+    """Read only the time series columns of the file with Arrow, which parses the dates natively.
+
+    Arrow detects the compression of the file from its extension.
+    """
+    table = pyarrow.csv.read_csv(filepath, convert_options=pyarrow.csv.ConvertOptions(
+        include_columns=TIME_SERIES_COLUMNS,
+        column_types={'date': pyarrow.timestamp('ns'), 'data_wtd': pyarrow.float64(), 'data_prec': pyarrow.float64()},
+        # Arrow's own ISO 8601 parser is faster than the strptime one
+        timestamp_parsers=[date_format] if date_format not in ISO_DATE_FORMATS + [None] else None
+    ))
+
+    return _arrow_to_time_series(table)
+
+
+def _read_arrow_ipc(filepath: str) -> pandas.DataFrame:
+    """Memory-map the time series of an Arrow IPC (Feather v2) file."""
+    if pyarrow is None:
+        raise ImportError(f'pyarrow is required to read the Arrow file "{filepath}" (pip install peatland-time-series[arrow]).')
+
+    # The arrays keep the memory map open
+    table = pyarrow.ipc.open_file(pyarrow.memory_map(filepath)).read_all()
+    _check_columns(table.schema.names, filepath)
+
+    return _arrow_to_time_series(table)
+
+
+def _read_npy(filepath: str) -> pandas.DataFrame:
+    """Memory-map the time series of a numpy file of a structured array (the columns are views of its fields)."""
+    values = numpy.load(filepath, mmap_mode='r')
+    _check_columns(list(values.dtype.names or []), filepath)
+
+    return pandas.DataFrame(
+        {column: values[column] for column in TIME_SERIES_COLUMNS[1:]},
+        index=pandas.DatetimeIndex(values['date'], name='date', copy=False),
+        copy=False
+    )
+
+
+def _arrow_to_time_series(table: 'pyarrow.Table') -> pandas.DataFrame:
+    date, water_table_depth, precipitation = _arrow_to_arrays(table)
+
+    return pandas.DataFrame(
+        {'data_wtd': water_table_depth, 'data_prec': precipitation},
+        index=pandas.DatetimeIndex(date, name='date', copy=False),
+        copy=False
+    )
+
+
+def _arrow_to_arrays(table: Union['pyarrow.Table', 'pyarrow.RecordBatch']) -> Tuple[numpy.ndarray, ...]:
+    """Arrays of the time series columns of an Arrow table (or record batch).
+
+    A column made of a single chunk without nulls is a view of the Arrow buffer (read-only),
+    the other columns are copied (and their nulls are NaN or NaT).
+    """
+    arrays = []
+    for column in TIME_SERIES_COLUMNS:
+        array = table.column(column)
+        if isinstance(array, pyarrow.ChunkedArray) and array.num_chunks == 1:
+            array = array.chunk(0)
+        arrays.append(array.to_numpy(zero_copy_only=False))
+
+    return tuple(arrays)
+
+
+def _time_series_arrays(time_series: Union[pandas.DataFrame, 'pyarrow.Table']) -> Tuple[numpy.ndarray, ...]:
+    """Dates, water table depth and precipitation arrays of a time series DataFrame or Arrow table, without copy."""
+    if pyarrow is not None and isinstance(time_series, (pyarrow.Table, pyarrow.RecordBatch)):
+        return _arrow_to_arrays(time_series)
+
+    return time_series.index.values, time_series['data_wtd'].values, time_series['data_prec'].values
+
+
+def _to_time_series(time_series: pandas.DataFrame, date_format: Optional[str]) -> pandas.DataFrame:
+    """Set the parsed dates as index (in place, the values are not copied)."""
+    dates = time_series.pop('date')
+    time_series.index = pandas.DatetimeIndex(pandas.to_datetime(dates, format=date_format), name='date')
+
+    if list(time_series.columns) != TIME_SERIES_COLUMNS[1:]:
+        time_series = time_series[TIME_SERIES_COLUMNS[1:]]  # The columns are ordered as in the file
+
+    return time_series
+
+
+def detect_date_format(date: str) -> Optional[str]:
+    """Detect the format of a date among the usual formats of the loggers.
+
+    Parameters
+    ----------
+    date
+        A date as a string (ex. "2011-06-15 15:00:00").
+
+    Returns
+    -------
+    Optional[str]
+        The format of the date (see https://strftime.org/), None if not detected.
+    """
+    for date_format in DATE_FORMATS:
+        try:
+            datetime.strptime(date, date_format)
+        except ValueError:
+            continue
 
-    time_series = time_series.set_index('date')
+        return date_format
 
-    return time_series
\ No newline at end of file
+    return None
@@ -1,5 +1,8 @@
 import numpy
 
+# Color of the precipitation, twin axis of the water level figures
+TWIN_COLOR = 'royalblue'
+
 
 def power_law(x, a, b):
     return a * numpy.power(x, b)
@@ -6,12 +6,12 @@ import matplotlib.dates as mdates
 import numpy
 import numpy as np
 import pandas
-from scipy.optimize import curve_fit
 from matplotlib.ticker import FixedLocator
 
-from .util import power_law, inverse_power_law
-
-TWIN_COLOR = 'royalblue'
+from .downsampling import WaterLevelPyramid
+from .fitting import bootstrap_power_law, fit_depth_power_law
+from .selection import PointSelector
+from .util import TWIN_COLOR, power_law, inverse_power_law
 
 
 def show_selector(sy: pandas.DataFrame, figsize: Optional[Tuple[int, int]] = None, *args, **kwargs) -> Set[int]:
@@ -51,24 +51,14 @@ def show_selector(sy: pandas.DataFrame, figsize: Optional[Tuple[int, int]] = Non
     else:
         fig, ax = plt.subplots()
 
-    scatter_plot = ax.scatter(sy['sy'], sy['depth'], picker=True, color=['blue'] * len(sy['sy']), *args, **kwargs)
+    scatter_plot = ax.scatter(sy['sy'], sy['depth'], color=['blue'] * len(sy['sy']), *args, **kwargs)
     ax.set_xlabel('Sy')
     ax.set_ylabel('Depth [m]')
 
-    selected_indexes = set()
-
-    def on_pick(event):
-        indexes = event.ind
-        for index in indexes:
-            selected_indexes.add(index)
-            scatter_plot._facecolors[index] = numpy.array([1, 0, 0, 1])  # Set to color Red
-            scatter_plot._edgecolors[index] = numpy.array([1, 0, 0, 1])  # Set to color Red
-            fig.canvas.draw()
-
-    fig.canvas.mpl_connect('pick_event', on_pick)
+    selector = PointSelector(ax, scatter_plot, style='highlight')  # Set to color Red
     plt.show()
 
-    return selected_indexes
+    return selector.selected_indexes
 
 
 def show_depth(sy: pandas.DataFrame,
@@ -80,7 +70,10 @@ def show_depth(sy: pandas.DataFrame,
                show_legend: bool = False,
                show_indexes: bool = False,
                x_limits: Optional[Tuple[float, float]] = None,
-               y_limits: Optional[Tuple[float, float]] = None) -> Optional[Union[Set[int], plt.Figure]]:
+               y_limits: Optional[Tuple[float, float]] = None,
+               show_bands: bool = False,
+               n_replicates: int = 1000,
+               selection_mode: str = 'click') -> Optional[Union[Set[int], plt.Figure]]:
     """Plot the depth in function of Sy.
 
     Examples
@@ -94,6 +87,8 @@ def show_depth(sy: pandas.DataFrame,
     visualization.show_depth(sy, height_of_line=2)
     # For selecting indexes (for removing data points for exemple)
     selected_indexes = visualization.show_depth(sy, select=True)
+    # Many points at once, inside a free-form path (or a rectangle with selection_mode='box')
+    selected_indexes = visualization.show_depth(sy, select=True, selection_mode='lasso')
     ```
 
     Parameters
@@ -121,6 +116,16 @@ def show_depth(sy: pandas.DataFrame,
         Tuple of the limits for the x axis.
     y_limits
         Tuple of the limits for the y axis.
+    show_bands
+        If True, shade the 95% bootstrap confidence and prediction bands of the power law
+        (see `fitting.bootstrap_power_law`).
+    n_replicates
+        Number of bootstrap replicates of the bands.
+    selection_mode
+        If "select" is True, "click" to select the data points one click at a time,
+        "lasso" to select the data points inside a free-form path, or "box" to select
+        the data points inside a rectangle (see `selection.PointSelector`).
+        The data points can be clicked in all the modes.
 
     Returns
     -------
@@ -129,16 +134,18 @@ def show_depth(sy: pandas.DataFrame,
     """
     fig, ax = plt.subplots(figsize=(10, 6))
 
-    sy['depth'] = sy['depth'] * 100  # To have the values in cm rather than m
-    sy['min_wtd'] = sy['min_wtd'] * 100  # To have the values in cm rather than m
-    sy['max_wtd'] = sy['max_wtd'] * 100  # To have the values in cm rather than m
+    # Derived arrays in cm rather than m, the Sy DataFrame is not modified
+    sy_values = sy['sy'].values
+    depth = sy['depth'].values * 100
+    min_wtd = sy['min_wtd'].values * 100
+    max_wtd = sy['max_wtd'].values * 100
     precepitation_sum = sy['precipitation_sum'].values
 
     # For the error bars
     ax.errorbar(
-        x=sy['sy'],
-        y=sy['depth'],
-        yerr=(sy['min_wtd'] - sy['max_wtd']) / 2,
+        x=sy_values,
+        y=depth,
+        yerr=(max_wtd - min_wtd) / 2,
         c='gray',
         fmt=',',  # Marker is a pixel
         alpha=.5,
@@ -147,39 +154,45 @@ def show_depth(sy: pandas.DataFrame,
 
     # Use mean depth or mininal depth data points
     depth_values_label = 'min_wtd' if use_min_depth else 'depth'
+    depth_values = min_wtd if use_min_depth else depth
 
     # For the scatter plot
-    scatter_plot = ax.scatter(x=sy['sy'], y=sy[depth_values_label],
+    scatter_plot = ax.scatter(x=sy_values, y=depth_values,
                               c=precepitation_sum, s=precepitation_sum,
-                              vmin=min(precepitation_sum), vmax=max(precepitation_sum),
-                              picker=select)
+                              vmin=min(precepitation_sum), vmax=max(precepitation_sum))
     fig.colorbar(scatter_plot, label='Precipitation sum [mm]')
 
     # Annotation of the data points
     if show_indexes:
-        for index, row in sy[['sy', depth_values_label]].iterrows():
-            ax.annotate(index, (row['sy'] + 0.01, row[depth_values_label] - 2))
+        for index, sy_value, depth_value in zip(sy.index, sy_values, depth_values):
+            ax.annotate(index, (sy_value + 0.01, depth_value - 2))
 
     # Plotting the "asymptote" line
-    sorted_sy = np.sort(sy['sy'])
+    sorted_sy = np.sort(sy_values)
 
     if height_of_line is not None:
         ax.plot(sorted_sy, [height_of_line for _ in sorted_sy], '--', color='gray', alpha=.5)
 
-    # Curve fit
-    pars, cov = curve_fit(f=power_law, xdata=sy['sy'], ydata=sy[depth_values_label])
-    standard_deviation = numpy.sqrt(numpy.diag(cov))
-    a, b = pars[0], pars[1]
-    standard_deviation_a, standard_deviation_b = standard_deviation[0], standard_deviation[1]
+    # Curve fit (cached, the same data is not fitted again)
+    fit = fit_depth_power_law(sy, depth_values_label)
+    a, b = fit.a, fit.b
+    standard_deviation_a, standard_deviation_b = fit.standard_deviation_a, fit.standard_deviation_b
     ax.plot(
         sorted_sy,
-        power_law(sorted_sy, a, b),
+        fit(sorted_sy),
         label=f'$Depth = a \cdot (Sy)^b$\n'
               f'$\quad a = {a:.4f}\ cm, \sigma_a = {standard_deviation_a:.4f}\ cm$\n'
               f'$\quad b = {b:.4f}\qquad, \sigma_b = {standard_deviation_b:.4f}$',
         color='gray', alpha=.5
     )
 
+    if show_bands:
+        bands = bootstrap_power_law(sy_values, depth_values, x_values=sorted_sy[sorted_sy > 0], n_replicates=n_replicates)
+        ax.fill_between(bands.x, bands.prediction_lower, bands.prediction_upper,
+                        color='gray', alpha=.1, linewidth=0, label='95% prediction band')
+        ax.fill_between(bands.x, bands.confidence_lower, bands.confidence_upper,
+                        color='gray', alpha=.25, linewidth=0, label='95% confidence band')
+
     if power_law_x_axis:
         # Transforming Sy axis show an linear expression in plot
         ax.set_xscale('function', functions=(lambda x: power_law(x, a, b), lambda x: inverse_power_law(x, a, b)))
@@ -209,19 +222,10 @@ def show_depth(sy: pandas.DataFrame,
     plt.tight_layout()
 
     if select:
-        selected_indexes = set()
-
-        def on_pick(event):
-            indexes = event.ind
-            for index in indexes:
-                selected_indexes.add(index)
-                scatter_plot._sizes[index] = 0
-                fig.canvas.draw()
-
-        fig.canvas.mpl_connect('pick_event', on_pick)
+        selector = PointSelector(ax, scatter_plot, mode=selection_mode, style='hide')
         plt.show()
 
-        return selected_indexes
+        return selector.selected_indexes
     
     if not show_plot:
         return fig
@@ -283,7 +287,9 @@ def show_water_level(
         fig_size: Optional[Tuple[int, int]] = None,
         date_format: Optional[str] = '%H',
         xlabel_rotation: Optional[int] = 0,
-        show_plot: bool = True) -> Optional[plt.Figure]:
+        show_plot: bool = True,
+        downsample: Optional[str] = None,
+        pyramid: Optional[WaterLevelPyramid] = None) -> Optional[plt.Figure]:
     """Plot the water level in function of the time.
 
     Examples
@@ -299,6 +305,11 @@ def show_water_level(
         time_before=pandas.Timedelta(hours=10),
         time_after=pandas.Timedelta(hours=20)
     )
+
+    # Long windows of frequent measures are drawn with a few points per pixel
+    pyramid = WaterLevelPyramid(time_series)  # Reused by the plots of all the events
+    show_water_level(time_series, sy, event_index=30, time_before=pandas.Timedelta(days=60),
+                     time_after=pandas.Timedelta(days=60), pyramid=pyramid)
     ```
 
     Parameters
@@ -321,6 +332,13 @@ def show_water_level(
         Rotation of the x axis label. This may be useful when using complete dates on the x axis.
     show_plot
         If True, "plt.show()" is called, if False, the figure is return.
+    downsample
+        Optional, "minmax" or "lttb" to draw the water level with a few samples per pixel
+        (see `WaterLevelPyramid.water_table_depth`) and the precipitation summed per pixel
+        as a single filled step, rather than every sample and one bar per measure.
+    pyramid
+        Optional, `WaterLevelPyramid` of the time series, to plot many windows of the same
+        time series without summarizing the samples again. Implies "minmax" if "downsample" is None.
 
     Returns
     -------
@@ -330,25 +348,47 @@ def show_water_level(
     beginning = sy['date_beginning'].loc[event_index] - time_before
     ending = sy['date_ending'].loc[event_index] + time_after
 
-    sub_time_series = time_series.loc[beginning:ending]
-
     fig, ax = plt.subplots(figsize=fig_size if fig_size else (10, 6))
+    ax_precipitation = ax.twinx()
+
+    if downsample is None and pyramid is None:
+        sub_time_series = time_series.loc[beginning:ending]
+
+        # Water table Depth plot
+        ax.plot(sub_time_series.index, sub_time_series['data_wtd'], color='black')
+
+        # Twin plot for the precipitation
+        ax_precipitation.bar(
+            sub_time_series.index,
+            sub_time_series['data_prec'],
+            color=TWIN_COLOR,
+            alpha=0.5,
+            width=0.02
+        )
+
+    else:
+        # One bucket per pixel of the axes
+        n_buckets = max(int(ax.get_window_extent().width), 3)
+        if pyramid is None:
+            pyramid = WaterLevelPyramid(time_series.loc[beginning:ending])
+
+        dates, water_table_depth = pyramid.water_table_depth(beginning, ending, n_buckets, downsample or 'minmax')
+        ax.plot(dates, water_table_depth, color='black')
+
+        edges, precipitation = pyramid.precipitation(beginning, ending, n_buckets)
+        ax_precipitation.fill_between(
+            edges,
+            numpy.append(precipitation, precipitation[-1]),
+            step='post',
+            color=TWIN_COLOR,
+            alpha=0.5,
+            linewidth=0
+        )
+        ax_precipitation.set_ylim(bottom=0)
 
-    # Water table Depth plot
-    ax.plot(sub_time_series.index, sub_time_series['data_wtd'], color='black')
     ax.set_xlabel('Time [h]')
     ax.set_ylabel('Water level [m]')
 
-    # Twin plot for the precipitation
-    # ------------------------------------------
-    ax_precipitation = ax.twinx()
-    ax_precipitation.bar(
-        sub_time_series.index,
-        sub_time_series['data_prec'],
-        color=TWIN_COLOR,
-        alpha=0.5,
-        width=0.02
-    )
     # Setting the color to all elements of the twin plot
     ax_precipitation.set_ylabel('Prec. [mm]', color=TWIN_COLOR)
     ax_precipitation.spines['right'].set_color(TWIN_COLOR)
@@ -0,0 +1,116 @@
+import glob
+import gzip
+import os
+import shutil
+
+import pandas
+import pytest
+
+from peatland_time_series.batch import calculate_sy_batch, main, read_time_series_batch
+from peatland_time_series.sy import calculate_sy
+from peatland_time_series.time_series import read_time_series
+
+TIME_SERIES_DIRECTORY = './tests/data/time_series/time_series/ahlenmoor'
+TIME_SERIES_GLOB = './tests/data/time_series/time_series/**/*.csv'
+TIME_SERIES_PATH = './tests/data/time_series/time_series/ahlenmoor/ahlenmoor_af_naturnah_sp.csv'
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_calculate_sy_batch(max_workers):
+    sy, errors = calculate_sy_batch(TIME_SERIES_DIRECTORY, max_workers=max_workers)
+
+    assert errors == {}
+    assert sy.index.names == ['site', 'event']
+    assert len(sy.index.unique('site')) == 6
+
+    expected = calculate_sy(read_time_series(TIME_SERIES_PATH))
+    pandas.testing.assert_frame_equal(sy.loc['ahlenmoor_af_naturnah_sp'], expected, check_names=False)
+
+
+def test_calculate_sy_batch_with_bad_file():
+    sy, errors = calculate_sy_batch(TIME_SERIES_GLOB, max_workers=2)
+
+    assert list(errors) == ['bad-time-series']
+    assert isinstance(errors['bad-time-series'], ValueError)
+    assert len(sy.index.unique('site')) == 6
+
+
+def test_calculate_sy_batch_without_valid_file(tmp_path):
+    shutil.copy(TIME_SERIES_GLOB.replace('**/*.csv', 'bad-time-series.csv'), tmp_path / 'bad-time-series.csv')
+    (tmp_path / 'empty.csv').write_text('')
+
+    sy, errors = calculate_sy_batch(str(tmp_path), max_workers=1)
+
+    assert sorted(errors) == ['bad-time-series', 'empty']
+    assert sy.empty
+    assert sy.index.names == ['site', 'event']
+    expected = calculate_sy(read_time_series(TIME_SERIES_PATH))
+    pandas.testing.assert_series_equal(sy.dtypes, expected.dtypes)
+
+
+def test_calculate_sy_batch_with_same_file_names(tmp_path):
+    for peatland in ['peatland_1', 'peatland_2']:
+        os.makedirs(tmp_path / peatland)
+        shutil.copy(TIME_SERIES_PATH, tmp_path / peatland / 'logger.csv')
+    shutil.copy(TIME_SERIES_PATH, tmp_path / 'peatland_2' / 'other.csv')
+    with open(TIME_SERIES_PATH, 'rb') as file, gzip.open(tmp_path / 'peatland_2' / 'other.csv.gz', 'wb') as output:
+        shutil.copyfileobj(file, output)
+    shutil.copy(TIME_SERIES_PATH, tmp_path / 'peatland_2' / 'unique.csv')
+
+    sy, errors = calculate_sy_batch(str(tmp_path / '**' / '*.csv*'), max_workers=1)
+
+    # The files of the same site in a directory are an error, the others are computed
+    assert list(errors) == ['other']
+    assert sorted(sy.index.unique('site')) == ['peatland_1/logger', 'peatland_2/logger', 'unique']
+    pandas.testing.assert_frame_equal(sy.loc['peatland_1/logger'], sy.loc['unique'])
+
+
+def test_main(tmp_path):
+    output = tmp_path / 'sy.csv'
+
+    assert main([TIME_SERIES_GLOB, str(output), '--workers', '2']) == 1
+
+    sy = pandas.read_csv(output)
+    assert 'site' in sy.columns
+
+
+@pytest.mark.parametrize('max_workers', [1, 4])
+def test_read_time_series_batch(max_workers):
+    time_series, errors = read_time_series_batch(TIME_SERIES_GLOB, max_workers=max_workers)
+
+    assert list(errors) == ['bad-time-series']
+    assert isinstance(errors['bad-time-series'], ValueError)
+    assert len(time_series) == 6
+    pandas.testing.assert_frame_equal(time_series['ahlenmoor_af_naturnah_sp'], read_time_series(TIME_SERIES_PATH))
+
+
+def test_read_time_series_batch_of_compressed_files(tmp_path):
+    for filepath in glob.glob(f'{TIME_SERIES_DIRECTORY}/*.csv'):
+        with open(filepath, 'rb') as file, gzip.open(tmp_path / f'{os.path.basename(filepath)}.gz', 'wb') as output:
+            shutil.copyfileobj(file, output)
+
+    time_series, errors = read_time_series_batch(str(tmp_path), concat=True)
+    expected, _ = read_time_series_batch(TIME_SERIES_DIRECTORY, concat=True)
+
+    assert errors == {}
+    assert time_series.index.names == ['site', 'date']
+    pandas.testing.assert_frame_equal(time_series, expected)
+
+
+def test_read_time_series_batch_of_list():
+    filepaths = sorted(glob.glob(TIME_SERIES_GLOB, recursive=True))
+
+    time_series, errors = read_time_series_batch(filepaths, concat=True)
+
+    assert list(errors) == ['bad-time-series']
+    assert list(time_series.index.unique('site')) == sorted(
+        os.path.splitext(os.path.basename(filepath))[0] for filepath in filepaths if 'bad' not in filepath
+    )
+
+
+def test_read_time_series_batch_without_valid_file():
+    time_series, errors = read_time_series_batch([TIME_SERIES_GLOB.replace('**/*.csv', 'bad-time-series.csv')], concat=True)
+
+    assert list(errors) == ['bad-time-series']
+    assert time_series.empty
+    assert list(time_series.columns) == ['data_wtd', 'data_prec']
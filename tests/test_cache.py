@@ -0,0 +1,183 @@
+import os
+import shutil
+from collections import OrderedDict
+
+import numpy
+import pandas
+import pytest
+
+from peatland_time_series import cache, sy as sy_module
+from peatland_time_series.cache import evict_cache
+from peatland_time_series.sy import calculate_sy
+from peatland_time_series.time_series import read_time_series
+
+TIME_SERIES_PATH = './tests/data/time_series/time_series/ahlenmoor/ahlenmoor_af_naturnah_sp.csv'
+OTHER_TIME_SERIES_PATH = './tests/data/time_series/time_series/ahlenmoor/ahlenmoor_af_siteam4.csv'
+
+
+def test_read_time_series_with_cache(tmp_path):
+    cache_directory = str(tmp_path / 'cache')
+
+    first_result = read_time_series(TIME_SERIES_PATH, cache_directory=cache_directory)
+    result = read_time_series(TIME_SERIES_PATH, cache_directory=cache_directory)
+
+    pandas.testing.assert_frame_equal(result, first_result)
+    pandas.testing.assert_frame_equal(result, read_time_series(TIME_SERIES_PATH))
+    assert isinstance(result['data_wtd'].values.base, numpy.memmap) or isinstance(result['data_wtd'].values, numpy.memmap)
+
+
+def test_read_time_series_with_modified_file(tmp_path):
+    filepath = str(tmp_path / 'time_series.csv')
+    cache_directory = str(tmp_path / 'cache')
+    shutil.copy(TIME_SERIES_PATH, filepath)
+    read_time_series(filepath, cache_directory=cache_directory)
+
+    shutil.copy(OTHER_TIME_SERIES_PATH, filepath)
+    result = read_time_series(filepath, cache_directory=cache_directory)
+
+    pandas.testing.assert_frame_equal(result, read_time_series(OTHER_TIME_SERIES_PATH))
+
+
+def test_read_time_series_with_cache_and_other_date_format(tmp_path):
+    filepath = str(tmp_path / 'time_series.csv')
+    cache_directory = str(tmp_path / 'cache')
+    with open(filepath, 'w') as file:
+        file.write('"","date","data_wtd","data_prec"\n"1",2011-06-01 15:00:00,-0.107,0\n"2",2011-06-02 15:00:00,-0.106,0\n')
+    read_time_series(filepath, cache_directory=cache_directory)
+
+    result = read_time_series(filepath, date_format='%Y-%d-%m %H:%M:%S', cache_directory=cache_directory)
+
+    assert list(result.index.month) == [1, 2]
+    assert list(read_time_series(filepath, cache_directory=cache_directory).index.month) == [6, 6]
+
+
+def test_evict_cache(tmp_path):
+    cache_directory = str(tmp_path / 'cache')
+    read_time_series(TIME_SERIES_PATH, cache_directory=cache_directory)
+    read_time_series(OTHER_TIME_SERIES_PATH, cache_directory=cache_directory)
+    assert len(os.listdir(cache_directory)) == 2
+
+    evict_cache(cache_directory, max_cache_size=1_500_000)
+
+    assert len(os.listdir(cache_directory)) == 1
+    evict_cache(cache_directory, max_cache_size=0)
+    assert len(os.listdir(cache_directory)) == 0
+
+
+def test_evict_cache_keeps_other_directories(tmp_path):
+    cache_directory = str(tmp_path / 'project')
+    for name in ['data', 'a' * 40]:  # A directory with the name of an entry, but other files
+        os.makedirs(os.path.join(cache_directory, name))
+        with open(os.path.join(cache_directory, name, 'notes.txt'), 'w') as file:
+            file.write('Not cached')
+    read_time_series(TIME_SERIES_PATH, cache_directory=cache_directory)
+
+    evict_cache(cache_directory, max_cache_size=0)
+
+    assert sorted(os.listdir(cache_directory)) == ['a' * 40, 'data']
+
+
+@pytest.fixture
+def sy_results(monkeypatch):
+    """Empty in-memory cache of the Sy, and the number of Sy calculations."""
+    results = OrderedDict()
+    monkeypatch.setattr(sy_module, '_sy_results', results)
+
+    calculations = []
+    calculate_sy_arrays = sy_module.calculate_sy_arrays
+
+    def counted_calculate_sy_arrays(*args, **kwargs):
+        calculations.append(kwargs)
+        return calculate_sy_arrays(*args, **kwargs)
+
+    monkeypatch.setattr(sy_module, 'calculate_sy_arrays', counted_calculate_sy_arrays)
+
+    return results, calculations
+
+
+def test_calculate_sy_with_cache(sy_results):
+    results, calculations = sy_results
+    time_series = read_time_series(TIME_SERIES_PATH)
+    expected = calculate_sy(time_series)
+
+    first_result = calculate_sy(time_series, cache=True)
+    first_result['sy'] = 0  # The cached Sy is not modified
+    result = calculate_sy(time_series.copy(), cache=True)
+
+    pandas.testing.assert_frame_equal(result, expected)
+    assert len(calculations) == 2
+    assert len(results) == 1
+
+
+def test_calculate_sy_with_cache_and_other_parameters(sy_results):
+    results, calculations = sy_results
+    time_series = read_time_series(TIME_SERIES_PATH)
+
+    calculate_sy(time_series, cache=True)
+    result = calculate_sy(time_series, gap=3, cache=True)
+    calculate_sy(read_time_series(OTHER_TIME_SERIES_PATH), gap=3, cache=True)
+
+    pandas.testing.assert_frame_equal(result, calculate_sy(time_series, gap=3))
+    assert len(calculations) == 4
+    assert len(results) == 3
+
+
+def test_calculate_sy_with_other_algorithm_version(tmp_path, sy_results, monkeypatch):
+    results, calculations = sy_results
+    cache_directory = str(tmp_path / 'cache')
+    time_series = read_time_series(TIME_SERIES_PATH)
+    calculate_sy(time_series, cache_directory=cache_directory)
+
+    monkeypatch.setattr(sy_module, 'SY_ALGORITHM_VERSION', sy_module.SY_ALGORITHM_VERSION + 1)
+    calculate_sy(time_series, cache_directory=cache_directory)
+
+    assert len(calculations) == 2
+    assert len(os.listdir(cache_directory)) == 2
+
+
+def test_calculate_sy_with_cache_directory(tmp_path, sy_results):
+    results, calculations = sy_results
+    cache_directory = str(tmp_path / 'cache')
+    time_series = read_time_series(TIME_SERIES_PATH)
+    expected = calculate_sy(time_series, cache_directory=cache_directory)
+
+    results.clear()  # As in a new process
+    result = calculate_sy(time_series, cache_directory=cache_directory)
+
+    pandas.testing.assert_frame_equal(result, expected)
+    assert (result.dtypes == expected.dtypes).all()  # With the datetime columns
+    assert len(calculations) == 1
+    assert len(os.listdir(cache_directory)) == 1
+
+
+def test_calculate_sy_with_cache_directory_after_memory_cache(tmp_path, sy_results):
+    results, calculations = sy_results
+    cache_directory = str(tmp_path / 'cache')
+    time_series = read_time_series(TIME_SERIES_PATH)
+    calculate_sy(time_series, cache=True)
+
+    calculate_sy(time_series, cache_directory=cache_directory)
+
+    assert len(calculations) == 1
+    assert len(os.listdir(cache_directory)) == 1
+
+
+def test_sy_cache_eviction(tmp_path, sy_results, monkeypatch):
+    results, calculations = sy_results
+    monkeypatch.setattr(sy_module, 'SY_CACHE_SIZE', 2)
+    cache_directory = str(tmp_path / 'cache')
+    time_series = read_time_series(TIME_SERIES_PATH)
+
+    calculate_sy(time_series, gap=2, cache_directory=cache_directory)
+    max_cache_size = 2 * _directory_size(cache_directory)
+
+    for gap in range(3, 8):
+        calculate_sy(time_series, gap=gap, cache_directory=cache_directory, max_cache_size=max_cache_size)
+
+    assert len(results) == 2
+    assert 0 < _directory_size(cache_directory) <= max_cache_size
+    assert len(os.listdir(cache_directory)) < 6
+
+
+def _directory_size(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
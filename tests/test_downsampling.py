@@ -0,0 +1,86 @@
+import numpy
+import pandas
+import pytest
+
+from peatland_time_series.downsampling import WaterLevelPyramid, largest_triangle_three_buckets
+
+
+@pytest.fixture(scope='module')
+def time_series():
+    rng = numpy.random.default_rng(42)
+    dates = pandas.date_range('2020-01-01', periods=200_000, freq='5min')
+    time_series = pandas.DataFrame({
+        'data_wtd': numpy.cumsum(rng.normal(0, 0.001, len(dates))) - 0.3,
+        'data_prec': rng.exponential(1, len(dates)).round(1) * (rng.random(len(dates)) < 0.1),
+    }, index=dates)
+    time_series.iloc[5000:5100, 0] = numpy.nan  # A gap of the water level
+
+    return time_series
+
+
+@pytest.mark.parametrize('window', [slice(0, None), slice(4000, 60000), slice(100, 1000), slice(7, 20)])
+@pytest.mark.parametrize('factor', [2, 4])
+def test_pyramid_water_table_depth(time_series, window, factor):
+    pyramid = WaterLevelPyramid(time_series, factor=factor)
+    sub_time_series = time_series.iloc[window]
+    beginning, ending = sub_time_series.index[0], sub_time_series.index[-1]
+
+    dates, water_table_depth = pyramid.water_table_depth(beginning, ending, n_buckets=500)
+
+    assert len(dates) <= 3 * 500 + 2
+    assert numpy.all(numpy.diff(dates) > numpy.timedelta64(0))
+    assert dates[0] == beginning and dates[-1] == ending
+    # The samples are kept as they are, with the extrema and the gaps of the window
+    pandas.testing.assert_series_equal(
+        pandas.Series(water_table_depth, index=dates),
+        sub_time_series['data_wtd'].loc[dates],
+        check_names=False,
+        check_freq=False,
+    )
+    assert numpy.nanmin(water_table_depth) == sub_time_series['data_wtd'].min()
+    assert numpy.nanmax(water_table_depth) == sub_time_series['data_wtd'].max()
+    assert numpy.isnan(water_table_depth).any() == sub_time_series['data_wtd'].isna().any()
+
+
+def test_pyramid_water_table_depth_lttb(time_series):
+    pyramid = WaterLevelPyramid(time_series)
+
+    dates, water_table_depth = pyramid.water_table_depth(time_series.index[0], time_series.index[-1], 500, method='lttb')
+
+    assert len(dates) == 500
+    assert not numpy.isnan(water_table_depth).any()
+    assert dates[0] == time_series.index[0] and dates[-1] == time_series.index[-1]
+
+
+def test_pyramid_unknown_method(time_series):
+    with pytest.raises(ValueError):
+        WaterLevelPyramid(time_series).water_table_depth(time_series.index[0], time_series.index[-1], 500, method='mean')
+
+
+@pytest.mark.parametrize('n_buckets', [1, 7, 1000])
+def test_pyramid_precipitation(time_series, n_buckets):
+    pyramid = WaterLevelPyramid(time_series)
+    beginning, ending = time_series.index[1234], time_series.index[98765]
+
+    edges, precipitation = pyramid.precipitation(beginning, ending, n_buckets)
+
+    assert len(edges) == n_buckets + 1
+    assert edges[0] == beginning and edges[-1] == ending
+    # The ending is included in the last bucket
+    expected = [
+        time_series['data_prec'][(time_series.index >= start) & (time_series.index < stop)].sum()
+        for start, stop in zip(edges[:-1], edges[1:])
+    ]
+    expected[-1] += time_series['data_prec'].loc[ending]
+    numpy.testing.assert_allclose(precipitation, expected, atol=1e-9)
+
+
+def test_largest_triangle_three_buckets():
+    x = numpy.arange(10, dtype=float)
+    y = numpy.array([0, 0, 5, 0, 0, 0, -5, 0, 0, 0], dtype=float)
+
+    selected = largest_triangle_three_buckets(x, y, 4)
+
+    # The peaks are kept
+    numpy.testing.assert_array_equal(selected, [0, 2, 6, 9])
+    numpy.testing.assert_array_equal(largest_triangle_three_buckets(x, y, 20), numpy.arange(10))
@@ -0,0 +1,72 @@
+import numpy
+import pytest
+
+from peatland_time_series.events import extended_window_maxima, find_events, segment_sum, window_extrema
+
+
+def test_find_events():
+    precipitation = numpy.array([0, 1, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 1, 1], dtype=float)
+
+    positions, boundaries = find_events(precipitation, threshold=0.3, gap=5)
+
+    numpy.testing.assert_array_equal(positions, [1, 2, 8, 10, 17, 18])
+    # The last segment (positions 17 and 18) is never closed by a gap
+    numpy.testing.assert_array_equal(boundaries, [0, 2, 4])
+
+
+def test_find_events_without_gap():
+    positions, boundaries = find_events(numpy.ones(10), threshold=0.3, gap=5)
+
+    assert len(boundaries) - 1 == 0
+
+
+@pytest.mark.parametrize('n_events', [10, 100_000])
+def test_segment_sum(n_events):
+    rng = numpy.random.default_rng(42)
+    lengths = rng.integers(1, 20, size=n_events)
+    boundaries = numpy.concatenate(([0], numpy.cumsum(lengths)))
+    values = rng.random(boundaries[-1] + 3) * 10
+
+    result = segment_sum(values, boundaries)
+
+    expected = [values[start:stop].sum() for start, stop in zip(boundaries[:-1], boundaries[1:])]
+    numpy.testing.assert_array_equal(result, expected)
+
+
+def test_segment_sum_without_segment():
+    result = segment_sum(numpy.ones(5), numpy.array([0]))
+
+    assert len(result) == 0
+    assert result.dtype == float
+
+
+def test_window_extrema():
+    values = numpy.array([1., 3., numpy.nan, 3., 0., numpy.nan, numpy.nan, 2.])
+    starts = numpy.array([0, 1, 3, 5])
+    stops = numpy.array([2, 5, 8, 7])
+
+    maxima, minima, argmax, argmin = window_extrema(values, starts, stops)
+
+    numpy.testing.assert_array_equal(maxima, [3., numpy.nan, numpy.nan, numpy.nan])
+    numpy.testing.assert_array_equal(minima, [1., numpy.nan, numpy.nan, numpy.nan])
+    numpy.testing.assert_array_equal(argmax, [1, 1, 3, -1])
+    numpy.testing.assert_array_equal(argmin, [0, 4, 4, -1])
+
+
+def test_window_extrema_with_empty_window():
+    with pytest.raises(ValueError):
+        window_extrema(numpy.ones(3), numpy.array([1]), numpy.array([1]))
+
+
+@pytest.mark.parametrize('extensions', [range(5, 15), range(1, 73, 7)])
+def test_extended_window_maxima(extensions):
+    rng = numpy.random.default_rng(42)
+    values = rng.random(200)
+    values[rng.integers(0, 200, size=10)] = numpy.nan
+    starts = numpy.sort(rng.integers(0, 195, size=30))
+    ends = starts + rng.integers(0, 5, size=30)
+
+    result = extended_window_maxima(values, starts, ends, extensions)
+
+    expected = [[values[start:end + extension].max() for start, end in zip(starts, ends)] for extension in extensions]
+    numpy.testing.assert_array_equal(result, expected)
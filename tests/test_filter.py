@@ -1,9 +1,10 @@
 from datetime import datetime
 from typing import Dict
 
+import numpy
 import pandas
 import pytest
-from peatland_time_series.filter import filter_sy
+from peatland_time_series.filter import SyFilter, evaluate_sy_filters, filter_sy
 from peatland_time_series.sy import read_sy
 
 SY_PATH = './tests/data/sy.csv'
@@ -68,3 +69,66 @@ def test_filter_with_expected_wrong_tolerances(sy: pandas.DataFrame, filters: Di
         valid_check = (result[key] > min_tolerance) & (result[key] < max_tolerance)
 
         assert not valid_check.all()
+
+
+def test_filter_with_zero_bounds(sy: pandas.DataFrame):
+    result = filter_sy(sy, sy_min=0, delta_h_max=0)
+
+    assert (result['sy'] >= 0).all()
+    assert (result['delta_h'] <= 0).all()
+    assert len(result) < len(sy)
+
+
+def test_sy_filter(sy: pandas.DataFrame):
+    sy_filter = SyFilter(
+        sy_min=0.1,
+        precipitation_sum_min=2.0,
+        precipitation_sum_max=7.0,
+        date_beginning_min=pandas.Timestamp('2011-08-03 22:00:00')
+    )
+
+    result = sy_filter.apply(sy)
+
+    expected = sy[
+        (sy['sy'] >= 0.1)
+        & (sy['precipitation_sum'] >= 2.0)
+        & (sy['precipitation_sum'] <= 7.0)
+        & (sy['date_beginning'] >= pandas.Timestamp('2011-08-03 22:00:00'))
+    ]
+    pandas.testing.assert_frame_equal(result, expected)
+    pandas.testing.assert_frame_equal(sy_filter.apply(sy.iloc[::2]), expected[expected.index % 2 == 0])
+
+
+def test_sy_filter_without_bounds(sy: pandas.DataFrame):
+    assert SyFilter().apply(sy) is sy
+
+
+def test_evaluate_sy_filters(sy: pandas.DataFrame):
+    sy_filters = {
+        'none': SyFilter(),
+        'sy': SyFilter(sy_min=0, sy_max=0.25),
+        'dates': SyFilter(date_beginning_min=pandas.Timestamp('2011-08-03 22:00:00'), precipitation_sum_min=2.0),
+        'durations': SyFilter(durations_min=1, delta_h_min=.01),
+    }
+
+    membership, summary = evaluate_sy_filters(sy, sy_filters)
+
+    assert membership.shape == (4, len(sy))
+    for name, sy_filter in sy_filters.items():
+        expected = sy_filter.apply(sy)
+        pandas.testing.assert_frame_equal(sy.loc[membership.loc[name]], expected)
+        assert summary.loc[name, 'count'] == len(expected)
+        finite_sy = expected['sy'][numpy.isfinite(expected['sy'])]
+        assert summary.loc[name, 'depth_mean'] == pytest.approx(expected['depth'].mean())
+        assert summary.loc[name, 'sy_std'] == pytest.approx(finite_sy.std())
+        assert summary.loc[name, 'sy_max'] == finite_sy.max()
+
+
+def test_evaluate_sy_filters_with_fractional_bound_on_integer_column(sy: pandas.DataFrame):
+    sy = sy.assign(durations=sy['durations'].astype('int64'))
+    sy_filters = {'durations': SyFilter(durations_min=1.5), 'sy': SyFilter(sy_max=0.5)}
+
+    membership, _ = evaluate_sy_filters(sy, sy_filters)
+
+    for name, sy_filter in sy_filters.items():
+        pandas.testing.assert_frame_equal(sy.loc[membership.loc[name]], sy_filter.apply(sy))
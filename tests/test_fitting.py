@@ -0,0 +1,147 @@
+import numpy
+import pytest
+
+from peatland_time_series.filter import filter_sy
+from peatland_time_series.fitting import bootstrap_depth_power_law, bootstrap_power_law, fit_depth_power_law, fit_power_law
+from peatland_time_series.sy import read_sy
+from peatland_time_series.util import power_law
+
+SY_PATH = './tests/data/sy.csv'
+
+
+@pytest.fixture
+def sy():
+    return filter_sy(read_sy(SY_PATH), sy_min=0, sy_max=1, delta_h_min=.01, precipitation_sum_min=10, precipitation_sum_max=100)
+
+
+def test_fit_power_law():
+    x = numpy.linspace(0.05, 1, 50)
+
+    fit = fit_power_law(x, power_law(x, -20, -0.5))
+
+    assert fit.a == pytest.approx(-20)
+    assert fit.b == pytest.approx(-0.5)
+    assert fit.standard_deviation_a == pytest.approx(0, abs=1e-6)
+    numpy.testing.assert_allclose(fit(x), power_law(x, -20, -0.5))
+
+
+def test_fit_depth_power_law(sy):
+    fit = fit_depth_power_law(sy, 'min_wtd')
+
+    expected = fit_power_law(sy['sy'].values, sy['min_wtd'].values * 100)
+    assert fit.a == expected.a
+    assert fit.b == expected.b
+
+
+def test_fit_depth_power_law_is_cached(sy):
+    fit = fit_depth_power_law(sy, 'min_wtd')
+
+    assert fit_depth_power_law(sy.copy(), 'min_wtd') is fit
+    assert fit_depth_power_law(sy, 'depth') is not fit
+    assert fit_depth_power_law(sy.iloc[1:], 'min_wtd') is not fit
+    assert fit_depth_power_law(sy, 'min_wtd', method='loglog') is not fit
+
+
+@pytest.mark.parametrize('method', ['least_squares', 'loglog', 'curve_fit'])
+def test_fit_power_law_methods(method):
+    x = numpy.linspace(0.05, 1, 50)
+
+    fit = fit_power_law(x, power_law(x, -20, -0.5), method=method)
+
+    assert fit.method == method
+    assert fit.converged
+    assert fit.a == pytest.approx(-20)
+    assert fit.b == pytest.approx(-0.5)
+    assert fit.residual_standard_deviation == pytest.approx(0, abs=1e-6)
+
+
+def test_fit_power_law_least_squares_like_curve_fit(sy):
+    x, y = sy['sy'].values, sy['min_wtd'].values * 100
+
+    fit = fit_power_law(x, y, method='least_squares')
+
+    expected = fit_power_law(x, y, method='curve_fit')
+    assert fit.a == pytest.approx(expected.a, rel=1e-3)
+    assert fit.b == pytest.approx(expected.b, rel=1e-3)
+    numpy.testing.assert_allclose(fit.covariance, expected.covariance, rtol=1e-2)
+    assert fit.n_evaluations < expected.n_evaluations
+
+
+def test_fit_power_law_robust_loss():
+    x = numpy.linspace(0.05, 1, 50)
+    y = power_law(x, -20, -0.5)
+    y[::10] *= 3  # Outliers
+
+    fit = fit_power_law(x, y, loss='soft_l1')
+
+    assert fit.a == pytest.approx(-20, rel=0.05)
+    assert fit.b == pytest.approx(-0.5, rel=0.05)
+    assert abs(fit_power_law(x, y).a + 20) > abs(fit.a + 20)
+
+
+def test_fit_power_law_unknown_method():
+    with pytest.raises(ValueError):
+        fit_power_law(numpy.ones(3), numpy.ones(3), method='unknown')
+
+
+def test_bootstrap_power_law():
+    random = numpy.random.default_rng(0)
+    x = random.uniform(0.05, 1, 200)
+    y = power_law(x, -20, -0.5) * numpy.exp(random.normal(0, 0.1, len(x)))
+
+    bands = bootstrap_power_law(x, y, n_replicates=2000, seed=0)
+
+    assert len(bands.x) == len(bands.fit) == len(bands.confidence_lower) == 100
+    assert len(bands.a) == len(bands.b) == 2000
+    assert numpy.median(bands.a) == pytest.approx(-20, rel=0.05)
+    assert numpy.median(bands.b) == pytest.approx(-0.5, rel=0.05)
+    # Depths are negative: lower < fit < upper, and the prediction band contains the confidence band
+    assert numpy.all(bands.prediction_lower <= bands.confidence_lower)
+    assert numpy.all(bands.confidence_lower <= bands.fit)
+    assert numpy.all(bands.fit <= bands.confidence_upper)
+    assert numpy.all(bands.confidence_upper <= bands.prediction_upper)
+    # About 95% of the points in the prediction band
+    is_inside = (numpy.interp(x, bands.x, bands.prediction_lower) <= y) & (y <= numpy.interp(x, bands.x, bands.prediction_upper))
+    assert is_inside.mean() == pytest.approx(0.95, abs=0.05)
+
+
+def test_bootstrap_power_law_is_reproducible():
+    x = numpy.linspace(0.05, 1, 50)
+    y = power_law(x, 20, 0.5) * (1 + 0.1 * numpy.sin(x * 50))
+
+    first = bootstrap_power_law(x, y, x_values=[0.1, 0.5], n_replicates=100, seed=1)
+    second = bootstrap_power_law(x, y, x_values=[0.1, 0.5], n_replicates=100, seed=1)
+
+    numpy.testing.assert_array_equal(first.confidence_upper, second.confidence_upper)
+    numpy.testing.assert_array_equal(first.x, [0.1, 0.5])
+
+
+def test_bootstrap_power_law_contains_the_least_squares_fit():
+    # Depths of both signs, which the "loglog" fit would partly ignore
+    sy = filter_sy(read_sy(SY_PATH), sy_min=0.001, sy_max=1, delta_h_min=0.001)
+    x = numpy.sort(sy['sy'].values)
+
+    bands = bootstrap_power_law(sy['sy'].values, sy['min_wtd'].values * 100, x_values=x, n_replicates=200, seed=0)
+
+    curve = fit_depth_power_law(sy)(x)
+    numpy.testing.assert_allclose(bands.fit, curve)
+    assert numpy.all((bands.confidence_lower <= curve) & (curve <= bands.confidence_upper))
+    assert not numpy.isnan(bands.a).any()
+
+
+def test_bootstrap_power_law_loglog_warns_about_ignored_points():
+    x = numpy.linspace(0.05, 1, 50)
+    y = power_law(x, -20, -0.5)
+    y[:3] *= -1
+
+    with pytest.warns(UserWarning, match='3 points'):
+        bands = bootstrap_power_law(x, y, n_replicates=10, seed=0, method='loglog')
+
+    numpy.testing.assert_allclose(bands.a, -20)
+
+
+def test_bootstrap_depth_power_law(sy):
+    bands = bootstrap_depth_power_law(sy, n_replicates=100, seed=0)
+
+    expected = bootstrap_power_law(sy['sy'].values, sy['min_wtd'].values * 100, n_replicates=100, seed=0)
+    numpy.testing.assert_array_equal(bands.prediction_upper, expected.prediction_upper)
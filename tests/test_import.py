@@ -0,0 +1,54 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Generous limit of the cold import, pandas alone takes most of it
+IMPORT_TIME_LIMIT = 5  # In seconds
+LAZY_DEPENDENCIES = ['matplotlib', 'scipy']
+
+
+def _run_python(code: str) -> dict:
+    """Run the code in a new interpreter (with cold imports), it must print a JSON object."""
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+
+    return json.loads(output)
+
+
+def test_import_does_not_load_matplotlib_nor_scipy():
+    result = _run_python(
+        'import json, sys, time\n'
+        'start = time.perf_counter()\n'
+        'import peatland_time_series\n'
+        'import_time = time.perf_counter() - start\n'
+        f'print(json.dumps({{"import_time": import_time, "modules": [m for m in {LAZY_DEPENDENCIES} if m in sys.modules]}}))\n'
+    )
+
+    assert result['modules'] == []
+    assert result['import_time'] < IMPORT_TIME_LIMIT
+
+
+@pytest.mark.parametrize('name, dependency', [
+    ('visualization', 'matplotlib'),
+    ('fitting', 'scipy'),
+    ('render_water_levels', 'matplotlib'),
+    ('fit_depth_power_law_windows', 'scipy'),
+    ('PointSelector', 'matplotlib'),
+])
+def test_lazy_attributes_are_imported_on_access(name, dependency):
+    result = _run_python(
+        'import json, sys\n'
+        f'from peatland_time_series import {name}\n'
+        f'print(json.dumps({{"is_loaded": "{dependency}" in sys.modules, "name": {name}.__name__}}))\n'
+    )
+
+    assert result['is_loaded']
+    assert result['name'].rsplit('.', 1)[-1] == name
+
+
+def test_unknown_attribute():
+    import peatland_time_series
+
+    with pytest.raises(AttributeError):
+        peatland_time_series.unknown
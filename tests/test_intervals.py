@@ -0,0 +1,67 @@
+import numpy
+import pandas
+import pytest
+
+from peatland_time_series.intervals import EVENT_DATE_COLUMNS, SyIntervalIndex
+from peatland_time_series.sy import read_sy
+from peatland_time_series.time_series import read_time_series
+
+SY_PATH = './tests/data/sy.csv'
+TIME_SERIES_PATH = './tests/data/time_series/time_series/ahlenmoor/ahlenmoor_af_naturnah_sp.csv'
+
+
+@pytest.fixture
+def sy():
+    # Shuffled, so that the index doesn't rely on the order of the events
+    return read_sy(SY_PATH).sample(frac=1, random_state=42)
+
+
+def _intervals(sy):
+    return sy[EVENT_DATE_COLUMNS].min(axis=1).values, sy[EVENT_DATE_COLUMNS].max(axis=1).values
+
+
+@pytest.mark.parametrize('start, end', [
+    ('2011-08-01', '2011-08-15'),
+    ('2011-06-16 15:00', '2011-06-16 15:00'),
+    ('2000-01-01', '2001-01-01'),
+    ('2000-01-01', '2030-01-01'),
+])
+def test_overlapping(sy, start, end):
+    start, end = pandas.Timestamp(start), pandas.Timestamp(end)
+    beginnings, endings = _intervals(sy)
+
+    result = SyIntervalIndex(sy).overlapping(start, end)
+
+    expected = numpy.flatnonzero((beginnings <= end) & (endings >= start))
+    numpy.testing.assert_array_equal(result, expected)
+
+
+def test_containing(sy):
+    timestamp = pandas.Timestamp('2011-06-16 15:00')
+
+    result = SyIntervalIndex(sy).containing(timestamp)
+
+    assert len(result) == 1
+    assert sy['date_beginning'].iloc[result[0]] == pandas.Timestamp('2011-06-16 14:00')
+
+
+@pytest.mark.parametrize('timestamp', ['2011-06-16 15:00', '2011-06-18 10:00', '2000-01-01', '2030-01-01'])
+def test_nearest(sy, timestamp):
+    timestamp = pandas.Timestamp(timestamp).to_datetime64()
+    beginnings, endings = _intervals(sy)
+    distances = numpy.maximum(numpy.maximum(beginnings - timestamp, timestamp - endings), numpy.timedelta64(0))
+
+    result = SyIntervalIndex(sy).nearest(timestamp)
+
+    assert distances[result] == distances.min()
+
+
+def test_time_series_slice(sy):
+    time_series = read_time_series(TIME_SERIES_PATH)
+    position = 10
+    time_before, time_after = pandas.Timedelta(hours=10), pandas.Timedelta(hours=20)
+
+    result = SyIntervalIndex(sy).time_series_slice(time_series, position, time_before, time_after)
+
+    expected = time_series.loc[sy['date_beginning'].iloc[position] - time_before:sy['date_ending'].iloc[position] + time_after]
+    pandas.testing.assert_frame_equal(result, expected)
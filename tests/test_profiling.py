@@ -0,0 +1,73 @@
+import logging
+
+import pandas
+import pytest
+
+from peatland_time_series.profiling import StageRecord, SyProfiler
+from peatland_time_series.streaming import calculate_sy_stream
+from peatland_time_series.sweep import calculate_sy_sweep
+from peatland_time_series.sy import calculate_sy
+from peatland_time_series.time_series import read_time_series
+
+TIME_SERIES_PATH = './tests/data/kmr_area_c.csv'
+STAGES = ['DEFINE_DATA', 'RESAMPLE', 'FIND_EVENTS', 'ISOLATION', 'MIN_MAX', 'ACCURACY', 'SY_CALCULATION', 'SUMMARY']
+
+
+@pytest.fixture(scope='module')
+def time_series():
+    return read_time_series(TIME_SERIES_PATH)
+
+
+def test_sy_profiler(time_series):
+    with SyProfiler() as profiler:
+        sy = calculate_sy(time_series)
+        calculate_sy(time_series, resample='3H')
+
+    report = profiler.report()
+    assert list(report['stage']) == STAGES * 2
+    assert list(report['run']) == [0] * len(STAGES) + [1] * len(STAGES)
+    assert (report['seconds'] >= 0).all()
+    assert report['allocated_bytes'].isna().all()
+
+    first_run = report[report['run'] == 0].set_index('stage')
+    assert first_run.loc['DEFINE_DATA', 'n_rows'] == len(time_series)
+    assert first_run.loc['FIND_EVENTS', 'n_events'] == len(sy)
+    assert first_run.loc['SUMMARY', 'n_events'] == len(sy)
+
+
+def test_sy_profiler_traces_memory(time_series):
+    with SyProfiler(trace_memory=True) as profiler:
+        calculate_sy(time_series)
+
+    report = profiler.report()
+    assert report['allocated_bytes'].notna().all()
+    assert report.set_index('stage').loc['RESAMPLE', 'peak_bytes'] > 0
+
+
+def test_sy_profiler_callback_and_log(time_series, caplog):
+    records = []
+    with caplog.at_level(logging.DEBUG, logger='peatland_time_series.profiling'):
+        with SyProfiler(callback=records.append):
+            calculate_sy(time_series)
+
+    assert [record.stage for record in records] == STAGES
+    assert all(isinstance(record, StageRecord) for record in records)
+    assert len(caplog.records) == len(STAGES)
+
+
+def test_sy_profiler_is_disabled_outside_of_its_context(time_series):
+    with SyProfiler() as profiler:
+        pass
+    calculate_sy(time_series)
+
+    assert profiler.records == []
+
+
+def test_sy_profiler_sweep_and_stream(time_series):
+    with SyProfiler() as profiler:
+        calculate_sy_sweep(time_series, gaps=[3, 5], max_hours=[5])
+        pandas.concat(calculate_sy_stream([time_series.iloc[:20_000], time_series.iloc[20_000:]]))
+
+    report = profiler.report()
+    assert (report[report['run'] == 0]['stage'] == 'FIND_EVENTS').sum() == 2  # One per gap
+    assert report['run'].nunique() == 1 + 3  # The sweep, then the 2 chunks and the end of the stream
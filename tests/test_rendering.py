@@ -0,0 +1,56 @@
+import os
+
+import matplotlib
+import pytest
+
+from peatland_time_series.rendering import render_water_levels
+from peatland_time_series.sy import calculate_sy
+from peatland_time_series.time_series import read_time_series
+
+matplotlib.use('Agg')
+
+TIME_SERIES_PATH = './tests/data/kmr_area_c.csv'
+
+
+@pytest.fixture(scope='module')
+def time_series():
+    return read_time_series(TIME_SERIES_PATH)
+
+
+@pytest.fixture(scope='module')
+def sy(time_series):
+    return calculate_sy(time_series)
+
+
+def test_render_water_levels(time_series, sy, tmp_path):
+    summary = render_water_levels(time_series, sy, str(tmp_path), event_indexes=[3, 5, 8])
+
+    assert summary.n_events == 3
+    assert summary.events_per_second > 0
+    assert summary.paths == [os.path.join(str(tmp_path), f'event_{index}.png') for index in [3, 5, 8]]
+    for path in summary.paths:
+        with open(path, 'rb') as file:
+            assert file.read(8) == b'\x89PNG\r\n\x1a\n'
+
+
+def test_render_water_levels_multi_page_pdf(time_series, sy, tmp_path):
+    summary = render_water_levels(time_series, sy.iloc[:5], str(tmp_path), file_format='pdf', events_per_file=2)
+
+    assert summary.n_events == 5
+    assert [os.path.basename(path) for path in summary.paths] == [
+        'water_levels_0000.pdf', 'water_levels_0001.pdf', 'water_levels_0002.pdf'
+    ]
+    with open(summary.paths[0], 'rb') as file:
+        assert b'/Count 2' in file.read()
+
+
+def test_render_water_levels_in_parallel(time_series, sy, tmp_path):
+    summary = render_water_levels(time_series, sy.iloc[:4], str(tmp_path), file_format='svg', max_workers=2)
+
+    assert sorted(os.listdir(str(tmp_path))) == sorted(f'event_{index}.svg' for index in sy.index[:4])
+    assert summary.n_events == 4
+
+
+def test_render_water_levels_many_events_per_file_needs_pdf(time_series, sy, tmp_path):
+    with pytest.raises(ValueError):
+        render_water_levels(time_series, sy, str(tmp_path), file_format='png', events_per_file=10)
@@ -0,0 +1,99 @@
+import numpy
+import pandas
+import pytest
+
+from peatland_time_series import resampling
+from peatland_time_series.resampling import resample_arrays
+from peatland_time_series.time_series import read_time_series
+
+TIME_SERIES_PATH = './tests/data/time_series/time_series/ahlenmoor/ahlenmoor_af_naturnah_sp.csv'
+
+
+def random_time_series(frequency: str, dropouts: float, seed: int = 42) -> pandas.DataFrame:
+    rng = numpy.random.default_rng(seed)
+    dates = pandas.date_range('2020-01-01 00:10', periods=2000, freq=frequency)
+    time_series = pandas.DataFrame({
+        'data_wtd': rng.normal(-0.3, 0.05, len(dates)),
+        'data_prec': rng.exponential(1, len(dates)).round(1),
+    }, index=dates)
+    time_series.iloc[rng.random(len(dates)) < 0.05] = numpy.nan  # Missing values
+
+    return time_series[rng.random(len(dates)) >= dropouts]
+
+
+def assert_resampled_like_pandas(time_series: pandas.DataFrame, rule, origin, exact: bool = True):
+    result = resample_arrays(
+        time_series.index.values, time_series['data_wtd'].values, time_series['data_prec'].values, rule, origin, exact
+    )
+
+    resampler = time_series.resample(rule, origin=origin)
+    expected_water_table_depth = resampler['data_wtd'].mean()
+    expected_precipitation = resampler['data_prec'].sum()
+    expected_counts = resampler.count()
+
+    numpy.testing.assert_array_equal(result.timestamps, expected_precipitation.index.values.view('i8'))
+    if exact:  # Bit-identical (assert_array_equal considers NaN equal)
+        numpy.testing.assert_array_equal(result.water_table_depth, expected_water_table_depth.values)
+        numpy.testing.assert_array_equal(result.precipitation, expected_precipitation.values)
+    else:  # Pandas uses a compensated summation
+        numpy.testing.assert_allclose(result.water_table_depth, expected_water_table_depth.values, rtol=1e-12)
+        numpy.testing.assert_allclose(result.precipitation, expected_precipitation.values, rtol=1e-12)
+    numpy.testing.assert_array_equal(result.water_table_depth_count, expected_counts['data_wtd'].values)
+    numpy.testing.assert_array_equal(result.precipitation_count, expected_counts['data_prec'].values)
+
+
+@pytest.mark.parametrize('frequency', ['H', '15min', '50min'])
+@pytest.mark.parametrize('dropouts', [0, 0.3])
+@pytest.mark.parametrize('rule', ['H', '3H', 'D', 'M'])
+@pytest.mark.parametrize('origin', ['start_day', 'start', 'epoch', pandas.Timestamp('2019-12-31 23:45')])
+@pytest.mark.parametrize('exact', [False, True])
+def test_resample_arrays(frequency, dropouts, rule, origin, exact):
+    assert_resampled_like_pandas(random_time_series(frequency, dropouts), rule, origin, exact)
+
+
+def test_resample_arrays_of_logger():
+    time_series = read_time_series(TIME_SERIES_PATH)
+
+    assert_resampled_like_pandas(time_series, 'H', 'start_day')
+    assert_resampled_like_pandas(time_series, '30min', 'start_day')
+    assert_resampled_like_pandas(time_series, '3H', 'start_day', exact=False)
+
+
+def test_resample_arrays_without_pandas(monkeypatch):
+    time_series = random_time_series('15min', dropouts=0.3)
+    expected = resample_arrays(time_series.index.values, time_series['data_wtd'].values, time_series['data_prec'].values)
+
+    monkeypatch.setattr(resampling, '_resample_with_pandas', None)
+    result = resample_arrays(time_series.index.values, time_series['data_wtd'].values, time_series['data_prec'].values)
+
+    for expected_array, array in zip(expected, result):
+        numpy.testing.assert_array_equal(array, expected_array)
+
+
+def test_resample_arrays_with_int_timestamps():
+    time_series = random_time_series('15min', dropouts=0.3)
+    timestamps = time_series.index.values
+
+    expected = resample_arrays(timestamps, time_series['data_wtd'].values, time_series['data_prec'].values)
+    result = resample_arrays(timestamps.view('i8'), time_series['data_wtd'].values, time_series['data_prec'].values)
+
+    for expected_array, array in zip(expected, result):
+        numpy.testing.assert_array_equal(array, expected_array)
+
+
+def test_resample_arrays_of_unsorted_time_series():
+    time_series = random_time_series('H', dropouts=0.3).sample(frac=1, random_state=0)
+
+    assert_resampled_like_pandas(time_series, 'H', 'start_day')
+
+
+def test_resample_arrays_coverage():
+    dates = pandas.to_datetime(['2020-01-01 00:00', '2020-01-01 00:15', '2020-01-01 00:30', '2020-01-01 02:45'])
+    water_table_depth = numpy.array([-0.1, numpy.nan, -0.3, -0.4])
+
+    result = resample_arrays(dates.values, water_table_depth, numpy.zeros(4), 'H')
+
+    numpy.testing.assert_array_equal(result.water_table_depth_count, [2, 0, 1])
+    numpy.testing.assert_array_equal(result.precipitation_count, [3, 0, 1])
+    numpy.testing.assert_array_equal(result.water_table_depth, [-0.2, numpy.nan, -0.4])
+    numpy.testing.assert_array_equal(result.precipitation, [0, 0, 0])
@@ -0,0 +1,64 @@
+import numpy
+import pandas
+import pytest
+
+from peatland_time_series.filter import filter_sy
+from peatland_time_series.fitting import fit_power_law
+from peatland_time_series.rolling import fit_depth_power_law_windows
+from peatland_time_series.sy import read_sy
+
+SY_PATH = './tests/data/sy.csv'
+
+
+@pytest.fixture
+def sy():
+    return filter_sy(read_sy(SY_PATH), sy_min=0, sy_max=1, delta_h_min=.01)
+
+
+def test_fit_depth_power_law_windows_seasons(sy):
+    windows = fit_depth_power_law_windows(sy, window='QS-DEC')
+
+    assert windows.index.name == 'window_start'
+    assert windows.index[0] == pandas.Timestamp('2011-06-01')
+    assert (windows['window_end'].values[:-1] == windows.index[1:]).all()
+    assert windows['n_events'].sum() == len(sy)
+
+    window = windows.iloc[2]
+    sy_window = filter_sy(sy, date_beginning_min=windows.index[2], date_beginning_max=window['window_end'] - pandas.Timedelta(1))
+    expected = fit_power_law(sy_window['sy'].values, sy_window['min_wtd'].values * 100)
+    assert window['n_events'] == len(sy_window)
+    assert window['a'] == pytest.approx(expected.a)
+    assert window['b'] == pytest.approx(expected.b)
+    assert window['standard_deviation_b'] == pytest.approx(expected.standard_deviation_b)
+
+
+def test_fit_depth_power_law_windows_sliding(sy):
+    windows = fit_depth_power_law_windows(sy, window='60D', step='30D', min_events=5)
+
+    assert (numpy.diff(windows.index) == pandas.Timedelta('30D')).all()
+    assert (windows['window_end'] - windows.index == pandas.Timedelta('60D')).all()
+    assert windows.loc[windows['n_events'] < 5, 'a'].isna().all()
+    assert not windows.loc[windows['n_events'] >= 5, 'a'].isna().any()
+
+
+def test_fit_depth_power_law_windows_many_sites(sy):
+    sy_sites = pandas.concat({'site_1': sy, 'site_2': sy.iloc[::2]}, names=['site', 'event'])
+
+    windows = fit_depth_power_law_windows(sy_sites, window='AS')
+
+    assert windows.index.names == ['site', 'window_start']
+    pandas.testing.assert_frame_equal(windows.loc['site_1'], fit_depth_power_law_windows(sy, window='AS'))
+    pandas.testing.assert_frame_equal(windows.loc['site_2'], fit_depth_power_law_windows(sy.iloc[::2], window='AS'))
+
+
+def test_fit_depth_power_law_windows_in_parallel(sy):
+    sy_sites = pandas.concat({'site_1': sy, 'site_2': sy.iloc[::2]}, names=['site', 'event'])
+
+    windows = fit_depth_power_law_windows(sy_sites, window='90D', step='30D', max_workers=2)
+
+    pandas.testing.assert_frame_equal(windows, fit_depth_power_law_windows(sy_sites, window='90D', step='30D'))
+
+
+def test_fit_depth_power_law_windows_min_events(sy):
+    with pytest.raises(ValueError):
+        fit_depth_power_law_windows(sy, min_events=1)
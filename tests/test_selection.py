@@ -0,0 +1,149 @@
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy
+import pytest
+from matplotlib.backend_bases import MouseEvent
+from matplotlib.path import Path
+
+from peatland_time_series.selection import HIGHLIGHT_COLOR, PointSelector
+
+matplotlib.use('Agg')
+
+N_POINTS = 5000
+
+
+@pytest.fixture
+def scatter_plot():
+    random = numpy.random.default_rng(0)
+    fig, ax = plt.subplots()
+    scatter_plot = ax.scatter(random.uniform(0, 1, N_POINTS), random.uniform(-3, 0, N_POINTS), color='blue')
+    fig.canvas.draw()
+
+    yield ax, scatter_plot
+
+    plt.close(fig)
+
+
+class _BoxEvent:
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+
+
+def test_points_at_like_contains(scatter_plot):
+    ax, collection = scatter_plot
+    selector = PointSelector(ax, collection)
+    random = numpy.random.default_rng(1)
+    offsets = ax.transData.transform(collection.get_offsets())
+
+    # Clicks on points (to have some matches) and anywhere on the axes
+    clicks = numpy.concatenate([offsets[:50] + random.uniform(-5, 5, (50, 2)),
+                                random.uniform(ax.bbox.min, ax.bbox.max, (50, 2))])
+    for x, y in clicks:
+        event = MouseEvent('button_press_event', ax.figure.canvas, x, y, button=1)
+        _, details = collection.contains(event)
+
+        expected = set(details['ind'])
+        actual = set(selector.points_at(x, y))
+        # Only the points at the boundary of the pick radius may differ (the markers of matplotlib are polygons)
+        distances = numpy.hypot(*(offsets[list(expected ^ actual)] - [x, y]).T)
+        radius = numpy.sqrt(collection.get_sizes()[0]) / 2 * ax.figure.dpi / 72 + collection.get_pickradius()
+        numpy.testing.assert_allclose(distances, radius, atol=1.5)
+
+
+def test_lasso(scatter_plot):
+    ax, collection = scatter_plot
+    selector = PointSelector(ax, collection, mode='lasso')
+    vertices = [(0.1, -0.5), (0.6, -0.2), (0.9, -2.5), (0.2, -2)]
+
+    selector._on_lasso(vertices)
+
+    expected = Path(vertices).contains_points(collection.get_offsets())
+    assert selector.selected_indexes == set(numpy.flatnonzero(expected))
+    assert 0 < len(selector.selected_indexes) < N_POINTS
+
+
+def test_box(scatter_plot):
+    ax, collection = scatter_plot
+    selector = PointSelector(ax, collection, mode='box')
+    (x_min, y_min), (x_max, y_max) = ax.transData.transform([(0.2, -2), (0.7, -1)])
+
+    selector._on_box(_BoxEvent(x_max, y_min), _BoxEvent(x_min, y_max))
+
+    x, y = collection.get_offsets().T
+    expected = (x >= 0.2) & (x <= 0.7) & (y >= -2) & (y <= -1)
+    assert selector.selected_indexes == set(numpy.flatnonzero(expected))
+
+
+def test_small_box_is_a_click(scatter_plot):
+    ax, collection = scatter_plot
+    selector = PointSelector(ax, collection, mode='box')
+
+    selector._on_box(_BoxEvent(100, 100), _BoxEvent(101, 102))
+
+    assert selector.selected_indexes == set()
+
+
+@pytest.mark.parametrize('style', ['hide', 'highlight'])
+def test_styles(scatter_plot, style):
+    ax, collection = scatter_plot
+    selector = PointSelector(ax, collection, style=style)
+
+    selector.select_indexes([3, 10])
+
+    if style == 'hide':
+        sizes = collection.get_sizes()
+        assert sizes[3] == sizes[10] == 0
+        assert numpy.count_nonzero(sizes) == N_POINTS - 2
+    else:
+        colors = collection.get_facecolors()
+        numpy.testing.assert_array_equal(colors[[3, 10]], [HIGHLIGHT_COLOR] * 2)
+        assert (colors[:, 2] == 1).sum() == N_POINTS - 2  # The others are still blue
+
+
+def test_single_blit_per_selection(scatter_plot, monkeypatch):
+    ax, collection = scatter_plot
+    selector = PointSelector(ax, collection, mode='lasso')
+    ax.figure.canvas.draw()  # To cache the background
+    blits = []
+    monkeypatch.setattr(ax.figure.canvas, 'blit', lambda bbox=None: blits.append(bbox))
+
+    selector._on_lasso([(0, 0), (1, 0), (1, -3), (0, -3)])
+
+    assert len(selector.selected_indexes) == N_POINTS
+    assert len(blits) == 1
+
+
+def test_click_selects_the_points_under_the_mouse(scatter_plot):
+    ax, collection = scatter_plot
+    selector = PointSelector(ax, collection)
+    x, y = ax.transData.transform(collection.get_offsets()[7])
+    canvas = ax.figure.canvas
+    expected = set(selector.points_at(x, y))
+
+    for name in ['button_press_event', 'button_release_event']:
+        canvas.callbacks.process(name, MouseEvent(name, canvas, x, y, button=1))
+
+    assert 7 in selector.selected_indexes
+    assert selector.selected_indexes == expected
+
+
+def test_disconnect(scatter_plot):
+    ax, collection = scatter_plot
+    selector = PointSelector(ax, collection)
+    x, y = ax.transData.transform(collection.get_offsets()[7])
+    canvas = ax.figure.canvas
+
+    selector.disconnect()
+    for name in ['button_press_event', 'button_release_event']:
+        canvas.callbacks.process(name, MouseEvent(name, canvas, x, y, button=1))
+
+    assert selector.selected_indexes == set()
+    assert not collection.get_animated()
+
+
+@pytest.mark.parametrize('mode, style', [('circle', 'hide'), ('click', 'remove')])
+def test_unknown_mode_or_style(scatter_plot, mode, style):
+    ax, collection = scatter_plot
+
+    with pytest.raises(ValueError):
+        PointSelector(ax, collection, mode=mode, style=style)
@@ -0,0 +1,49 @@
+import pandas
+import pytest
+
+from peatland_time_series.streaming import calculate_sy_stream
+from peatland_time_series.sy import calculate_sy
+from peatland_time_series.time_series import read_time_series, read_time_series_chunks
+
+TIME_SERIES_PATH = './tests/data/time_series/time_series/ahlenmoor/ahlenmoor_af_naturnah_sp.csv'
+OTHER_TIME_SERIES_PATH = './tests/data/time_series/time_series/ahlenmoor/ahlenmoor_af_seepegel.csv'
+
+
+@pytest.mark.parametrize('chunksize, parameters', [
+    (1000, {}),
+    (7777, {'gap': 3, 'max_hour': 8, 'threshold': 0.1}),
+    (5000, {'resample': '30min', 'accuracy_range': range(5, 73)}),
+])
+def test_calculate_sy_stream(chunksize, parameters):
+    chunks = read_time_series_chunks(TIME_SERIES_PATH, chunksize=chunksize)
+
+    result = pandas.concat(calculate_sy_stream(chunks, **parameters))
+
+    expected = calculate_sy(read_time_series(TIME_SERIES_PATH), **parameters)
+    pandas.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
+def test_calculate_sy_stream_durations_are_floats():
+    chunks = read_time_series_chunks(OTHER_TIME_SERIES_PATH, chunksize=1000)
+
+    results = list(calculate_sy_stream(chunks))
+
+    # Some chunks have no event of 0.5 hour
+    assert not all((result['durations'] == 0.5).any() for result in results)
+    assert all(result['durations'].dtype == float for result in results)
+
+
+def test_calculate_sy_stream_yields_events_progressively():
+    chunks = read_time_series_chunks(TIME_SERIES_PATH, chunksize=1000)
+
+    results = list(calculate_sy_stream(chunks))
+
+    assert len(results) > 10
+    assert all(len(result) <= 100 for result in results)
+
+
+def test_calculate_sy_stream_with_bad_resample():
+    chunks = read_time_series_chunks(TIME_SERIES_PATH)
+
+    with pytest.raises(ValueError):
+        list(calculate_sy_stream(chunks, resample='M'))
@@ -0,0 +1,50 @@
+import pandas
+import pytest
+
+from peatland_time_series.profiling import SyProfiler
+from peatland_time_series.sweep import calculate_sy_sweep
+from peatland_time_series.sy import calculate_sy
+from peatland_time_series.time_series import read_time_series
+
+TIME_SERIES_PATH = './tests/data/time_series/time_series/ahlenmoor/ahlenmoor_af_naturnah_sp.csv'
+
+
+@pytest.fixture
+def time_series():
+    return read_time_series(TIME_SERIES_PATH)
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_calculate_sy_sweep(time_series, max_workers):
+    result = calculate_sy_sweep(time_series, gaps=[3, 5], max_hours=[2, 5, 8], thresholds=[0.3, 1.0], max_workers=max_workers)
+
+    assert result.index.names == ['gap', 'max_hour', 'threshold', 'event']
+    assert len(result.index.droplevel('event').unique()) == 12
+
+    for gap, max_hour, threshold in [(3, 2, 0.3), (5, 8, 1.0)]:
+        expected = calculate_sy(time_series, gap=gap, max_hour=max_hour, threshold=threshold)
+        pandas.testing.assert_frame_equal(result.loc[(gap, max_hour, threshold)], expected, check_names=False)
+
+
+def test_calculate_sy_sweep_with_bad_max_hour(time_series):
+    with pytest.raises(ValueError):
+        calculate_sy_sweep(time_series, max_hours=[5, 0])
+
+
+def test_calculate_sy_sweep_shares_the_events_of_max_hours(time_series):
+    with SyProfiler() as profiler:
+        result = calculate_sy_sweep(time_series, gaps=[3, 5], max_hours=[2, 5, 8])
+
+    stages = profiler.report()['stage'].value_counts()
+    assert stages['ACCURACY'] == stages['ISOLATION'] == 2  # Once per gap
+    assert stages['MIN_MAX'] == stages['SUMMARY'] == 6
+    assert result.attrs['combinations_per_second'] > 0
+
+
+@pytest.mark.parametrize('grid', [{'gaps': []}, {'max_hours': []}, {'thresholds': []}])
+def test_calculate_sy_sweep_with_empty_grid(time_series, grid):
+    result = calculate_sy_sweep(time_series, **grid)
+
+    assert result.empty
+    assert result.index.names == ['gap', 'max_hour', 'threshold', 'event']
+    pandas.testing.assert_series_equal(result.dtypes, calculate_sy(time_series).dtypes)
@@ -1,8 +1,11 @@
+import sys
+
 import numpy
 import pandas
 import pytest
 
-from peatland_time_series.sy import calculate_sy, read_sy
+from peatland_time_series.profiling import SyProfiler
+from peatland_time_series.sy import calculate_sy, calculate_sy_arrays, read_sy
 from peatland_time_series.time_series import read_time_series
 
 TIME_SERIES_PATH = './tests/data/time_series/time_series/ahlenmoor/ahlenmoor_af_naturnah_sp.csv'
@@ -39,6 +42,25 @@ def test_calculate_sy(time_series, expected_result):
         assert abs(i - j) < 1e-15  # Ignoring numerical difference (~1e-16)
 
 
+@pytest.mark.parametrize('resample', ['H', '2H', 'D'])
+def test_calculate_sy_of_sub_hourly_time_series(time_series, resample):
+    # 15 minutes measures, around the hourly ones
+    random = numpy.random.default_rng(0)
+    dates = (time_series.index.values[:, None] + numpy.arange(4) * numpy.timedelta64(15, 'm')).ravel()
+    sub_hourly_time_series = pandas.DataFrame({
+        'data_wtd': numpy.repeat(time_series['data_wtd'].values, 4) + random.normal(0, 0.001, len(dates)),
+        'data_prec': numpy.repeat(time_series['data_prec'].values / 4, 4),
+    }, index=pandas.DatetimeIndex(dates, name='date'))
+
+    result = calculate_sy(sub_hourly_time_series, resample=resample)
+
+    # As before the resampling of the arrays: the time series resampled by pandas (then resampled again as is)
+    resampler = sub_hourly_time_series.resample(resample)
+    resampled = pandas.DataFrame({'data_wtd': resampler['data_wtd'].mean(), 'data_prec': resampler['data_prec'].sum()})
+    assert len(result) > 0
+    pandas.testing.assert_frame_equal(result, calculate_sy(resampled, resample=resample), check_exact=True)
+
+
 def test_read_sy():
     result = read_sy(SY_PATH)
 
@@ -54,3 +76,71 @@ def test_read_sy():
 def test_read_bad_sy():
     with pytest.raises(ValueError):
         read_sy(SY_BAD_PATH)
+
+
+def test_calculate_sy_with_accuracy_range(time_series):
+    result = calculate_sy(time_series, accuracy_range=range(5, 73))
+    default_result = calculate_sy(time_series)
+
+    pandas.testing.assert_frame_equal(
+        result.drop(columns=['accuracy_mean', 'accuracy_std']),
+        default_result.drop(columns=['accuracy_mean', 'accuracy_std'])
+    )
+    assert not result['accuracy_mean'].equals(default_result['accuracy_mean'])
+
+
+def test_calculate_sy_with_bad_accuracy_range(time_series):
+    with pytest.raises(ValueError):
+        calculate_sy(time_series, accuracy_range=range(5, 6))
+
+
+@pytest.mark.parametrize('timestamps_dtype', ['i8', 'datetime64[ns]', 'datetime64[s]'])
+def test_calculate_sy_arrays(time_series, timestamps_dtype):
+    timestamps = time_series.index.values.astype(timestamps_dtype)
+
+    sy = calculate_sy_arrays(timestamps, time_series['data_wtd'].values, time_series['data_prec'].values, gap=3, max_hour=6)
+
+    assert list(sy) == EXPECTED_COLUMNS
+    assert sy['date_beginning'].dtype == numpy.dtype('datetime64[ns]')
+    pandas.testing.assert_frame_equal(pandas.DataFrame(sy), calculate_sy(time_series, gap=3, max_hour=6))
+
+
+def test_calculate_sy_arrays_without_events():
+    timestamps = pandas.date_range('2020-01-01', periods=48, freq='H').values.view('i8')
+
+    sy = calculate_sy_arrays(timestamps, numpy.full(48, -0.2), numpy.zeros(48))
+
+    assert all(len(values) == 0 for values in sy.values())
+    assert sy['precipitation_sum'].dtype == float
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_calculate_sy_of_arrow_table(time_series, batch):
+    pyarrow = pytest.importorskip('pyarrow')
+    table = pyarrow.table({'date': time_series.index.values, 'data_wtd': time_series['data_wtd'].values,
+                           'data_prec': time_series['data_prec'].values})
+    if batch:
+        table = table.to_batches()[0]
+
+    pandas.testing.assert_frame_equal(calculate_sy(table), calculate_sy(time_series))
+
+
+@pytest.mark.skipif(sys.version_info < (3, 9), reason='The peak of memory per stage requires Python 3.9')
+def test_calculate_sy_does_not_copy_memory_mapped_input(tmp_path):
+    n_rows = 1_000_000
+    random = numpy.random.default_rng(0)
+    values = numpy.empty(n_rows, dtype=[('date', 'M8[ns]'), ('data_wtd', 'f8'), ('data_prec', 'f8')])
+    values['date'] = pandas.date_range('2000-01-01', periods=n_rows, freq='5min').values
+    values['data_prec'] = numpy.where(random.random(n_rows) < 0.01, random.uniform(0, 5, n_rows), 0)
+    values['data_wtd'] = numpy.cumsum(values['data_prec']) * 1e-3 - numpy.arange(n_rows) * 1e-5
+    numpy.save(tmp_path / 'time_series.npy', values)
+    memory_mapped_time_series = read_time_series(str(tmp_path / 'time_series.npy'))
+
+    with SyProfiler(trace_memory=True) as profiler:
+        sy = calculate_sy(memory_mapped_time_series)
+
+    peak_bytes = profiler.report().set_index('stage')['peak_bytes']
+    assert len(sy) > 0
+    assert peak_bytes['DEFINE_DATA'] < values.nbytes / 100
+    # The resampling allocates the bins of the measures (int64), but no copy of the columns
+    assert peak_bytes['RESAMPLE'] < values.nbytes
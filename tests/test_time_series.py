@@ -1,6 +1,12 @@
+import gzip
+import shutil
+import tracemalloc
+
+import numpy
 import pandas
 import pytest
-from peatland_time_series.time_series import read_time_series
+from peatland_time_series import time_series
+from peatland_time_series.time_series import detect_date_format, read_time_series, read_time_series_chunks
 
 TIME_SERIES_PATH = './tests/data/time_series/time_series/ahlenmoor/ahlenmoor_af_naturnah_sp.csv'
 BAD_TIME_SERIES_PATH = './tests/data/time_series/time_series/bad-time-series.csv'
@@ -22,3 +28,145 @@ def test_read_bad_time_series():
     with pytest.raises(ValueError):
         read_time_series(BAD_TIME_SERIES_PATH)
 
+
+
+@pytest.mark.parametrize('date, expected_format', [
+    ('2011-06-15 15:00:00', '%Y-%m-%d %H:%M:%S'),
+    ('2011-06-15 15:00', '%Y-%m-%d %H:%M'),
+    ('2011/06/15 15:00:00', '%Y/%m/%d %H:%M:%S'),
+    ('15 juin 2011', None),
+])
+def test_detect_date_format(date, expected_format):
+    assert detect_date_format(date) == expected_format
+
+
+def test_read_time_series_with_date_format(tmp_path):
+    filepath = tmp_path / 'time_series.csv'
+    filepath.write_text('data_prec,date,other,data_wtd\n0.5,15/06/2011 15:00,a,-0.1\n0,15/06/2011 16:00,b,-0.2\n')
+
+    result = read_time_series(str(filepath), date_format='%d/%m/%Y %H:%M')
+
+    assert list(result.columns) == EXPECTED_COLUMNS
+    assert list(result.index) == [pandas.Timestamp('2011-06-15 15:00'), pandas.Timestamp('2011-06-15 16:00')]
+    assert list(result['data_wtd']) == [-0.1, -0.2]
+
+
+def test_read_time_series_without_arrow(monkeypatch):
+    expected = read_time_series(TIME_SERIES_PATH)
+    monkeypatch.setattr(time_series, 'pyarrow', None)
+
+    result = read_time_series(TIME_SERIES_PATH)
+
+    pandas.testing.assert_frame_equal(result, expected)
+
+
+def _compress(filepath: str, directory, compression: str) -> str:
+    if compression == 'zstd':
+        pyarrow = pytest.importorskip('pyarrow')
+        compressed_filepath = str(directory / 'time_series.csv.zst')
+        with open(filepath, 'rb') as file, pyarrow.output_stream(compressed_filepath, compression='zstd') as output:
+            output.write(file.read())
+    else:
+        compressed_filepath = str(directory / 'time_series.csv.gz')
+        with open(filepath, 'rb') as file, gzip.open(compressed_filepath, 'wb') as output:
+            shutil.copyfileobj(file, output)
+
+    return compressed_filepath
+
+
+@pytest.mark.parametrize('compression, with_arrow', [('gzip', True), ('gzip', False), ('zstd', True)])
+def test_read_compressed_time_series(tmp_path, monkeypatch, compression, with_arrow):
+    expected = read_time_series(TIME_SERIES_PATH)
+    filepath = _compress(TIME_SERIES_PATH, tmp_path, compression)
+    if not with_arrow:
+        monkeypatch.setattr(time_series, 'pyarrow', None)
+
+    pandas.testing.assert_frame_equal(read_time_series(filepath), expected)
+    pandas.testing.assert_frame_equal(pandas.concat(read_time_series_chunks(filepath, chunksize=1000)), expected)
+
+
+def test_read_zstd_time_series_without_arrow(tmp_path, monkeypatch):
+    filepath = _compress(TIME_SERIES_PATH, tmp_path, 'zstd')
+    monkeypatch.setattr(time_series, 'pyarrow', None)
+
+    with pytest.raises(ImportError):
+        read_time_series(filepath)
+
+
+def test_read_bad_compressed_time_series(tmp_path):
+    filepath = _compress(BAD_TIME_SERIES_PATH, tmp_path, 'gzip')
+
+    with pytest.raises(ValueError):
+        read_time_series(filepath)
+
+
+def _write_binary(time_series_: pandas.DataFrame, directory, extension: str) -> str:
+    filepath = str(directory / f'time_series{extension}')
+    columns = {'date': time_series_.index.values, 'data_wtd': time_series_['data_wtd'].values,
+               'data_prec': time_series_['data_prec'].values}
+    if extension == '.npy':
+        values = numpy.empty(len(time_series_), dtype=[(column, values.dtype) for column, values in columns.items()])
+        for column, column_values in columns.items():
+            values[column] = column_values
+        numpy.save(filepath, values)
+    else:
+        pyarrow = pytest.importorskip('pyarrow')
+        import pyarrow.feather
+        # The NaN are kept as values (not nulls), in a single uncompressed record batch, so that it is not copied
+        pyarrow.feather.write_feather(
+            pyarrow.table(columns), filepath, compression='uncompressed', chunksize=max(len(time_series_), 1)
+        )
+
+    return filepath
+
+
+def _allocated_bytes(function):
+    """Result of the function, and the peak of memory it allocated (with numpy, pandas or Arrow)."""
+    pyarrow = pytest.importorskip('pyarrow')
+    arrow_allocated_bytes = pyarrow.total_allocated_bytes()
+    tracemalloc.start()
+    try:
+        result = function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return result, peak + max(pyarrow.total_allocated_bytes() - arrow_allocated_bytes, 0)
+
+
+@pytest.mark.parametrize('extension', ['.npy', '.arrow', '.feather'])
+def test_read_binary_time_series(tmp_path, extension):
+    expected = read_time_series(TIME_SERIES_PATH)
+    filepath = _write_binary(expected, tmp_path, extension)
+
+    result = read_time_series(filepath)
+
+    pandas.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.parametrize('extension', ['.npy', '.arrow'])
+def test_read_binary_time_series_without_copy(tmp_path, extension):
+    n_rows = 1_000_000
+    dates = pandas.date_range('2000-01-01', periods=n_rows, freq='5min').values
+    expected = pandas.DataFrame({'data_wtd': numpy.linspace(-1, 0, n_rows), 'data_prec': numpy.zeros(n_rows)},
+                                index=pandas.DatetimeIndex(dates, name='date'))
+    filepath = _write_binary(expected, tmp_path, extension)
+
+    result, allocated_bytes = _allocated_bytes(lambda: read_time_series(filepath))
+
+    pandas.testing.assert_frame_equal(result, expected)
+    assert allocated_bytes < n_rows * 8 / 10  # Far less than a single column
+
+
+@pytest.mark.parametrize('extension', ['.npy', '.arrow'])
+def test_read_bad_binary_time_series(tmp_path, extension):
+    bad_time_series = read_time_series(TIME_SERIES_PATH).rename(columns={'data_wtd': 'wtd'})
+    filepath = str(tmp_path / f'time_series{extension}')
+    if extension == '.npy':
+        numpy.save(filepath, bad_time_series.to_records())
+    else:
+        pytest.importorskip('pyarrow')
+        bad_time_series.reset_index().to_feather(filepath)
+
+    with pytest.raises(ValueError):
+        read_time_series(filepath)
@@ -0,0 +1,57 @@
+import matplotlib
+import pandas
+import pytest
+
+from peatland_time_series import visualization
+from peatland_time_series.downsampling import WaterLevelPyramid
+from peatland_time_series.filter import filter_sy
+from peatland_time_series.sy import calculate_sy, read_sy
+from peatland_time_series.time_series import read_time_series
+
+matplotlib.use('Agg')
+
+SY_PATH = './tests/data/sy.csv'
+TIME_SERIES_PATH = './tests/data/kmr_area_c.csv'
+
+
+@pytest.fixture
+def sy():
+    return filter_sy(read_sy(SY_PATH), sy_min=0, sy_max=1, delta_h_min=.01, precipitation_sum_min=10, precipitation_sum_max=100)
+
+
+@pytest.mark.parametrize('power_law_x_axis', [False, True])
+def test_show_depth_does_not_modify_sy(sy, power_law_x_axis):
+    expected = sy.copy()
+
+    visualization.show_depth(sy, show_plot=False, power_law_x_axis=power_law_x_axis, show_indexes=True)
+    visualization.show_depth(sy, show_plot=False, power_law_x_axis=power_law_x_axis)
+
+    pandas.testing.assert_frame_equal(sy, expected)
+
+
+def test_show_depth_bands(sy):
+    figure = visualization.show_depth(sy, show_plot=False, show_bands=True, n_replicates=100)
+
+    assert len(figure.axes[0].collections) == 1 + 1 + 2  # Error bars, scatter plot and the 2 bands
+
+
+@pytest.mark.parametrize('downsample', ['minmax', 'lttb'])
+def test_show_water_level_downsample(downsample):
+    hourly_time_series = read_time_series(TIME_SERIES_PATH)
+    sy = calculate_sy(hourly_time_series)
+    # Measures every minute, to have many more samples than pixels
+    time_series = hourly_time_series[~hourly_time_series.index.duplicated()].resample('min').interpolate()
+    window = dict(event_index=3, time_before=pandas.Timedelta(days=10), time_after=pandas.Timedelta(days=10))
+
+    figure = visualization.show_water_level(time_series, sy, **window, show_plot=False, downsample=downsample)
+
+    ax = figure.axes[0]
+    ax_width = ax.get_window_extent().width
+    assert len(ax.lines[0].get_xdata()) <= 3 * ax_width + 2
+    assert len(figure.axes[1].patches) == 0  # The precipitation are a single filled step
+    assert len(figure.axes[1].collections) == 1
+
+    pyramid_figure = visualization.show_water_level(
+        time_series, sy, **window, show_plot=False, downsample=downsample, pyramid=WaterLevelPyramid(time_series)
+    )
+    assert pyramid_figure.axes[0].get_ylim() == pytest.approx(ax.get_ylim(), abs=1e-3)